@@ -0,0 +1,65 @@
+import axiosInstance from './axios';
+
+/**
+ * Live change events (server-sent events from crm/events/).
+ *
+ * Calls `onEvent({ id, type, action, pk, agents, data })` for every call,
+ * ticket and customer change the user may see. The server closes streams
+ * every few minutes; each reconnect fetches a fresh stream token and resumes
+ * after the last event received. Returns a function that stops listening.
+ */
+export const subscribeEvents = (onEvent) => {
+    let source = null;
+    let lastEventId = null;
+    let retryTimer = null;
+    let stopped = false;
+
+    const connect = async () => {
+        try {
+            const { data } = await axiosInstance.post('crm/events/token/');
+            if (stopped) return;
+            const url = new URL('crm/events/', axiosInstance.defaults.baseURL);
+            url.searchParams.set('token', data.token);
+            if (lastEventId !== null) url.searchParams.set('last_event_id', lastEventId);
+
+            source = new EventSource(url);
+            ['call', 'ticket', 'customer'].forEach((type) => {
+                source.addEventListener(type, (message) => {
+                    lastEventId = message.lastEventId;
+                    onEvent(JSON.parse(message.data));
+                });
+            });
+            // Stream tokens are short-lived, so reconnect through `connect` rather than EventSource's own retry.
+            source.onerror = () => {
+                source.close();
+                if (!stopped) retryTimer = setTimeout(connect, 3000);
+            };
+        } catch (error) {
+            console.error("Error opening event stream", error);
+            if (!stopped) retryTimer = setTimeout(connect, 10000);
+        }
+    };
+
+    connect();
+    return () => {
+        stopped = true;
+        clearTimeout(retryTimer);
+        if (source) source.close();
+    };
+};
+
+/**
+ * Applies one event to a list of rows keyed by `key`. Updates rows in place,
+ * drops them when deleted or when `keep(row)` rejects them, and inserts new
+ * rows at the `insert` end ('start', 'end', or null to leave them out).
+ */
+export const applyEvent = (rows, event, key, { keep = () => true, insert = 'start' } = {}) => {
+    const others = rows.filter((row) => row[key] !== event.pk);
+    if (event.action === 'deleted' || !keep(event.data)) return others;
+    if (others.length !== rows.length) {
+        return rows.map((row) => (row[key] === event.pk ? { ...row, ...event.data } : row));
+    }
+    if (insert === 'start') return [event.data, ...rows];
+    if (insert === 'end') return [...rows, event.data];
+    return rows;
+};
@@ -10,6 +10,7 @@ import { Edit as EditIcon, Delete as DeleteIcon, Add as AddIcon } from '@mui/ico
 
 const AdminDashboard = () => {
     const [users, setUsers] = useState([]);
+    const [usersNext, setUsersNext] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
     const [open, setOpen] = useState(false);
@@ -26,7 +27,8 @@ const AdminDashboard = () => {
     const fetchUsers = async () => {
         try {
             const response = await axiosInstance.get('core/users/');
-            setUsers(response.data);
+            setUsers(response.data.results);
+            setUsersNext(response.data.next);
             setLoading(false);
         } catch (err) {
             setError('Failed to fetch users');
@@ -38,6 +40,16 @@ const AdminDashboard = () => {
         fetchUsers();
     }, []);
 
+    const loadMore = async () => {
+        try {
+            const response = await axiosInstance.get(usersNext);
+            setUsers((rows) => [...rows, ...response.data.results]);
+            setUsersNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching users", error);
+        }
+    };
+
     const handleOpen = (user = null) => {
         if (user) {
             setCurrentUser(user);
@@ -148,6 +160,11 @@ const AdminDashboard = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {usersNext && (
+                <Box textAlign="center" mt={1}>
+                    <Button size="small" onClick={loadMore}>Load more</Button>
+                </Box>
+            )}
 
             <Dialog open={open} onClose={handleClose}>
                 <DialogTitle>{currentUser ? 'Edit User' : 'Add User'}</DialogTitle>
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import axiosInstance from '../api/axios';
+import { subscribeEvents, applyEvent } from '../api/events';
 import { 
     Container, Typography, Box, Table, TableBody, 
     TableCell, TableContainer, TableHead, TableRow, Paper, Chip,
@@ -10,6 +11,7 @@ import { PhoneCallback, PhoneForwarded, ConfirmationNumber as TicketIcon } from
 
 const CallHistory = () => {
     const [calls, setCalls] = useState([]);
+    const [callsNext, setCallsNext] = useState(null);
     const [openTicketDialog, setOpenTicketDialog] = useState(false);
     const [selectedCall, setSelectedCall] = useState(null);
     const [ticketForm, setTicketForm] = useState({
@@ -25,7 +27,18 @@ const CallHistory = () => {
     const fetchCalls = async () => {
         try {
             const response = await axiosInstance.get('crm/calls/');
-            setCalls(response.data);
+            setCalls(response.data.results);
+            setCallsNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching calls", error);
+        }
+    };
+
+    const loadMore = async () => {
+        try {
+            const response = await axiosInstance.get(callsNext);
+            setCalls((rows) => [...rows, ...response.data.results]);
+            setCallsNext(response.data.next);
         } catch (error) {
             console.error("Error fetching calls", error);
         }
@@ -33,6 +46,12 @@ const CallHistory = () => {
 
     useEffect(() => {
         fetchCalls();
+        // New and updated calls arrive over the event stream.
+        return subscribeEvents((event) => {
+            if (event.type === 'call') {
+                setCalls((rows) => applyEvent(rows, event, 'call_id'));
+            }
+        });
     }, []);
 
     const formatDuration = (start, end) => {
@@ -138,6 +157,11 @@ const CallHistory = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {callsNext && (
+                <Box textAlign="center" mt={1}>
+                    <Button size="small" onClick={loadMore}>Load more</Button>
+                </Box>
+            )}
 
             {/* Create Ticket Dialog */}
             <Dialog open={openTicketDialog} onClose={() => setOpenTicketDialog(false)} maxWidth="sm" fullWidth>
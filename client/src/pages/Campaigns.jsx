@@ -11,11 +11,14 @@ import { Group as GroupIcon, Delete as DeleteIcon, Add as AddIcon } from '@mui/i
 
 const Campaigns = () => {
     const [campaigns, setCampaigns] = useState([]);
+    const [campaignsNext, setCampaignsNext] = useState(null);
     const [open, setOpen] = useState(false);
     const [membersOpen, setMembersOpen] = useState(false);
     const [selectedCampaign, setSelectedCampaign] = useState(null);
     const [campaignMembers, setCampaignMembers] = useState([]);
-    const [allCustomers, setAllCustomers] = useState([]);
+    const [membersNext, setMembersNext] = useState(null);
+    const [customerOptions, setCustomerOptions] = useState([]);
+    const [customerQuery, setCustomerQuery] = useState('');
     const [selectedCustomerToAdd, setSelectedCustomerToAdd] = useState(null);
 
     const [newCampaign, setNewCampaign] = useState({
@@ -30,7 +33,8 @@ const Campaigns = () => {
     const fetchCampaigns = async () => {
         try {
             const response = await axiosInstance.get('crm/campaigns/');
-            setCampaigns(response.data);
+            setCampaigns(response.data.results);
+            setCampaignsNext(response.data.next);
         } catch (error) {
             console.error("Error fetching campaigns", error);
         }
@@ -40,6 +44,39 @@ const Campaigns = () => {
         fetchCampaigns();
     }, []);
 
+    const loadMoreCampaigns = async () => {
+        try {
+            const response = await axiosInstance.get(campaignsNext);
+            setCampaigns((rows) => [...rows, ...response.data.results]);
+            setCampaignsNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching campaigns", error);
+        }
+    };
+
+    // The picker searches the server, so every customer can be found, not just a first page.
+    useEffect(() => {
+        if (!membersOpen) return;
+        const timer = setTimeout(async () => {
+            try {
+                if (customerQuery.trim()) {
+                    const response = await axiosInstance.get('crm/search/', {
+                        params: { q: customerQuery, type: 'customers', limit: 50 }
+                    });
+                    setCustomerOptions(response.data.customers);
+                } else {
+                    const response = await axiosInstance.get('crm/customers/', {
+                        params: { fields: 'customer_id,full_name,email', page_size: 50 }
+                    });
+                    setCustomerOptions(response.data.results);
+                }
+            } catch (error) {
+                console.error("Error fetching customers", error);
+            }
+        }, 250);
+        return () => clearTimeout(timer);
+    }, [customerQuery, membersOpen]);
+
     const handleCreate = async () => {
         try {
             await axiosInstance.post('crm/campaigns/', newCampaign);
@@ -59,21 +96,36 @@ const Campaigns = () => {
         }
     };
 
+    const fetchMembers = (campaign) => axiosInstance.get(`crm/campaigns/${campaign.campaign_id}/members/`, {
+        params: { fields: 'customer_id,full_name,email', page_size: 500 }
+    });
+
+    const showMembers = (response) => {
+        setCampaignMembers(response.data.results);
+        setMembersNext(response.data.next);
+    };
+
     const handleManageMembers = async (campaign) => {
         setSelectedCampaign(campaign);
+        setCustomerQuery('');
         try {
-            const [membersRes, customersRes] = await Promise.all([
-                axiosInstance.get(`crm/campaigns/${campaign.campaign_id}/members/`),
-                axiosInstance.get('crm/customers/')
-            ]);
-            setCampaignMembers(membersRes.data);
-            setAllCustomers(customersRes.data);
+            showMembers(await fetchMembers(campaign));
             setMembersOpen(true);
         } catch (error) {
             console.error("Error fetching members", error);
         }
     };
 
+    const loadMoreMembers = async () => {
+        try {
+            const response = await axiosInstance.get(membersNext);
+            setCampaignMembers((rows) => [...rows, ...response.data.results]);
+            setMembersNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching members", error);
+        }
+    };
+
     const handleAddMember = async () => {
         if (!selectedCustomerToAdd) return;
         try {
@@ -81,8 +133,7 @@ const Campaigns = () => {
                 customer_id: selectedCustomerToAdd.customer_id
             });
             // Refresh members
-            const response = await axiosInstance.get(`crm/campaigns/${selectedCampaign.campaign_id}/members/`);
-            setCampaignMembers(response.data);
+            showMembers(await fetchMembers(selectedCampaign));
             setSelectedCustomerToAdd(null);
         } catch (error) {
             console.error("Error adding member", error);
@@ -95,8 +146,7 @@ const Campaigns = () => {
                 customer_id: customerId
             });
             // Refresh members
-            const response = await axiosInstance.get(`crm/campaigns/${selectedCampaign.campaign_id}/members/`);
-            setCampaignMembers(response.data);
+            showMembers(await fetchMembers(selectedCampaign));
         } catch (error) {
             console.error("Error removing member", error);
         }
@@ -169,6 +219,11 @@ const Campaigns = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {campaignsNext && (
+                <Box textAlign="center" mt={1}>
+                    <Button size="small" onClick={loadMoreCampaigns}>Load more</Button>
+                </Box>
+            )}
 
             <Dialog open={open} onClose={() => setOpen(false)}>
                 <DialogTitle>Create New Campaign</DialogTitle>
@@ -238,10 +293,15 @@ const Campaigns = () => {
                 <DialogContent>
                     <Box display="flex" gap={1} mb={2} mt={1}>
                         <Autocomplete
-                            options={allCustomers}
+                            options={customerOptions}
                             getOptionLabel={(option) => `${option.full_name} (${option.email})`}
+                            filterOptions={(options) => options}
+                            isOptionEqualToValue={(option, value) => option.customer_id === value.customer_id}
                             value={selectedCustomerToAdd}
                             onChange={(event, newValue) => setSelectedCustomerToAdd(newValue)}
+                            onInputChange={(event, value, reason) => {
+                                if (reason !== 'reset') setCustomerQuery(value);
+                            }}
                             renderInput={(params) => <TextField {...params} label="Select Customer" size="small" />}
                             sx={{ flexGrow: 1 }}
                         />
@@ -270,6 +330,11 @@ const Campaigns = () => {
                             </Typography>
                         )}
                     </List>
+                    {membersNext && (
+                        <Box textAlign="center">
+                            <Button size="small" onClick={loadMoreMembers}>Load more</Button>
+                        </Box>
+                    )}
                 </DialogContent>
                 <DialogActions>
                     <Button onClick={() => setMembersOpen(false)}>Close</Button>
@@ -3,27 +3,55 @@ import axiosInstance from '../api/axios';
 import { 
     Container, Typography, Box, Table, TableBody, 
     TableCell, TableContainer, TableHead, TableRow, Paper, Chip,
-    Button, Dialog, DialogTitle, DialogContent, DialogActions, Grid
+    Button, Dialog, DialogTitle, DialogContent, DialogActions, Grid, TextField
 } from '@mui/material';
 import { Visibility as VisibilityIcon } from '@mui/icons-material';
 
 const Customers = () => {
     const [customers, setCustomers] = useState([]);
+    const [customersNext, setCustomersNext] = useState(null);
     const [selectedCustomer, setSelectedCustomer] = useState(null);
     const [openDialog, setOpenDialog] = useState(false);
+    const [query, setQuery] = useState('');
 
     const fetchCustomers = async () => {
         try {
             const response = await axiosInstance.get('crm/customers/');
-            setCustomers(response.data);
+            setCustomers(response.data.results);
+            setCustomersNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching customers", error);
+        }
+    };
+
+    const searchCustomers = async (q) => {
+        try {
+            const response = await axiosInstance.get('crm/search/', { params: { q, type: 'customers', limit: 50 } });
+            setCustomers(response.data.customers);
+            setCustomersNext(null);
+        } catch (error) {
+            console.error("Error searching customers", error);
+        }
+    };
+
+    const loadMore = async () => {
+        try {
+            const response = await axiosInstance.get(customersNext);
+            setCustomers((rows) => [...rows, ...response.data.results]);
+            setCustomersNext(response.data.next);
         } catch (error) {
             console.error("Error fetching customers", error);
         }
     };
 
     useEffect(() => {
-        fetchCustomers();
-    }, []);
+        if (!query.trim()) {
+            fetchCustomers();
+            return;
+        }
+        const timer = setTimeout(() => searchCustomers(query), 250);
+        return () => clearTimeout(timer);
+    }, [query]);
 
     const handleViewCustomer = async (id) => {
         try {
@@ -47,6 +75,13 @@ const Customers = () => {
                 <Typography variant="h4" gutterBottom>
                     Customers
                 </Typography>
+                <TextField
+                    size="small"
+                    label="Search name, email, phone, address"
+                    value={query}
+                    onChange={(e) => setQuery(e.target.value)}
+                    sx={{ width: 320 }}
+                />
             </Box>
             
             <TableContainer component={Paper}>
@@ -99,6 +134,11 @@ const Customers = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {customersNext && (
+                <Box textAlign="center" mt={1}>
+                    <Button size="small" onClick={loadMore}>Load more</Button>
+                </Box>
+            )}
 
             <Dialog open={openDialog} onClose={handleCloseDialog} maxWidth="sm" fullWidth>
                 <DialogTitle>Customer Details</DialogTitle>
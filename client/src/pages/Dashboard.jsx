@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import axiosInstance from '../api/axios';
+import { subscribeEvents } from '../api/events';
 import { 
     Container, Grid, Paper, Typography, Box, Button, 
     Card, CardContent, CardActions,
@@ -10,6 +11,7 @@ import { useNavigate } from 'react-router-dom';
 
 const Dashboard = () => {
     const [customers, setCustomers] = useState([]);
+    const [totalCustomers, setTotalCustomers] = useState(0);
     const [ticketStats, setTicketStats] = useState({ open: 0, pending: 0, resolved: 0 });
     const [activeCalls, setActiveCalls] = useState(0);
     const [recentTickets, setRecentTickets] = useState([]);
@@ -18,28 +20,15 @@ const Dashboard = () => {
     useEffect(() => {
         const fetchData = async () => {
             try {
-                const [customersRes, ticketsRes, callsRes] = await Promise.all([
-                    axiosInstance.get('crm/customers/'),
-                    axiosInstance.get('crm/tickets/'),
-                    axiosInstance.get('crm/calls/')
-                ]);
+                // Counts and recent rows are computed server-side; the browser
+                // revalidates with the ETag so unchanged dashboards are a 304.
+                const { data } = await axiosInstance.get('crm/dashboard/summary/');
 
-                setCustomers(customersRes.data);
-
-                // Calculate Ticket Stats
-                const tickets = ticketsRes.data;
-                setTicketStats({
-                    open: tickets.filter(t => t.status === 'Open').length,
-                    pending: tickets.filter(t => t.status === 'Pending').length,
-                    resolved: tickets.filter(t => t.status === 'Resolved').length
-                });
-                
-                // Get recent tickets (last 5)
-                setRecentTickets(tickets.sort((a, b) => b.ticket_id - a.ticket_id).slice(0, 5));
-
-                // Calculate Active Calls
-                const calls = callsRes.data;
-                setActiveCalls(calls.filter(c => !c.call_end_time).length);
+                setCustomers(data.recent_customers);
+                setTotalCustomers(data.total_customers);
+                setTicketStats(data.tickets);
+                setRecentTickets(data.recent_tickets);
+                setActiveCalls(data.active_calls);
 
             } catch (error) {
                 console.error("Error fetching data", error);
@@ -47,6 +36,15 @@ const Dashboard = () => {
         };
 
         fetchData();
+        // Refresh on live changes, at most once a second; unchanged summaries come back as a 304.
+        let timer = null;
+        const unsubscribe = subscribeEvents(() => {
+            if (!timer) timer = setTimeout(() => { timer = null; fetchData(); }, 1000);
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, []);
 
     return (
@@ -72,7 +70,7 @@ const Dashboard = () => {
                                 Total Customers
                             </Typography>
                             <Typography variant="h3" component="div">
-                                {customers.length}
+                                {totalCustomers}
                             </Typography>
                         </CardContent>
                         <CardActions>
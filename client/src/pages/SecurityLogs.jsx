@@ -2,17 +2,19 @@ import React, { useEffect, useState } from 'react';
 import axiosInstance from '../api/axios';
 import { 
     Container, Typography, Box, Table, TableBody, 
-    TableCell, TableContainer, TableHead, TableRow, Paper, Chip 
+    TableCell, TableContainer, TableHead, TableRow, Paper, Chip, Button
 } from '@mui/material';
 
 const SecurityLogs = () => {
     const [logs, setLogs] = useState([]);
+    const [logsNext, setLogsNext] = useState(null);
 
     useEffect(() => {
         const fetchLogs = async () => {
             try {
                 const response = await axiosInstance.get('core/security-logs/');
-                setLogs(response.data);
+                setLogs(response.data.results);
+                setLogsNext(response.data.next);
             } catch (error) {
                 console.error("Error fetching security logs", error);
             }
@@ -21,6 +23,16 @@ const SecurityLogs = () => {
         fetchLogs();
     }, []);
 
+    const loadMore = async () => {
+        try {
+            const response = await axiosInstance.get(logsNext);
+            setLogs((rows) => [...rows, ...response.data.results]);
+            setLogsNext(response.data.next);
+        } catch (error) {
+            console.error("Error fetching security logs", error);
+        }
+    };
+
     return (
         <Container maxWidth="lg" sx={{ mt: 4, mb: 4 }}>
             <Box mb={3}>
@@ -72,6 +84,11 @@ const SecurityLogs = () => {
                     </TableBody>
                 </Table>
             </TableContainer>
+            {logsNext && (
+                <Box textAlign="center" mt={1}>
+                    <Button size="small" onClick={loadMore}>Load more</Button>
+                </Box>
+            )}
         </Container>
     );
 };
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from 'react';
 import axiosInstance from '../api/axios';
+import { subscribeEvents } from '../api/events';
 import { 
     Container, Grid, Paper, Typography, Box, 
     Table, TableBody, TableCell, TableContainer, 
@@ -30,6 +31,7 @@ const StatCard = ({ title, value, icon, color }) => (
 
 const SupervisorDashboard = () => {
     const [data, setData] = useState(null);
+    const [lagSeconds, setLagSeconds] = useState(0);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
@@ -38,6 +40,8 @@ const SupervisorDashboard = () => {
             try {
                 const response = await axiosInstance.get('crm/supervisor/stats/');
                 setData(response.data);
+                // Stats come from the analytics copy of the database, which may trail behind.
+                setLagSeconds(Number(response.headers['x-data-lag-seconds'] || 0));
                 setLoading(false);
             } catch (err) {
                 console.error("Error fetching supervisor stats", err);
@@ -47,6 +51,17 @@ const SupervisorDashboard = () => {
         };
 
         fetchData();
+        // Stats are read from rollups; refresh on call and ticket changes, at most once every few seconds.
+        let timer = null;
+        const unsubscribe = subscribeEvents((event) => {
+            if (event.type !== 'customer' && !timer) {
+                timer = setTimeout(() => { timer = null; fetchData(); }, 3000);
+            }
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, []);
 
     if (loading) return <Box sx={{ display: 'flex', justifyContent: 'center', mt: 4 }}><CircularProgress /></Box>;
@@ -57,6 +72,11 @@ const SupervisorDashboard = () => {
             <Typography variant="h4" gutterBottom>
                 Supervisor Dashboard
             </Typography>
+            {lagSeconds >= 60 && (
+                <Typography variant="body2" color="textSecondary" gutterBottom>
+                    Figures are about {Math.round(lagSeconds / 60)} min behind.
+                </Typography>
+            )}
             
             {/* Overall Stats */}
             <Grid container spacing={3} sx={{ mb: 4 }}>
@@ -1,5 +1,6 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import axiosInstance from '../api/axios';
+import { subscribeEvents, applyEvent } from '../api/events';
 import { 
     Container, Typography, Box, Button, Table, TableBody, 
     TableCell, TableContainer, TableHead, TableRow, Paper, Chip,
@@ -8,9 +9,24 @@ import {
 import { Edit as EditIcon } from '@mui/icons-material';
 import { useNavigate } from 'react-router-dom';
 
+const STATUSES = ['Open', 'Pending', 'Resolved'];
+const COLUMN_PAGE_SIZE = 20;
+const ELEVATION_KEY = 'ticket_elevation';
+
+const emptyColumns = () => Object.fromEntries(STATUSES.map((status) => [status, { tickets: [], next: null }]));
+
 const TicketBoard = () => {
-    const [tickets, setTickets] = useState([]);
+    const [columns, setColumns] = useState(emptyColumns);
+    const [counts, setCounts] = useState({});
+    const [filters, setFilters] = useState({
+        priority_level: '',
+        issue_category: '',
+        created_after: '',
+        created_before: '',
+        ordering: '-created_at'
+    });
     const [customers, setCustomers] = useState([]);
+    const [customerQuery, setCustomerQuery] = useState('');
     const [open, setOpen] = useState(false);
     const [createOpen, setCreateOpen] = useState(false);
     const [passwordOpen, setPasswordOpen] = useState(false);
@@ -33,25 +49,102 @@ const TicketBoard = () => {
 
     const navigate = useNavigate();
 
+    // Only the filters that are set; the server scopes agents to their own tickets.
+    const filterParams = (values = filters) => Object.fromEntries(Object.entries(values).filter(([, value]) => value));
+
     const fetchData = async () => {
         try {
-            const [ticketsRes, customersRes, userRes] = await Promise.all([
-                axiosInstance.get('crm/tickets/'),
-                axiosInstance.get('crm/customers/'),
-                axiosInstance.get('core/users/me/')
+            const params = filterParams();
+            const [countsRes, ...pages] = await Promise.all([
+                axiosInstance.get('crm/tickets/counts/', { params }),
+                ...STATUSES.map((status) =>
+                    axiosInstance.get('crm/tickets/', { params: { ...params, status, page_size: COLUMN_PAGE_SIZE } })
+                )
             ]);
-            setTickets(ticketsRes.data);
-            setCustomers(customersRes.data);
-            setCurrentUser(userRes.data);
+            setCounts(countsRes.data.counts);
+            setColumns(Object.fromEntries(STATUSES.map((status, i) => [
+                status, { tickets: pages[i].data.results, next: pages[i].data.next }
+            ])));
+        } catch (error) {
+            console.error("Error fetching tickets", error);
+        }
+    };
+
+    const loadMore = async (status) => {
+        try {
+            const response = await axiosInstance.get(columns[status].next);
+            setColumns((current) => ({
+                ...current,
+                [status]: {
+                    tickets: [...current[status].tickets, ...response.data.results],
+                    next: response.data.next
+                }
+            }));
         } catch (error) {
-            console.error("Error fetching data", error);
+            console.error("Error fetching tickets", error);
         }
     };
 
     useEffect(() => {
-        fetchData();
+        axiosInstance.get('core/users/me/')
+            .then((response) => setCurrentUser(response.data))
+            .catch((error) => console.error("Error fetching user", error));
     }, []);
 
+    useEffect(() => {
+        fetchData();
+    }, [filters]);
+
+    // The event stream handler outlives renders; read the latest filters and user through refs.
+    const filtersRef = useRef(filters);
+    const userRef = useRef(currentUser);
+    filtersRef.current = filters;
+    userRef.current = currentUser;
+
+    const matchesFilters = (ticket) => {
+        const current = filtersRef.current;
+        const user = userRef.current;
+        const created = ticket.created_at.slice(0, 10);
+        return (user?.role !== 'Agent' || ticket.agent === user.id)
+            && (!current.priority_level || ticket.priority_level === current.priority_level)
+            && (!current.issue_category || ticket.issue_category === current.issue_category)
+            && (!current.created_after || created >= current.created_after)
+            && (!current.created_before || created <= current.created_before);
+    };
+
+    useEffect(() => subscribeEvents((event) => {
+        if (event.type !== 'ticket') return;
+        const newestFirst = filtersRef.current.ordering === '-created_at';
+        setColumns((current) => Object.fromEntries(STATUSES.map((status) => [status, {
+            ...current[status],
+            tickets: applyEvent(current[status].tickets, event, 'ticket_id', {
+                keep: (ticket) => ticket.status === status && matchesFilters(ticket),
+                // Oldest first, a new ticket belongs after every page not yet loaded.
+                insert: newestFirst ? 'start' : (current[status].next ? null : 'end')
+            })
+        }])));
+        axiosInstance.get('crm/tickets/counts/', { params: filterParams(filtersRef.current) })
+            .then((response) => setCounts(response.data.counts))
+            .catch((error) => console.error("Error fetching ticket counts", error));
+    }), []);
+
+    // The create dialog looks customers up by name instead of loading them all.
+    useEffect(() => {
+        if (!customerQuery.trim()) {
+            setCustomers([]);
+            return;
+        }
+        const timer = setTimeout(async () => {
+            try {
+                const response = await axiosInstance.get('crm/search/', { params: { q: customerQuery, type: 'customers', limit: 20 } });
+                setCustomers(response.data.customers);
+            } catch (error) {
+                console.error("Error searching customers", error);
+            }
+        }, 250);
+        return () => clearTimeout(timer);
+    }, [customerQuery]);
+
     const handleEditClick = (ticket) => {
         // Check if user is assigned agent or supervisor/admin
         const isAssigned = ticket.agent === currentUser?.id;
@@ -63,24 +156,60 @@ const TicketBoard = () => {
         }
 
         setSelectedTicket(ticket);
-        setEditForm({
-            status: ticket.status,
-            priority_level: ticket.priority_level,
-            description: ticket.description
-        });
+        const token = elevationToken();
+        if (token) {
+            openTicket(ticket, token);
+            return;
+        }
         // Open Password Dialog instead of Edit Dialog directly
         setPassword('');
         setPasswordError('');
         setPasswordOpen(true);
     };
 
+    // A verified password is good for a few minutes of ticket views (server-side elevation token).
+    const elevationToken = () => {
+        const stored = JSON.parse(sessionStorage.getItem(ELEVATION_KEY) || 'null');
+        return stored && stored.expiresAt > Date.now() ? stored.token : null;
+    };
+
+    const openTicket = async (ticket, token) => {
+        try {
+            const response = await axiosInstance.get(`crm/tickets/${ticket.ticket_id}/`, {
+                headers: { 'X-Elevation-Token': token }
+            });
+            setSelectedTicket(response.data);
+            setEditForm({
+                status: response.data.status,
+                priority_level: response.data.priority_level,
+                description: response.data.description
+            });
+            setOpen(true); // Open the actual Edit/View dialog
+        } catch (error) {
+            if (error.response?.data?.code === 'elevation_required') {
+                sessionStorage.removeItem(ELEVATION_KEY);
+                setPassword('');
+                setPasswordError('');
+                setPasswordOpen(true);
+                return;
+            }
+            console.error("Error fetching ticket", error);
+            alert("Failed to load ticket.");
+        }
+    };
+
     const handlePasswordSubmit = async () => {
         try {
-            await axiosInstance.post('core/verify-password/', { password });
+            const response = await axiosInstance.post('core/verify-password/', { password, scope: 'tickets' });
+            sessionStorage.setItem(ELEVATION_KEY, JSON.stringify({
+                token: response.data.elevation_token,
+                // Renew a little early rather than have a request rejected mid-flight.
+                expiresAt: Date.now() + (response.data.expires_in - 10) * 1000
+            }));
             setPasswordOpen(false);
-            setOpen(true); // Open the actual Edit/View dialog
+            openTicket(selectedTicket, response.data.elevation_token);
         } catch (error) {
-            setPasswordError("Invalid password");
+            setPasswordError(error.response?.status === 429 ? "Too many attempts. Try again later." : "Invalid password");
         }
     };
 
@@ -100,6 +229,7 @@ const TicketBoard = () => {
             await axiosInstance.post('crm/tickets/', createForm);
             setCreateOpen(false);
             fetchData();
+            setCustomerQuery('');
             setCreateForm({
                 title: '',
                 customer: '',
@@ -133,52 +263,130 @@ const TicketBoard = () => {
                 </Button>
             </Box>
             
-            <TableContainer component={Paper}>
-                <Table sx={{ minWidth: 650 }} aria-label="simple table">
-                    <TableHead>
-                        <TableRow>
-                            <TableCell>ID</TableCell>
-                            <TableCell>Title</TableCell>
-                            <TableCell>Customer</TableCell>
-                            <TableCell>Priority</TableCell>
-                            <TableCell>Status</TableCell>
-                            <TableCell>Agent</TableCell>
-                            <TableCell>Actions</TableCell>
-                        </TableRow>
-                    </TableHead>
-                    <TableBody>
-                        {tickets.map((ticket) => (
-                            <TableRow
-                                key={ticket.ticket_id}
-                                sx={{ '&:last-child td, &:last-child th': { border: 0 } }}
-                            >
-                                <TableCell component="th" scope="row">
-                                    #{ticket.ticket_id}
-                                </TableCell>
-                                <TableCell>{ticket.title}</TableCell>
-                                <TableCell>{ticket.customer_name}</TableCell>
-                                <TableCell>{ticket.priority_level}</TableCell>
-                                <TableCell>
-                                    <Chip label={ticket.status} color={getStatusColor(ticket.status)} size="small" />
-                                </TableCell>
-                                <TableCell>{ticket.agent_name}</TableCell>
-                                <TableCell>
-                                    <IconButton onClick={() => handleEditClick(ticket)} size="small">
-                                        <EditIcon />
-                                    </IconButton>
-                                </TableCell>
-                            </TableRow>
-                        ))}
-                        {tickets.length === 0 && (
-                            <TableRow>
-                                <TableCell colSpan={7} align="center">
-                                    No tickets found.
-                                </TableCell>
-                            </TableRow>
-                        )}
-                    </TableBody>
-                </Table>
-            </TableContainer>
+            <Grid container spacing={2} mb={3}>
+                <Grid item xs={6} sm={3}>
+                    <TextField
+                        select
+                        fullWidth
+                        size="small"
+                        label="Priority"
+                        value={filters.priority_level}
+                        onChange={(e) => setFilters({...filters, priority_level: e.target.value})}
+                    >
+                        <MenuItem value="">All</MenuItem>
+                        <MenuItem value="Low">Low</MenuItem>
+                        <MenuItem value="Medium">Medium</MenuItem>
+                        <MenuItem value="High">High</MenuItem>
+                    </TextField>
+                </Grid>
+                <Grid item xs={6} sm={3}>
+                    <TextField
+                        select
+                        fullWidth
+                        size="small"
+                        label="Category"
+                        value={filters.issue_category}
+                        onChange={(e) => setFilters({...filters, issue_category: e.target.value})}
+                    >
+                        <MenuItem value="">All</MenuItem>
+                        <MenuItem value="General">General</MenuItem>
+                        <MenuItem value="Technical">Technical</MenuItem>
+                        <MenuItem value="Billing">Billing</MenuItem>
+                        <MenuItem value="Feature Request">Feature Request</MenuItem>
+                    </TextField>
+                </Grid>
+                <Grid item xs={6} sm={2}>
+                    <TextField
+                        fullWidth
+                        size="small"
+                        type="date"
+                        label="Created from"
+                        InputLabelProps={{ shrink: true }}
+                        value={filters.created_after}
+                        onChange={(e) => setFilters({...filters, created_after: e.target.value})}
+                    />
+                </Grid>
+                <Grid item xs={6} sm={2}>
+                    <TextField
+                        fullWidth
+                        size="small"
+                        type="date"
+                        label="Created to"
+                        InputLabelProps={{ shrink: true }}
+                        value={filters.created_before}
+                        onChange={(e) => setFilters({...filters, created_before: e.target.value})}
+                    />
+                </Grid>
+                <Grid item xs={12} sm={2}>
+                    <TextField
+                        select
+                        fullWidth
+                        size="small"
+                        label="Order"
+                        value={filters.ordering}
+                        onChange={(e) => setFilters({...filters, ordering: e.target.value})}
+                    >
+                        <MenuItem value="-created_at">Newest first</MenuItem>
+                        <MenuItem value="created_at">Oldest first</MenuItem>
+                    </TextField>
+                </Grid>
+            </Grid>
+
+            <Grid container spacing={2}>
+                {STATUSES.map((status) => (
+                    <Grid item xs={12} md={4} key={status}>
+                        <Paper sx={{ p: 2 }}>
+                            <Box display="flex" justifyContent="space-between" alignItems="center" mb={1}>
+                                <Chip label={status} color={getStatusColor(status)} size="small" />
+                                <Typography variant="body2" color="text.secondary">
+                                    {counts[status] ?? 0}
+                                </Typography>
+                            </Box>
+                            <TableContainer>
+                                <Table size="small">
+                                    <TableHead>
+                                        <TableRow>
+                                            <TableCell>Ticket</TableCell>
+                                            <TableCell>Priority</TableCell>
+                                            <TableCell />
+                                        </TableRow>
+                                    </TableHead>
+                                    <TableBody>
+                                        {columns[status].tickets.map((ticket) => (
+                                            <TableRow key={ticket.ticket_id}>
+                                                <TableCell>
+                                                    <Typography variant="body2">#{ticket.ticket_id} {ticket.title}</Typography>
+                                                    <Typography variant="caption" color="text.secondary">
+                                                        {ticket.customer_name} · {ticket.agent_name || 'Unassigned'}
+                                                    </Typography>
+                                                </TableCell>
+                                                <TableCell>{ticket.priority_level}</TableCell>
+                                                <TableCell>
+                                                    <IconButton onClick={() => handleEditClick(ticket)} size="small">
+                                                        <EditIcon />
+                                                    </IconButton>
+                                                </TableCell>
+                                            </TableRow>
+                                        ))}
+                                        {columns[status].tickets.length === 0 && (
+                                            <TableRow>
+                                                <TableCell colSpan={3} align="center">
+                                                    No tickets found.
+                                                </TableCell>
+                                            </TableRow>
+                                        )}
+                                    </TableBody>
+                                </Table>
+                            </TableContainer>
+                            {columns[status].next && (
+                                <Box textAlign="center" mt={1}>
+                                    <Button size="small" onClick={() => loadMore(status)}>Load more</Button>
+                                </Box>
+                            )}
+                        </Paper>
+                    </Grid>
+                ))}
+            </Grid>
 
             <Dialog open={open} onClose={() => setOpen(false)} maxWidth="sm" fullWidth>
                 <DialogTitle>Edit Ticket #{selectedTicket?.ticket_id}</DialogTitle>
@@ -242,6 +450,15 @@ const TicketBoard = () => {
                                 onChange={(e) => setCreateForm({...createForm, title: e.target.value})}
                             />
                         </Grid>
+                        <Grid item xs={12}>
+                            <TextField
+                                fullWidth
+                                size="small"
+                                label="Find customer"
+                                value={customerQuery}
+                                onChange={(e) => setCustomerQuery(e.target.value)}
+                            />
+                        </Grid>
                         <Grid item xs={12}>
                             <TextField
                                 select
@@ -0,0 +1,169 @@
+"""
+SecurityLog filtering and monthly archives.
+
+`manage.py archive_security_logs` moves rows older than
+SECURITY_LOG_RETENTION_DAYS out of the hot table into one gzip JSON-lines
+file per month under SECURITY_LOG_ARCHIVE_DIR. Archived months remain
+queryable through `core/security-logs/archive/` using the same filters as
+the live list.
+"""
+import datetime
+import gzip
+import json
+import os
+import re
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import DateTimeField
+from .models import SecurityLog
+
+ARCHIVE_NAME = re.compile(r'^security-log-(\d{4}-\d{2})\.jsonl\.gz$')
+
+
+def parse_bound(name, value, end=False):
+    """
+    Parses an ISO date or datetime filter value. Returns (aware datetime,
+    inclusive); a bare date used as an `end` bound becomes the next midnight,
+    exclusive, so the whole day is included.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError({name: 'Expected an ISO date or datetime.'})
+        # A bare end date includes that whole day.
+        moment = datetime.datetime.combine(day + datetime.timedelta(days=1) if end else day, datetime.time.min)
+        end_inclusive = False
+    else:
+        end_inclusive = True
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment, end_inclusive
+
+
+def parse_filters(params):
+    """
+    Validates the list filters: `start`, `end` (ISO date or datetime),
+    `user` (id), `ip` and `event_type`.
+    """
+    filters = {}
+    if params.get('start'):
+        filters['start'], _ = parse_bound('start', params['start'])
+    if params.get('end'):
+        filters['end'], filters['end_inclusive'] = parse_bound('end', params['end'], end=True)
+    if params.get('user'):
+        try:
+            filters['user'] = int(params['user'])
+        except ValueError:
+            raise ValidationError({'user': 'Expected a user id.'})
+    if params.get('ip'):
+        filters['ip'] = params['ip']
+    if params.get('event_type'):
+        filters['event_type'] = params['event_type']
+    return filters
+
+
+def filter_queryset(queryset, filters):
+    if 'start' in filters:
+        queryset = queryset.filter(timestamp__gte=filters['start'])
+    if 'end' in filters:
+        lookup = 'timestamp__lte' if filters['end_inclusive'] else 'timestamp__lt'
+        queryset = queryset.filter(**{lookup: filters['end']})
+    if 'user' in filters:
+        queryset = queryset.filter(user_id=filters['user'])
+    if 'ip' in filters:
+        queryset = queryset.filter(ip_address=filters['ip'])
+    if 'event_type' in filters:
+        queryset = queryset.filter(event_type=filters['event_type'])
+    return queryset
+
+
+def _matches(record, timestamp, filters):
+    if 'start' in filters and timestamp < filters['start']:
+        return False
+    if 'end' in filters and (timestamp > filters['end'] if filters['end_inclusive'] else timestamp >= filters['end']):
+        return False
+    if 'user' in filters and record['user_id'] != filters['user']:
+        return False
+    if 'ip' in filters and record['ip_address'] != filters['ip']:
+        return False
+    if 'event_type' in filters and record['event_type'] != filters['event_type']:
+        return False
+    return True
+
+
+# --- Archive files ---
+
+def archive_dir():
+    return getattr(settings, 'SECURITY_LOG_ARCHIVE_DIR', settings.BASE_DIR / 'archive' / 'security_logs')
+
+
+def archive_path(month):
+    return os.path.join(archive_dir(), f'security-log-{month}.jsonl.gz')
+
+
+def available_months():
+    if not os.path.isdir(archive_dir()):
+        return []
+    return sorted(
+        match.group(1) for match in map(ARCHIVE_NAME.match, os.listdir(archive_dir())) if match
+    )
+
+
+def _record(log):
+    return {
+        'log_id': log.log_id,
+        'user_id': log.user_id,
+        # Same rendering as SecurityLogSerializer, frozen at archive time.
+        'user': str(log.user) if log.user_id else None,
+        'event_type': log.event_type,
+        'ip_address': log.ip_address,
+        'timestamp': DateTimeField().to_representation(log.timestamp),
+        'description': log.description,
+    }
+
+
+def archive_older_than(cutoff, chunk_size=5000):
+    """
+    Moves rows with timestamp < cutoff into their monthly archive files, one
+    chunk at a time: a chunk is appended (as its own gzip member) and flushed
+    before its rows are deleted. Returns {month: rows archived}.
+    """
+    os.makedirs(archive_dir(), exist_ok=True)
+    archived = {}
+    old = SecurityLog.objects.filter(timestamp__lt=cutoff).select_related('user').order_by('timestamp', 'log_id')
+    while True:
+        chunk = list(old[:chunk_size])
+        if not chunk:
+            return archived
+        by_month = {}
+        for log in chunk:
+            by_month.setdefault(log.timestamp.strftime('%Y-%m'), []).append(_record(log))
+        for month, records in by_month.items():
+            with gzip.open(archive_path(month), 'at', encoding='utf-8') as archive:
+                archive.writelines(json.dumps(record) + '\n' for record in records)
+            archived[month] = archived.get(month, 0) + len(records)
+        with transaction.atomic():
+            SecurityLog.objects.filter(log_id__in=[log.log_id for log in chunk]).delete()
+
+
+def read_archive(month, filters, limit=None):
+    """Yields archived records of `month` matching `filters`, oldest first."""
+    path = archive_path(month)
+    if not os.path.exists(path):
+        return
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        for line in archive:
+            record = json.loads(line)
+            if not _matches(record, parse_datetime(record['timestamp']), filters):
+                continue
+            record.pop('user_id')
+            yield record
+            if limit is not None:
+                limit -= 1
+                if not limit:
+                    return
@@ -0,0 +1,22 @@
+"""
+Async variants of core views, routed in place of the DRF ones when
+ASYNC_VIEWS is on (the default under server/asgi.py).
+"""
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from .concurrency import authenticate
+
+
+@require_GET
+async def current_user(request):
+    """Same response as CurrentUserView; a cached user (core.authentication) needs no query at all."""
+    error = await authenticate(request)
+    if error is not None:
+        return error
+    user = request.user
+    return JsonResponse({
+        'id': user.id,
+        'username': user.username,
+        'role': user.role,
+        'is_superuser': user.is_superuser
+    })
@@ -0,0 +1,120 @@
+"""
+SecurityLog writer.
+
+All audit events go through `log_security_event`. With SECURITY_LOG_MODE =
+'sync' every event is a single INSERT in the request, as before. In
+'buffered' mode (the default) events are queued in-process and written with
+one bulk_create when SECURITY_LOG_BUFFER_SIZE events have piled up or every
+SECURITY_LOG_FLUSH_INTERVAL seconds, and once more when the process exits.
+That takes the audit writes off the request path and out of SQLite's
+writer lock.
+
+If a flush fails because the database is unavailable (e.g. locked), the
+batch is appended to SECURITY_LOG_FALLBACK_FILE as JSON lines instead of
+being dropped; `manage.py replay_security_log` loads it back.
+"""
+import atexit
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import SecurityLog
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class SecurityLogBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, entry):
+        with self._lock:
+            self._pending.append(entry)
+            full = len(self._pending) >= _setting('SECURITY_LOG_BUFFER_SIZE', 100)
+            if self._thread is None:
+                self._start()
+        if full:
+            self._wakeup.set()
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='security-log-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(_setting('SECURITY_LOG_FLUSH_INTERVAL', 2.0))
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+    def flush(self):
+        """Writes everything buffered so far; returns the number of events written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                SecurityLog.objects.bulk_create(batch)
+            except DatabaseError:
+                logger.exception("Could not write %s security log events, using fallback file", len(batch))
+                write_fallback(batch)
+            return len(batch)
+
+
+_buffer = SecurityLogBuffer()
+
+
+def log_security_event(event_type, user=None, ip_address=None, description=None):
+    """Records a SecurityLog event according to SECURITY_LOG_MODE."""
+    entry = SecurityLog(
+        user_id=user.pk if user is not None and user.is_authenticated else None,
+        event_type=event_type,
+        ip_address=ip_address,
+        description=description,
+        timestamp=timezone.now(),
+    )
+    if _setting('SECURITY_LOG_MODE', 'buffered') == 'sync':
+        entry.save()
+    else:
+        _buffer.add(entry)
+    return entry
+
+
+def flush():
+    return _buffer.flush()
+
+
+def write_fallback(entries):
+    path = _setting('SECURITY_LOG_FALLBACK_FILE', settings.BASE_DIR / 'security_log_fallback.jsonl')
+    with open(path, 'a', encoding='utf-8') as fallback:
+        for entry in entries:
+            fallback.write(json.dumps({
+                'user_id': entry.user_id,
+                'event_type': entry.event_type,
+                'ip_address': entry.ip_address,
+                'description': entry.description,
+                'timestamp': entry.timestamp.isoformat(),
+            }) + '\n')
+
+
+def read_fallback(path):
+    with open(path, encoding='utf-8') as fallback:
+        for line in fallback:
+            if line.strip():
+                data = json.loads(line)
+                data['timestamp'] = parse_datetime(data['timestamp'])
+                yield SecurityLog(**data)
@@ -0,0 +1,102 @@
+"""
+JWT authentication with an in-process user cache.
+
+simplejwt's JWTAuthentication loads the User row on every request. Access
+tokens are only signed user ids, so the row is what carries the role and
+`is_active` the permission classes decide on. CachedJWTAuthentication keeps
+recently seen users in a bounded LRU with a TTL (AUTH_USER_CACHE_SIZE,
+AUTH_USER_CACHE_TTL seconds):
+
+- Saving or deleting a User drops it from the cache of the process that
+  made the change (core.signals).
+- Other processes, and changes that bypass signals (QuerySet.update), pick
+  it up within AUTH_USER_CACHE_TTL seconds. That is the bound on how long a
+  role change or a deactivation can take to apply everywhere.
+
+Each request gets its own copy of the cached user, so nothing a view does to
+`request.user` leaks into other requests.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.utils.crypto import constant_time_compare
+from rest_framework.authentication import BaseAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+
+class UserCache:
+    """Thread-safe LRU of User instances keyed by str(id): token claims may carry the id as a string."""
+
+    def __init__(self):
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+
+    @property
+    def size(self):
+        return getattr(settings, 'AUTH_USER_CACHE_SIZE', 1000)
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._users[user_id]
+                return None
+            self._users.move_to_end(user_id)
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        if self.ttl <= 0 or self.size <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._users[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        user = user_cache.get(user_id) if user_id is not None else None
+        if user is None:
+            # Also runs the active and revoked-password checks.
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+class MetricsTokenAuthentication(BaseAuthentication):
+    """`Authorization: Bearer <METRICS_TOKEN>`, for Prometheus scrapers (see core.metrics)."""
+    def authenticate(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if token and constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+            return AnonymousUser(), 'metrics'
+        return None
+
+    def authenticate_header(self, request):
+        return 'Bearer realm="api"'
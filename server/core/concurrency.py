@@ -0,0 +1,50 @@
+"""
+Helpers for the async views served in ASGI mode (server/asgi.py).
+
+Django's async ORM covers single queries, but it runs them one at a time on
+a shared thread. Anything bigger, such as simplejwt authentication or a
+webhook handler with several writes, goes through `run_sync`. That runs the
+call on a bounded pool of ASYNC_THREAD_POOL_SIZE threads, so a traffic spike
+queues work instead of opening one thread and one database connection per
+request. Each call releases its thread's connection afterwards, just like
+the end of a request does.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from .authentication import CachedJWTAuthentication
+
+# Threads are only started as work arrives.
+executor = ThreadPoolExecutor(max_workers=getattr(settings, 'ASYNC_THREAD_POOL_SIZE', 8), thread_name_prefix='async-views')
+
+
+def _call(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_sync(func, *args, **kwargs):
+    """Awaits `func(*args, **kwargs)` run on the bounded pool."""
+    return await sync_to_async(_call, thread_sensitive=False, executor=executor)(func, args, kwargs)
+
+
+async def authenticate(request):
+    """
+    Sets request.user from the JWT like the DRF views do. Returns None on
+    success, or the 401 response to send.
+    """
+    try:
+        result = await run_sync(CachedJWTAuthentication().authenticate, request)
+    except AuthenticationFailed as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        return JsonResponse(detail, status=401)
+    if result is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    request.user, request.auth = result
+    return None
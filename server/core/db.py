@@ -0,0 +1,179 @@
+"""
+Database profiles (DATABASE_PROFILE in settings).
+
+'sqlite' is the default single-file setup, tuned for a web server.
+`configure_sqlite` runs the SQLITE_PRAGMAS on every new connection
+(core.signals):
+
+- WAL journaling, so dashboard reads no longer wait for webhook and
+  SecurityLog writes, and writes don't wait for reads;
+- synchronous=NORMAL, which is durable in WAL mode except for the last
+  commits before a power loss;
+- busy_timeout, so a writer waits for the lock instead of failing with
+  "database is locked";
+- a memory-mapped file and a bigger page cache for reads.
+
+Transactions start IMMEDIATE (settings OPTIONS). A transaction that reads
+and then writes takes the write lock up front. Otherwise, upgrading its
+lock could fail straight away, whatever the busy_timeout.
+
+'postgres' uses persistent connections (CONN_MAX_AGE) or, with
+POSTGRES_POOL_SIZE, a psycopg pool. Django checks a reused connection before
+each request (CONN_HEALTH_CHECKS). When POSTGRES_REPLICA_HOST is set,
+DatabaseRouter sends the reads of GET/HEAD requests to the 'replica' alias.
+ReplicaReadMiddleware marks those requests. Writes, reads during other
+methods, and reads inside a transaction stay on 'default', so a request
+always sees its own writes.
+
+Analytics reads (supervisor stats, security logs) go to a separate
+read-only 'analytics' alias. Views opt in with core.mixins.AnalyticsMixin,
+which routes the handler's reads there and reports how old the data is in
+the X-Data-As-Of and X-Data-Lag-Seconds headers. A long report then holds
+no lock and no connection that webhook ingestion needs:
+
+- sqlite: with ANALYTICS_SNAPSHOT on, a copy of the database refreshed by
+  `manage.py refresh_analytics_snapshot`. Until the first snapshot exists,
+  analytics reads use 'default'.
+- postgres: POSTGRES_ANALYTICS_HOST, else the replica, else the primary,
+  over a read-only connection with its own statement timeout.
+
+Without an 'analytics' alias, analytics reads use 'default' and the data is
+current.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+REPLICA = 'replica'
+ANALYTICS = 'analytics'
+AS_OF_HEADER = 'X-Data-As-Of'
+LAG_HEADER = 'X-Data-Lag-Seconds'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_analytics_reads = ContextVar('analytics_reads', default=False)
+
+
+def configure_sqlite(connection):
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if connection.alias == ANALYTICS:
+        # Remember which snapshot file this connection has open (see analytics_freshness).
+        connection.snapshot_inode = os.stat(snapshot_path()).st_ino
+        # The snapshot is opened read-only; it keeps the journal mode it was written with.
+        pragmas = {name: value for name, value in pragmas.items() if name not in ('journal_mode', 'synchronous')}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Within the block, reads outside transactions may go to the replica."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def analytics_reads(enabled=True):
+    """Within the block, reads outside transactions go to the analytics alias."""
+    token = _analytics_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _analytics_reads.reset(token)
+
+
+def snapshot_path():
+    """The SQLite analytics snapshot file, or None when there is none."""
+    database = settings.DATABASES.get(ANALYTICS)
+    if database is None or database['ENGINE'] != 'django.db.backends.sqlite3':
+        return None
+    return settings.ANALYTICS_SNAPSHOT_PATH
+
+
+def analytics_available():
+    if ANALYTICS not in settings.DATABASES:
+        return False
+    path = snapshot_path()
+    return path is None or os.path.exists(path)
+
+
+def refresh_snapshot():
+    """
+    Copies 'default' into the analytics snapshot with SQLite's online backup
+    and swaps it in atomically. Readers keep the file they opened. Returns
+    the new snapshot's path.
+    """
+    path = str(settings.ANALYTICS_SNAPSHOT_PATH)
+    partial = f'{path}.partial'
+    if os.path.exists(partial):
+        os.remove(partial)
+    source = sqlite3.connect(str(settings.DATABASES['default']['NAME']))
+    target = sqlite3.connect(partial)
+    try:
+        source.backup(target)
+        # Read-only readers can't use a WAL file without its -shm index.
+        target.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        target.close()
+        source.close()
+    os.replace(partial, path)
+    return path
+
+
+def analytics_freshness():
+    """
+    When the analytics data was current, as an aware datetime, or None when
+    analytics reads see live data. Call it before the reads: it also moves
+    this thread's connection to the latest snapshot.
+    """
+    if not analytics_available():
+        return None
+    path = snapshot_path()
+    if path is not None:
+        stat = os.stat(path)
+        connection = connections[ANALYTICS]
+        if connection.connection is not None and getattr(connection, 'snapshot_inode', None) != stat.st_ino:
+            connection.close()
+        return datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc)
+    with connections[ANALYTICS].cursor() as cursor:
+        # NULL on a primary, which is always current.
+        cursor.execute('SELECT pg_last_xact_replay_timestamp()')
+        return cursor.fetchone()[0]
+
+
+def set_freshness(response, as_of):
+    """Adds the headers saying the data was current at `as_of` (None: now) and how long ago that was."""
+    as_of = as_of or timezone.now()
+    response[AS_OF_HEADER] = as_of.isoformat()
+    response[LAG_HEADER] = str(max(0, round((timezone.now() - as_of).total_seconds())))
+    return response
+
+
+class DatabaseRouter:
+    def db_for_read(self, model, **hints):
+        if connections['default'].in_atomic_block:
+            return None
+        if _analytics_reads.get() and analytics_available():
+            return ANALYTICS
+        if _replica_reads.get() and REPLICA in settings.DATABASES:
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica and the analytics copy hold the primary's rows.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
@@ -0,0 +1,65 @@
+"""
+Short-lived elevation after a password re-check.
+
+Opening a ticket's details requires the user to re-enter their password.
+Checking it costs a full PBKDF2 run, so `core/verify-password/` does it once
+and returns a signed elevation token (django.core.signing) that is accepted
+for AUTH_ELEVATION_TTL seconds instead of asking again:
+
+    X-Elevation-Token: <token>
+
+A token names the user and a scope ('tickets'), so it is useless for anyone
+else or for any other purpose. It also carries the user's session auth hash,
+derived from the password hash, so changing the password revokes every
+outstanding token. Verification is throttled per user and per IP
+(VerifyPasswordUserThrottle, VerifyPasswordIPThrottle), and failures and
+throttled attempts are written to the SecurityLog.
+"""
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from rest_framework.throttling import SimpleRateThrottle
+
+SALT = 'core.elevation'
+HEADER = 'HTTP_X_ELEVATION_TOKEN'
+SCOPES = ('tickets',)
+
+
+def ttl():
+    return getattr(settings, 'AUTH_ELEVATION_TTL', 600)
+
+
+def issue(user, scope):
+    return signing.dumps({'user': user.pk, 'scope': scope, 'auth': user.get_session_auth_hash()}, salt=SALT)
+
+
+def is_elevated(request, scope):
+    """True if the request carries a valid, unexpired elevation token for this user and scope."""
+    token = request.META.get(HEADER)
+    if not token or not request.user.is_authenticated:
+        return False
+    try:
+        claims = signing.loads(token, salt=SALT, max_age=ttl())
+    except signing.BadSignature:
+        return False
+    return (
+        claims.get('user') == request.user.pk
+        and claims.get('scope') == scope
+        and constant_time_compare(claims.get('auth', ''), request.user.get_session_auth_hash())
+    )
+
+
+class VerifyPasswordUserThrottle(SimpleRateThrottle):
+    scope = 'verify_password_user'
+
+    def get_cache_key(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': request.user.pk}
+
+
+class VerifyPasswordIPThrottle(SimpleRateThrottle):
+    scope = 'verify_password_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.archive import archive_older_than
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves security log rows older than the retention window into gzip "
+        "JSON-lines archives, one file per month."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Keep this many days in the database (defaults to SECURITY_LOG_RETENTION_DAYS).',
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.SECURITY_LOG_RETENTION_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        archived = archive_older_than(cutoff, chunk_size=options['chunk_size'])
+        for month, count in sorted(archived.items()):
+            self.stdout.write(f"{month}: {count} events archived")
+        self.stdout.write(self.style.SUCCESS(f"Archived {sum(archived.values())} events older than {cutoff:%Y-%m-%d}."))
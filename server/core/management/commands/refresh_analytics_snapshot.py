@@ -0,0 +1,41 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core import db
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the SQLite database to the analytics snapshot that supervisor "
+        "stats and security logs read (ANALYTICS_SNAPSHOT=1, see core.db). "
+        "Runs once, or every --interval seconds."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=None,
+            help=f'Keep refreshing this often (ANALYTICS_SNAPSHOT_INTERVAL is {settings.ANALYTICS_SNAPSHOT_INTERVAL}).',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Snapshots are for the SQLite profile; on Postgres, analytics read a replica.")
+        interval = options['interval']
+        while True:
+            started = time.monotonic()
+            try:
+                path = db.refresh_snapshot()
+            except Exception:
+                if interval is None:
+                    raise
+                logger.exception("Analytics snapshot refresh failed")
+            else:
+                self.stdout.write(f"Snapshot written to {path} in {time.monotonic() - started:.1f}s.")
+            if interval is None:
+                return
+            time.sleep(max(0, interval - (time.monotonic() - started)))
@@ -0,0 +1,26 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.audit import read_fallback
+from core.models import SecurityLog
+
+
+class Command(BaseCommand):
+    help = "Loads security log events that were written to the fallback file back into the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None, help='Fallback file (defaults to SECURITY_LOG_FALLBACK_FILE).')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.SECURITY_LOG_FALLBACK_FILE
+        if not os.path.exists(path):
+            self.stdout.write("No fallback file, nothing to replay.")
+            return
+        # Rename first so events written while we replay land in a fresh file.
+        replaying = f"{path}.replaying"
+        os.replace(path, replaying)
+        entries = list(read_fallback(replaying))
+        SecurityLog.objects.bulk_create(entries, batch_size=500)
+        os.remove(replaying)
+        self.stdout.write(self.style.SUCCESS(f"Replayed {len(entries)} security log events."))
@@ -0,0 +1,222 @@
+"""
+Request metrics in Prometheus text format.
+
+MetricsMiddleware times every request and labels it with the resolved view
+name (e.g. `customer-list`), so label values stay bounded whatever the URL.
+Per view and method it records:
+
+- latency and SQL query count histograms;
+- total SQL time, serializer time (core.serializers.FieldsProjectionMixin)
+  and response bytes.
+
+SQL is measured by an execute wrapper that core.signals installs on every
+database connection. The wrapper reads the current request from a context
+variable, so queries run from async views through sync_to_async are
+counted too. Without a request it only costs the lookup.
+
+`core/metrics/` serves the numbers, plus the response cache hit/miss
+counters (core.response_cache). It answers admins and scrapers sending
+`Authorization: Bearer <METRICS_TOKEN>`. Like the response cache counters,
+the numbers are per process: scrape every worker.
+
+Requests slower than METRICS_SLOW_REQUEST_MS are logged with their slowest
+queries. Only the METRICS_SLOW_REQUEST_QUERIES slowest are kept while the
+request runs.
+
+The cost per request is a few clock reads and one locked dict update. The
+cost per query is two clock reads.
+"""
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """What one request spent; filled in by the execute wrapper and the serializers."""
+    __slots__ = ('queries', 'sql_seconds', 'serializer_seconds', 'slowest', 'keep')
+
+    def __init__(self, keep):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.slowest = []
+        self.keep = keep
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.sql_seconds += seconds
+        if self.keep:
+            # (seconds, order, sql): the order breaks ties without comparing SQL.
+            entry = (seconds, self.queries, sql)
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+
+def slow_request_ms():
+    return getattr(settings, 'METRICS_SLOW_REQUEST_MS', 1000)
+
+
+def start_request():
+    keep = getattr(settings, 'METRICS_SLOW_REQUEST_QUERIES', 5) if slow_request_ms() else 0
+    metrics = RequestMetrics(keep)
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def instrument(connection):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+def add_serializer_time(seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.serializer_seconds += seconds
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, labels, value):
+        self.counts[labels][bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = defaultdict(int)
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = defaultdict(float)
+        self.serializer_seconds = defaultdict(float)
+        self.response_bytes = defaultdict(int)
+
+    def record(self, view, method, status, seconds, metrics, size):
+        labels = (view, method)
+        with self._lock:
+            self.requests[view, method, str(status)] += 1
+            self.duration.observe(labels, seconds)
+            self.queries.observe(labels, metrics.queries)
+            self.sql_seconds[labels] += metrics.sql_seconds
+            self.serializer_seconds[labels] += metrics.serializer_seconds
+            self.response_bytes[labels] += size
+
+    def totals(self):
+        """(requests, SQL queries, SQL seconds) since the last reset, over every view."""
+        with self._lock:
+            return sum(self.requests.values()), sum(self.queries.sums.values()), sum(self.sql_seconds.values())
+
+    def render(self, cache_stats):
+        lines = []
+        with self._lock:
+            _counter(lines, 'http_requests_total', 'Requests by view, method and status.',
+                     self.requests, ('view', 'method', 'status'))
+            _histogram(lines, 'http_request_duration_seconds', 'Time to the response, per view.', self.duration)
+            _histogram(lines, 'http_request_sql_queries', 'SQL queries per request, per view.', self.queries)
+            _counter(lines, 'http_request_sql_seconds_total', 'Time spent in SQL.', self.sql_seconds, ('view', 'method'))
+            _counter(lines, 'http_request_serializer_seconds_total', 'Time spent serializing.',
+                     self.serializer_seconds, ('view', 'method'))
+            _counter(lines, 'http_response_bytes_total', 'Response body bytes (not counting streams).',
+                     self.response_bytes, ('view', 'method'))
+        results = {}
+        for endpoint, counts in cache_stats['endpoints'].items():
+            results[endpoint, 'hit'] = counts['hits']
+            results[endpoint, 'miss'] = counts['misses']
+        _counter(lines, 'response_cache_requests_total', 'Response cache lookups.', results, ('endpoint', 'result'))
+        _counter(lines, 'response_cache_invalidations_total', 'Response cache invalidations by model.',
+                 {(label,): count for label, count in cache_stats['invalidations'].items()}, ('model',))
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}'
+
+
+def _counter(lines, name, help_text, values, label_names):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+    for labels, value in sorted(values.items()):
+        lines.append(f'{name}{_labels(label_names, labels)} {value}')
+
+
+def _histogram(lines, name, help_text, histogram):
+    label_names = ('view', 'method')
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for labels, counts in sorted(histogram.counts.items()):
+        cumulative = 0
+        for bound, count in zip((*histogram.buckets, '+Inf'), counts):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f'{name}_bucket{_labels(label_names, labels, le)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(label_names, labels)} {histogram.sums[labels]}')
+        lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+
+
+registry = Registry()
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def finish_request(request, response, started, metrics):
+    """Records a finished request and logs it if it was slow."""
+    seconds = time.perf_counter() - started
+    view = view_name(request)
+    size = 0 if response.streaming else len(response.content)
+    registry.record(view, request.method, response.status_code, seconds, metrics, size)
+
+    threshold = slow_request_ms()
+    if threshold and seconds * 1000 >= threshold:
+        slowest = ''.join(
+            f'\n  {query_seconds * 1000:.1f} ms  {sql}'
+            for query_seconds, _, sql in sorted(metrics.slowest, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms, serializers %.0f ms%s",
+            request.method, request.get_full_path(), view, seconds * 1000,
+            metrics.queries, metrics.sql_seconds * 1000, metrics.serializer_seconds * 1000, slowest,
+        )
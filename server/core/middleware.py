@@ -0,0 +1,51 @@
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+from . import db, metrics
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@sync_and_async_middleware
+def ReplicaReadMiddleware(get_response):
+    """Lets the reads of safe requests use the read replica (see core.db)."""
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with db.replica_reads(request.method in SAFE_METHODS):
+                return await get_response(request)
+    else:
+        def middleware(request):
+            with db.replica_reads(request.method in SAFE_METHODS):
+                return get_response(request)
+    return middleware
+
+
+@sync_and_async_middleware
+def MetricsMiddleware(get_response):
+    """Records latency, SQL and serializer time and response size per view (see core.metrics)."""
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        raise MiddlewareNotUsed
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            started = time.perf_counter()
+            request_metrics, token = metrics.start_request()
+            try:
+                response = await get_response(request)
+            finally:
+                metrics.end_request(token)
+            metrics.finish_request(request, response, started, request_metrics)
+            return response
+    else:
+        def middleware(request):
+            started = time.perf_counter()
+            request_metrics, token = metrics.start_request()
+            try:
+                response = get_response(request)
+            finally:
+                metrics.end_request(token)
+            metrics.finish_request(request, response, started, request_metrics)
+            return response
+    return middleware
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_securitylog_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['timestamp'], name='securitylog_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['user', 'timestamp'], name='securitylog_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securitylog',
+            index=models.Index(fields=['event_type', 'timestamp'], name='securitylog_event_time_idx'),
+        ),
+    ]
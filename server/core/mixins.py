@@ -0,0 +1,309 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from . import db, metrics, renderers
+from .serializers import FieldsProjectionMixin
+
+
+def related_paths(serializer):
+    """
+    Returns the (select_related, prefetch_related) lookups a bound serializer
+    needs, derived from its fields' `source` paths.
+
+    `source='customer.full_name'` walks the `customer` FK, a StringRelatedField
+    on `user` needs the user row, and many-to-many fields are prefetched.
+    Primary-key-only related fields read the local `<fk>_id` column and need
+    nothing.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = serializer.Meta.model
+    select, prefetch = set(), set()
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        if isinstance(field, (ManyRelatedField, serializers.ListSerializer)):
+            prefetch.add('__'.join(field.source_attrs))
+            continue
+
+        attrs = field.source_attrs
+        renders_relation = isinstance(field, serializers.BaseSerializer) or (
+            isinstance(field, RelatedField) and not field.use_pk_only_optimization()
+        )
+        if not renders_relation:
+            # The last attribute is the value itself; only the hops before it are joins.
+            attrs = attrs[:-1]
+
+        current, path = model, []
+        for attr in attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation or model_field.many_to_many or model_field.one_to_many:
+                break
+            path.append(attr)
+            current = model_field.related_model
+        if path:
+            select.add('__'.join(path))
+
+    return sorted(select), sorted(prefetch)
+
+
+class RelatedFieldsMixin:
+    """
+    ViewSet mixin that joins/prefetches whatever the serializer reads through
+    relations, so list endpoints run a constant number of queries regardless
+    of the row count. Respects `?fields=` projection: dropped fields add no joins.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        select, prefetch = related_paths(self.get_serializer())
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class AnalyticsMixin:
+    """
+    Marks a reporting view: the handler's reads go to the analytics database
+    (see core.db) and responses say how fresh the data is. Authentication
+    and permission checks still read the primary, so a user created a
+    moment ago can sign in before the next snapshot.
+    """
+    _analytics_reads = None
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # finalize_response is skipped when DRF re-raises an unhandled
+            # exception; don't leave this thread reading the analytics copy.
+            if self._analytics_reads is not None:
+                self._analytics_reads.close()
+                self._analytics_reads = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Taken before the reads, so a refresh during the request can only make the data newer.
+        self.data_as_of = db.analytics_freshness()
+        self._analytics_reads = ExitStack()
+        self._analytics_reads.enter_context(db.analytics_reads())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._analytics_reads is not None:
+            self._analytics_reads.close()
+            self._analytics_reads = None
+            db.set_freshness(response, self.data_as_of)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+# --- Fast list path ---
+
+_SKIP = object()
+
+
+class ValuesPlan:
+    """
+    How to build a serializer's output from `.values()` rows: the columns
+    to select, and per output field its column, converter and what to do
+    when a nullable relation on its source path is empty.
+    """
+
+    def __init__(self):
+        self.columns = []
+        self.fields = []
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return path
+
+    def render(self, rows):
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert, guards, missing in self.fields:
+                if guards and any(row[guard] is None for guard in guards):
+                    # Field.get_attribute: a missing attribute means the default, null or no key.
+                    if missing is _SKIP:
+                        continue
+                    value = missing() if callable(missing) else missing
+                else:
+                    value = row[column]
+                    if value is not None and convert is not None:
+                        value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+def _plain_to_representation(serializer):
+    """True unless something between the serializer and DRF's Serializer overrides to_representation."""
+    for cls in type(serializer).__mro__:
+        if cls is serializers.Serializer:
+            return True
+        # FieldsProjectionMixin only times the call.
+        if 'to_representation' in cls.__dict__ and cls is not FieldsProjectionMixin:
+            return False
+    return False
+
+
+def _iso_datetime(field):
+    """DateTimeField.to_representation for ISO 8601 output, with the timezone looked up once instead of per row."""
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+
+    def convert(value):
+        if field_timezone is None or not timezone.is_aware(value):
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+# Serializer fields that return the value unchanged when the column already has their type.
+_IDENTITY = (
+    (serializers.CharField, ('CharField', 'TextField')),
+    (serializers.IntegerField, ('AutoField', 'BigAutoField', 'SmallAutoField', 'IntegerField', 'BigIntegerField',
+                                'SmallIntegerField', 'PositiveIntegerField', 'PositiveBigIntegerField',
+                                'PositiveSmallIntegerField')),
+)
+
+
+def _converter(field, model_field):
+    if type(field) is serializers.ReadOnlyField:
+        return None
+    for field_class, internal_types in _IDENTITY:
+        if (
+            isinstance(field, field_class)
+            and type(field).to_representation is field_class.to_representation
+            and model_field.get_internal_type() in internal_types
+        ):
+            return None
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if type(field) is serializers.DateTimeField and isinstance(output_format, str) and output_format.lower() == ISO_8601:
+        return _iso_datetime(field)
+    return field.to_representation
+
+
+def values_plan(serializer):
+    """
+    A ValuesPlan giving the same output as `serializer`, or None when some
+    readable field isn't a plain column: many-to-many, nested serializers,
+    methods, properties, or relations rendered as more than their key.
+    """
+    if not _plain_to_representation(serializer):
+        return None
+    model = serializer.Meta.model
+    plan = ValuesPlan()
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or isinstance(field, (ManyRelatedField, serializers.BaseSerializer)):
+            return None
+        attrs = field.source_attrs
+
+        if isinstance(field, RelatedField):
+            if not isinstance(field, PrimaryKeyRelatedField) or len(attrs) != 1:
+                return None
+            try:
+                model_field = model._meta.get_field(attrs[0])
+            except FieldDoesNotExist:
+                return None
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                return None
+            # `.values('agent')` is the key, as PKOnlyObject(pk=agent_id) renders.
+            convert = field.pk_field.to_representation if field.pk_field is not None else None
+            plan.fields.append((field.field_name, plan.column(attrs[0]), convert, (), None))
+            continue
+
+        current, guards = model, []
+        for index, attr in enumerate(attrs):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if index == len(attrs) - 1:
+                if model_field.is_relation or not model_field.concrete:
+                    return None
+                break
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                return None
+            if model_field.null:
+                guards.append(plan.column('__'.join(attrs[:index + 1])))
+            current = model_field.related_model
+
+        missing = None
+        if guards:
+            # Field.get_attribute, when a relation on the way is None.
+            if field.default is not empty:
+                missing = field.get_default
+            elif field.allow_null:
+                missing = None
+            elif not field.required:
+                missing = _SKIP
+            else:
+                return None
+        convert = _converter(field, model_field)
+        plan.fields.append((field.field_name, plan.column('__'.join(attrs)), convert, tuple(guards), missing))
+    return plan
+
+
+class FastListMixin:
+    """
+    Fast path for `list` on high-volume endpoints (FAST_LIST_SERIALIZATION).
+
+    Rows are read with `.values()`, joined columns included, and turned into
+    the serializer's output by a ValuesPlan. This skips model instances and
+    DRF's per-field machinery. Responses are rendered with orjson (see
+    core.renderers).
+
+    The output is the same, byte for byte: same keys, order, formatting and
+    pagination. `manage.py check_fast_lists` checks that. Because the plan is
+    derived from the serializer, `?fields=` still applies. A serializer with
+    a field that isn't a plain column takes the serializer path as before,
+    e.g. a customer's campaigns unless `?fields=` leaves them out.
+    """
+    renderer_classes = [
+        renderers.FastJSONRenderer if renderer is JSONRenderer else renderer
+        for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+    ]
+
+    def list(self, request, *args, **kwargs):
+        plan = None
+        if getattr(settings, 'FAST_LIST_SERIALIZATION', True) and isinstance(request.accepted_renderer, JSONRenderer):
+            plan = values_plan(self.get_serializer())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        if self.paginator is not None:
+            # The cursor is read from the row's ordering columns.
+            for name in self.paginator.get_ordering(request, queryset, self):
+                plan.column(name.lstrip('-'))
+        rows = queryset.values(*plan.columns)
+        page = self.paginate_queryset(rows)
+
+        started = time.perf_counter()
+        data = plan.render(rows if page is None else page)
+        metrics.add_serializer_time(time.perf_counter() - started)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
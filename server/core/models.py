@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -34,8 +35,16 @@ class SecurityLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='security_logs')
     event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when a buffered batch is written (see core.audit).
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
     description = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp'], name='securitylog_time_idx'),
+            models.Index(fields=['user', 'timestamp'], name='securitylog_user_time_idx'),
+            models.Index(fields=['event_type', 'timestamp'], name='securitylog_event_time_idx'),
+        ]
+
     def __str__(self):
         return f"{self.event_type} - {self.user} - {self.timestamp}"
@@ -0,0 +1,22 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination used by every list endpoint.
+
+    Each page is a `WHERE <ordering field> < <cursor> ORDER BY ... LIMIT n`
+    query, so page 1000 costs the same as page 1. Views pick their ordering
+    with a `cursor_ordering` attribute; it should start with an indexed,
+    append-only column (auto PK or creation timestamp).
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = '-pk'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
@@ -11,3 +11,7 @@ class IsSupervisor(permissions.BasePermission):
 class IsAgent(permissions.BasePermission):
     def has_permission(self, request, view):
         return request.user and request.user.is_authenticated and (request.user.role in ['Admin', 'Supervisor', 'Agent'] or request.user.is_superuser)
+
+class IsMetricsScraper(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.auth == 'metrics'
@@ -0,0 +1,53 @@
+"""
+JSON rendering with orjson, when it is installed.
+
+FastJSONRenderer writes the same bytes as DRF's JSONRenderer:
+
+- compact separators and UTF-8 text;
+- \\u2028 and \\u2029 escaped;
+- datetimes and anything else JSON has no type for go through DRF's encoder.
+
+It is just several times faster on large lists. It falls back to
+JSONRenderer in these cases:
+
+- orjson is missing, or FAST_LIST_SERIALIZATION is off;
+- the client asks for indented output;
+- UNICODE_JSON/COMPACT_JSON are changed;
+- the data has something orjson refuses, e.g. an integer above 64 bits or a
+  non-string key.
+
+One caveat: floats that Python prints in exponent form (below 1e-4, or
+1e16 and up) are spelled differently, e.g. 1e-05 vs 0.00001. The lists
+using this renderer have no float columns.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def enabled():
+    return orjson is not None and getattr(settings, 'FAST_LIST_SERIALIZATION', True)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None or not enabled() or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        encoder = self.encoder_class()
+        try:
+            ret = orjson.dumps(data, default=encoder.default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if LINE_SEPARATOR in ret or PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028').replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
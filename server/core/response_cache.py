@@ -0,0 +1,206 @@
+"""
+Response cache for read-heavy endpoints.
+
+Campaigns, users, customers and the supervisor stats are read far more
+often than they change. `cached_response` wraps a view's handler and keeps
+its response data in the 'responses' cache (RESPONSE_CACHE_BACKEND: local
+memory or files, see settings.CACHES). It runs after authentication and the
+permission checks. Entries are keyed by:
+
+- the endpoint name;
+- a scope, by default the user's role. Endpoints whose data depends on who
+  asks, such as an agent's own customers, pass a `scope` function;
+- the query string (pagination cursor, filters, `?fields=`);
+- the current generation of every model the endpoint reads.
+
+Endpoints declare the models they read with `register` (see the app's
+signals.py). A save or delete of one of those models, or an m2m change
+through one of its join tables, bumps that model's generation once the
+transaction commits. Every entry built from older data then stops matching
+and ages out, so nothing has to find and delete keys. Writes that send no
+signals (QuerySet.update, bulk_create, raw SQL) call `invalidate` themselves.
+
+Join tables are only tracked through m2m_changed. A post_delete receiver
+would make Django fetch and signal every row of a bulk DELETE.
+
+Generations live in the same cache as the entries. With the file backend,
+every worker on the host shares entries and invalidations. Local memory is
+per process, so other processes notice a change only when their entries
+expire after RESPONSE_CACHE_TTL seconds. That TTL also bounds staleness
+from any write that bypasses both the signals and `invalidate`.
+
+Hits and misses are counted per endpoint and process (`stats`), shown at
+`core/response-cache/`, and each cached response carries `X-Cache: HIT` or
+`MISS`.
+"""
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'responses'
+
+# Endpoint name -> labels of the models it reads.
+ENDPOINTS = {}
+
+# Saves that only touch these fields leave cached responses alone: logins
+# update last_login, which no cached endpoint shows.
+UNTRACKED_FIELDS = {'core.User': {'last_login'}}
+
+
+def ttl():
+    return getattr(settings, 'RESPONSE_CACHE_TTL', 300)
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+class Stats:
+    """Per-process hit/miss/invalidation counters."""
+
+    def __init__(self):
+        self._counts = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self._invalidations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name, hit):
+        with self._lock:
+            self._counts[name]['hits' if hit else 'misses'] += 1
+
+    def invalidated(self, label):
+        with self._lock:
+            self._invalidations[label] += 1
+
+    def snapshot(self):
+        with self._lock:
+            endpoints = {}
+            for name in ENDPOINTS:
+                counts = dict(self._counts[name])
+                total = counts['hits'] + counts['misses']
+                counts['hit_ratio'] = round(counts['hits'] / total, 3) if total else None
+                endpoints[name] = counts
+            return {'endpoints': endpoints, 'invalidations': dict(self._invalidations)}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._invalidations.clear()
+
+
+stats = Stats()
+
+
+# --- Generations ---
+
+def _generation_key(label):
+    return f'generation:{label}'
+
+
+def _generations(labels):
+    cache = get_cache()
+    keys = [_generation_key(label) for label in labels]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # A time-based seed, so a generation lost to eviction never repeats an old value.
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[key] for key in keys]
+
+
+def _bump(labels):
+    cache = get_cache()
+    for label in labels:
+        try:
+            cache.incr(_generation_key(label))
+        except ValueError:
+            # Never read, so no entry depends on it; the next read seeds a new one.
+            pass
+        stats.invalidated(label)
+
+
+def invalidate(*models):
+    """Invalidates every endpoint that reads any of `models`, once the current transaction commits."""
+    labels = sorted({model._meta.label for model in models})
+    transaction.on_commit(lambda: _bump(labels), robust=True)
+
+
+def _model_changed(sender, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= UNTRACKED_FIELDS.get(sender._meta.label, set()):
+        return
+    invalidate(sender)
+
+
+def _m2m_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate(sender)
+
+
+def register(name, *models):
+    """Declares that endpoint `name` reads `models` and connects the invalidation signals."""
+    ENDPOINTS[name] = tuple(sorted(model._meta.label for model in models))
+    for model in models:
+        uid = f'response_cache:{model._meta.label}'
+        if model._meta.auto_created:
+            m2m_changed.connect(_m2m_changed, sender=model, dispatch_uid=uid)
+        else:
+            post_save.connect(_model_changed, sender=model, dispatch_uid=uid)
+            post_delete.connect(_model_changed, sender=model, dispatch_uid=uid)
+
+
+# --- Lookups ---
+
+def role_scope(request):
+    return request.user.role
+
+
+def lookup(name, request, scope=role_scope, version=None):
+    """
+    Returns (key, data); data is None on a miss. A None key means caching is
+    off. `version` is part of the key, e.g. the analytics snapshot time.
+    """
+    if ttl() <= 0:
+        return None, None
+    labels = ENDPOINTS[name]
+    query = sorted((key, values) for key, values in request.GET.lists())
+    digest = hashlib.sha256(repr((_generations(labels), query, version)).encode()).hexdigest()
+    key = f'response:{name}:{scope(request)}:{digest}'
+    data = get_cache().get(key)
+    stats.record(name, hit=data is not None)
+    return key, data
+
+
+def store(key, data):
+    if key is not None:
+        get_cache().set(key, data, timeout=ttl())
+
+
+def cached_response(name, scope=role_scope):
+    """
+    Decorator for a DRF handler (`list`, `get`) serving endpoint `name`.
+    Only 200 responses are stored. Views reading a snapshot (see
+    core.mixins.AnalyticsMixin) get separate entries per `data_as_of`.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key, data = lookup(name, request, scope, version=getattr(view, 'data_as_of', None))
+            if data is not None:
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+            response = handler(view, request, *args, **kwargs)
+            if key is not None and response.status_code == 200:
+                store(key, response.data)
+                response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
@@ -1,7 +1,36 @@
+import time
+
 from rest_framework import serializers
+from . import metrics
 from .models import User, SecurityLog
 
-class UserSerializer(serializers.ModelSerializer):
+class FieldsProjectionMixin:
+    """
+    Lets read requests ask for a subset of fields with `?fields=a,b,c`,
+    so list pages only serialize the columns they actually display.
+    Unknown names are ignored; writes always use the full field set.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        fields = request.query_params.get('fields')
+        if not fields:
+            return
+        requested = {name.strip() for name in fields.split(',') if name.strip()}
+        for name in set(self.fields) - requested:
+            self.fields.pop(name)
+
+    def to_representation(self, instance):
+        # Serializer time for the request metrics (see core.metrics).
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.add_serializer_time(time.perf_counter() - started)
+
+class UserSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=False)
 
     class Meta:
@@ -25,7 +54,7 @@ class UserSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class SecurityLogSerializer(serializers.ModelSerializer):
+class SecurityLogSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField()  # This will use the __str__ method of the User model
 
     class Meta:
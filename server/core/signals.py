@@ -1,6 +1,11 @@
 from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import SecurityLog
+from .audit import log_security_event
+from . import db, metrics, response_cache
+from .authentication import user_cache
+from .models import User
 
 def get_client_ip(request):
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -12,7 +17,7 @@ def get_client_ip(request):
 
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
-    SecurityLog.objects.create(
+    log_security_event(
         user=user,
         event_type='Login',
         ip_address=get_client_ip(request),
@@ -21,8 +26,23 @@ def log_user_login(sender, request, user, **kwargs):
 
 @receiver(user_login_failed)
 def log_user_login_failed(sender, credentials, request, **kwargs):
-    SecurityLog.objects.create(
+    log_security_event(
         event_type='Failed Attempt',
         ip_address=get_client_ip(request),
         description=f"Login failed for username: {credentials.get('username')}"
     )
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Role, is_active and password changes apply to this process's next request (see core.authentication).
+    user_cache.invalidate(instance.pk)
+
+# Cached responses (see core.response_cache)
+response_cache.register('users', User)
+
+@receiver(connection_created)
+def configure_database_connection(sender, connection, **kwargs):
+    metrics.instrument(connection)
+    if connection.vendor == 'sqlite':
+        db.configure_sqlite(connection)
@@ -1,19 +1,23 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
-from .views import SecurityLogViewSet, CurrentUserView, VerifyPasswordView, UserViewSet
+from .views import SecurityLogViewSet, CurrentUserView, VerifyPasswordView, UserViewSet, ResponseCacheStatsView, MetricsView
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'security-logs', SecurityLogViewSet)
 router.register(r'users', UserViewSet)
 
 urlpatterns = [
-    path('users/me/', CurrentUserView.as_view(), name='current-user'),
+    path('users/me/', async_views.current_user if settings.ASYNC_VIEWS else CurrentUserView.as_view(), name='current-user'),
     path('', include(router.urls)),
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('verify-password/', VerifyPasswordView.as_view(), name='verify-password'),
+    path('response-cache/', ResponseCacheStatsView.as_view(), name='response-cache'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
@@ -1,10 +1,20 @@
+import re
+
+from django.conf import settings
+from django.http import HttpResponse
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import SecurityLog, User
 from .serializers import SecurityLogSerializer, UserSerializer
-from .permissions import IsSupervisor, IsAdmin
+from .authentication import CachedJWTAuthentication, MetricsTokenAuthentication
+from .permissions import IsSupervisor, IsAdmin, IsMetricsScraper
+from .mixins import AnalyticsMixin, RelatedFieldsMixin
+from .audit import log_security_event
+from .signals import get_client_ip
+from . import archive, elevation, metrics, response_cache
 
 class CurrentUserView(APIView):
     permission_classes = [IsAuthenticated]
@@ -19,25 +29,107 @@ class CurrentUserView(APIView):
         })
 
 class VerifyPasswordView(APIView):
+    """Re-checks the password and returns an elevation token for `scope` (see core.elevation)."""
     permission_classes = [IsAuthenticated]
+    throttle_classes = [elevation.VerifyPasswordUserThrottle, elevation.VerifyPasswordIPThrottle]
+
+    def throttled(self, request, wait):
+        log_security_event(
+            user=request.user,
+            event_type='Failed Attempt',
+            ip_address=get_client_ip(request),
+            description=f"Password re-verification throttled for {request.user.username}"
+        )
+        super().throttled(request, wait)
 
     def post(self, request):
         password = request.data.get('password')
         if not password:
             return Response({'error': 'Password required'}, status=400)
-        
+        scope = request.data.get('scope', 'tickets')
+        if scope not in elevation.SCOPES:
+            return Response({'error': f"scope must be one of: {', '.join(elevation.SCOPES)}"}, status=400)
+
         user = request.user
         if user.check_password(password):
-            return Response({'status': 'verified'})
+            return Response({
+                'status': 'verified',
+                'elevation_token': elevation.issue(user, scope),
+                'expires_in': elevation.ttl(),
+            })
         else:
+            log_security_event(
+                user=user,
+                event_type='Failed Attempt',
+                ip_address=get_client_ip(request),
+                description=f"Password re-verification failed for {user.username}"
+            )
             return Response({'error': 'Invalid password'}, status=403)
 
-class SecurityLogViewSet(viewsets.ReadOnlyModelViewSet):
+class SecurityLogViewSet(AnalyticsMixin, RelatedFieldsMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SecurityLog.objects.all()
     serializer_class = SecurityLogSerializer
     permission_classes = [IsSupervisor]
+    cursor_ordering = ('-timestamp', '-log_id')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = archive.filter_queryset(queryset, archive.parse_filters(self.request.query_params))
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def archive(self, request):
+        """
+        Archived logs (see core.archive). Without `month` lists the archived
+        months; with `month=YYYY-MM` returns that month's matching events,
+        oldest first, up to `limit` (default 500, max 5000).
+        """
+        month = request.query_params.get('month')
+        if not month:
+            return Response({'months': archive.available_months()})
+        if not re.fullmatch(r'\d{4}-\d{2}', month):
+            return Response({'error': 'month must look like YYYY-MM'}, status=400)
+        try:
+            limit = min(int(request.query_params.get('limit', 500)), 5000)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=400)
+        filters = archive.parse_filters(request.query_params)
+        results = list(archive.read_archive(month, filters, limit=limit + 1))
+        return Response({
+            'month': month,
+            'truncated': len(results) > limit,
+            'results': results[:limit],
+        })
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+    cursor_ordering = 'id'
+
+    @response_cache.cached_response('users')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+class ResponseCacheStatsView(APIView):
+    """Hit/miss counters of the response cache for this process (see core.response_cache)."""
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response({
+            'backend': settings.RESPONSE_CACHE_BACKEND,
+            'ttl': response_cache.ttl(),
+            **response_cache.stats.snapshot(),
+        })
+
+class MetricsView(APIView):
+    """Request metrics in Prometheus text format (see core.metrics)."""
+    authentication_classes = [MetricsTokenAuthentication, CachedJWTAuthentication]
+    permission_classes = [IsAdmin | IsMetricsScraper]
+
+    def get(self, request):
+        return HttpResponse(
+            metrics.registry.render(response_cache.stats.snapshot()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
@@ -1,11 +1,12 @@
 from django.contrib import admin
-from .models import Customer, Campaign, Call, Ticket
+from .models import Customer, Campaign, Call, Ticket, WebhookEvent
 
 @admin.register(Customer)
 class CustomerAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'email', 'phone_number', 'account_status', 'registration_date')
-    search_fields = ('full_name', 'email', 'phone_number')
+    search_fields = ('full_name', 'email', 'phone_number', 'phone_normalized')
     list_filter = ('account_status', 'registration_date')
+    readonly_fields = ('phone_normalized',)
 
 @admin.register(Campaign)
 class CampaignAdmin(admin.ModelAdmin):
@@ -24,3 +25,9 @@ class TicketAdmin(admin.ModelAdmin):
     list_display = ('ticket_id', 'title', 'status', 'priority_level', 'customer', 'agent')
     list_filter = ('status', 'priority_level', 'created_at')
     search_fields = ('title', 'customer__full_name', 'agent__username')
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'source', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('source', 'status')
+    readonly_fields = ('received_at', 'processed_at', 'locked_by', 'locked_at')
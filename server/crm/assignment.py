@@ -0,0 +1,229 @@
+"""
+Pluggable agent assignment engine.
+
+Every strategy ranks rows of the AgentLoad table, which is kept up to date
+by crm.signals. Picking an agent is therefore an index seek on a small
+table instead of a GROUP BY over all customers. The strategy is selected
+with the CRM_ASSIGNMENT_STRATEGY setting:
+
+    least_loaded      fewest assigned customers (default)
+    round_robin       agent who was assigned least recently
+    department        least loaded within the requested department, falling
+                      back to all agents when nobody in it is available
+    weighted_tickets  customers + open tickets * CRM_ASSIGNMENT_TICKET_WEIGHT
+"""
+import heapq
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from core import response_cache
+from core.models import User
+from .models import AgentLoad, Customer
+
+OPEN_TICKET_STATUSES = ('Open', 'Pending')
+
+
+class AssignmentStrategy:
+    name = None
+
+    def rank(self, loads, department=None):
+        """Returns `loads` (an AgentLoad queryset) ordered best candidate first."""
+        raise NotImplementedError
+
+    def sort_key(self, load):
+        """In-memory equivalent of `rank` for one AgentLoad, used by `assign_many`."""
+        raise NotImplementedError
+
+
+class LeastLoadedStrategy(AssignmentStrategy):
+    name = 'least_loaded'
+
+    def rank(self, loads, department=None):
+        return loads.order_by('customer_count', 'agent_id')
+
+    def sort_key(self, load):
+        return (load.customer_count, load.agent_id)
+
+
+class RoundRobinStrategy(AssignmentStrategy):
+    name = 'round_robin'
+
+    def rank(self, loads, department=None):
+        return loads.order_by(F('last_assigned_at').asc(nulls_first=True), 'agent_id')
+
+    def sort_key(self, load):
+        return (load.last_assigned_at or datetime.min.replace(tzinfo=dt_timezone.utc), load.agent_id)
+
+
+class DepartmentStrategy(LeastLoadedStrategy):
+    name = 'department'
+
+    def rank(self, loads, department=None):
+        if department:
+            in_department = loads.filter(agent__department__iexact=department)
+            if in_department.exists():
+                loads = in_department
+        return super().rank(loads)
+
+
+class WeightedTicketsStrategy(AssignmentStrategy):
+    name = 'weighted_tickets'
+
+    def rank(self, loads, department=None):
+        weight = getattr(settings, 'CRM_ASSIGNMENT_TICKET_WEIGHT', 2)
+        return loads.alias(
+            weighted_load=F('customer_count') + F('open_ticket_count') * weight
+        ).order_by('weighted_load', 'agent_id')
+
+    def sort_key(self, load):
+        weight = getattr(settings, 'CRM_ASSIGNMENT_TICKET_WEIGHT', 2)
+        return (load.customer_count + load.open_ticket_count * weight, load.agent_id)
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (LeastLoadedStrategy, RoundRobinStrategy, DepartmentStrategy, WeightedTicketsStrategy)
+}
+
+
+def get_strategy(name=None):
+    name = name or getattr(settings, 'CRM_ASSIGNMENT_STRATEGY', 'least_loaded')
+    try:
+        return STRATEGIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown assignment strategy '{name}'. Choose from: {', '.join(STRATEGIES)}")
+
+
+def available_loads():
+    return AgentLoad.objects.filter(agent__role='Agent', agent__is_active=True)
+
+
+def assign(customer, strategy=None, department=None):
+    """
+    Assigns an agent to `customer` if it has none and returns the agent.
+
+    The claim is a conditional UPDATE (`... WHERE assigned_agent IS NULL`),
+    so concurrent webhooks for the same customer can never assign it twice or
+    double count it; the load counter is bumped in the same transaction.
+    """
+    if customer.assigned_agent_id:
+        return customer.assigned_agent
+
+    strategy = strategy or get_strategy()
+    with transaction.atomic():
+        load = strategy.rank(
+            available_loads().select_related('agent').select_for_update(), department=department
+        ).first()
+        if load is None:
+            return None
+
+        claimed = Customer.objects.filter(
+            pk=customer.pk, assigned_agent__isnull=True
+        ).update(assigned_agent=load.agent_id)
+        if not claimed:
+            # Somebody else got there first; report their choice.
+            customer.refresh_from_db(fields=['assigned_agent'])
+            return customer.assigned_agent
+
+        AgentLoad.objects.filter(pk=load.pk).update(
+            customer_count=F('customer_count') + 1,
+            last_assigned_at=timezone.now(),
+        )
+        response_cache.invalidate(Customer)
+
+    customer.assigned_agent = load.agent
+    return load.agent
+
+
+def assign_many(customer_ids, strategy=None, department=None):
+    """
+    Batch version of `assign` for imports: distributes the unassigned
+    customers among `customer_ids` in one pass and returns the number
+    assigned. The plan is computed in memory by replaying the strategy's
+    ordering (`sort_key`) while counting each pick, so N customers cost one
+    UPDATE per agent instead of N claims; load counters move by exactly the
+    rows each UPDATE claimed.
+    """
+    strategy = strategy or get_strategy()
+    with transaction.atomic():
+        pending = list(
+            Customer.objects.filter(pk__in=customer_ids, assigned_agent__isnull=True)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        loads = list(strategy.rank(available_loads().select_for_update(), department=department))
+        if not pending or not loads:
+            return 0
+
+        now = timezone.now()
+        heap = [(strategy.sort_key(load), index) for index, load in enumerate(loads)]
+        heapq.heapify(heap)
+        plan = {}
+        for sequence, customer_id in enumerate(pending):
+            _, index = heapq.heappop(heap)
+            load = loads[index]
+            plan.setdefault(load.agent_id, []).append(customer_id)
+            load.customer_count += 1
+            # Distinct, increasing stamps keep round robin rotating within the batch.
+            load.last_assigned_at = now + timedelta(microseconds=sequence)
+            heapq.heappush(heap, (strategy.sort_key(load), index))
+
+        assigned = 0
+        for agent_id, ids in plan.items():
+            claimed = Customer.objects.filter(pk__in=ids, assigned_agent__isnull=True).update(assigned_agent=agent_id)
+            if claimed:
+                AgentLoad.objects.filter(pk=agent_id).update(
+                    customer_count=F('customer_count') + claimed, last_assigned_at=now,
+                )
+            assigned += claimed
+        if assigned:
+            response_cache.invalidate(Customer)
+    return assigned
+
+
+def adjust(agent_id, customers=0, open_tickets=0):
+    """Applies a delta to an agent's counters (no-op for non-agents)."""
+    if agent_id is None or not (customers or open_tickets):
+        return
+    AgentLoad.objects.filter(pk=agent_id).update(
+        customer_count=F('customer_count') + customers,
+        open_ticket_count=F('open_ticket_count') + open_tickets,
+    )
+
+
+def rebuild():
+    """
+    Recomputes every agent's counters from the customer and ticket tables and
+    returns the number of agents rebuilt.
+    """
+    with transaction.atomic():
+        agents = User.objects.filter(role='Agent').annotate(
+            num_customers=Count('assigned_customers', distinct=True),
+            num_open_tickets=Count(
+                'assigned_tickets',
+                filter=Q(assigned_tickets__status__in=OPEN_TICKET_STATUSES),
+                distinct=True,
+            ),
+        )
+        existing = AgentLoad.objects.in_bulk()
+        rows = []
+        for agent in agents:
+            load = existing.pop(agent.pk, None) or AgentLoad(agent=agent)
+            load.customer_count = agent.num_customers
+            load.open_ticket_count = agent.num_open_tickets
+            rows.append(load)
+        AgentLoad.objects.filter(pk__in=list(existing)).delete()
+        AgentLoad.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['agent'],
+            update_fields=['customer_count', 'open_ticket_count'],
+        )
+    return len(rows)
+
+
+def is_open(ticket):
+    return ticket.status in OPEN_TICKET_STATUSES
+
@@ -0,0 +1,95 @@
+"""
+Async variants of the webhook and supervisor stats views, routed in place of
+the DRF views when ASYNC_VIEWS is on (the default under server/asgi.py).
+
+They share validation and response building with the sync views. A webhook
+is one async ORM insert, so a burst of callbacks waits on the event loop
+instead of tying up a worker thread each. Stats run their three queries
+through the async ORM, against the analytics database (see core.db).
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from core import db, response_cache
+from core.concurrency import authenticate, run_sync
+from core.permissions import IsSupervisor
+from . import ingestion
+from .email_views import email_submission
+from .supervisor_views import SUMS, stats_payload, stats_querysets
+from .twilio_views import twilio_submission
+
+
+def _request_data(request):
+    """request.data for JSON or form bodies, as DRF's parsers would give it."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            raise ValueError('Malformed JSON body')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+        return data
+    return request.POST
+
+
+@csrf_exempt
+@require_POST
+async def twilio_webhook(request):
+    try:
+        submission = twilio_submission(_request_data(request))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    if submission is None:
+        return JsonResponse({'message': 'Status ignored'})
+
+    event, result = await ingestion.asubmit('Twilio', *submission)
+    return JsonResponse(result or {'message': 'Call queued', 'event_id': event.event_id})
+
+
+@csrf_exempt
+@require_POST
+async def email_webhook(request):
+    try:
+        submission = email_submission(_request_data(request))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    event, result = await ingestion.asubmit('Email', *submission)
+    if result is not None:
+        return JsonResponse(result, status=201)
+    return JsonResponse({'message': 'Email queued', 'event_id': event.event_id})
+
+
+@require_GET
+async def supervisor_stats(request):
+    error = await authenticate(request)
+    if error is not None:
+        return error
+    if not IsSupervisor().has_permission(request, None):
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    # On the async ORM's thread, whose analytics connection it may reopen.
+    data_as_of = await sync_to_async(db.analytics_freshness)()
+    key, data = await run_sync(response_cache.lookup, 'supervisor-stats', request, version=data_as_of)
+    if data is not None:
+        response = JsonResponse(data)
+        response['X-Cache'] = 'HIT'
+        return db.set_freshness(response, data_as_of)
+
+    try:
+        rollups, per_agent, agents = stats_querysets(request.GET)
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    with db.analytics_reads():
+        per_agent_rows = [row async for row in per_agent]
+        totals = await rollups.aaggregate(**SUMS)
+        agents = [agent async for agent in agents]
+    data = stats_payload(agents, per_agent_rows, totals)
+    response = JsonResponse(data)
+    if key is not None:
+        await run_sync(response_cache.store, key, data)
+        response['X-Cache'] = 'MISS'
+    return db.set_freshness(response, data_as_of)
@@ -0,0 +1,240 @@
+"""
+Bulk customer import and export.
+
+Imports read CSV or JSON lines one record at a time and work in chunks of
+CRM_IMPORT_CHUNK_SIZE records. Each chunk is validated, split into new and
+existing customers by `email` (bulk_update for the existing ones,
+bulk_create with conflict handling on email for the new ones), assigned to
+agents in one pass (crm.assignment.assign_many) and attached to campaigns
+through the M2M through table, all in one transaction. Memory use depends
+on the chunk size, not on the file size. Invalid rows are reported with
+their line number and skipped; the rest of the chunk still goes in.
+
+Exports walk the customers in primary key order one batch at a time, so a
+StreamingHttpResponse can send any number of rows without ever loading the
+whole queryset.
+
+Like every bulk operation this bypasses the Customer signals: the agent
+load counters are kept right by assign_many, phone_normalized is set here
+instead of in Customer.save, and the search index is refreshed per chunk.
+"""
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.fields import DateTimeField
+from core import response_cache
+from . import assignment, search
+from .models import Campaign, Customer
+from .phones import normalize_phone
+from .serializers import CustomerImportSerializer
+
+FILE_TYPES = ('csv', 'jsonl')
+IMPORT_FIELDS = ('full_name', 'email', 'phone_number', 'address', 'account_status')
+WRITE_FIELDS = (*IMPORT_FIELDS, 'phone_normalized')
+EXPORT_FIELDS = (
+    'customer_id', 'full_name', 'email', 'phone_number', 'address', 'account_status',
+    'registration_date', 'assigned_agent', 'campaigns',
+)
+CAMPAIGN_SEPARATOR = ';'
+MAX_REPORTED_ERRORS = 100
+EXPORT_BATCH_SIZE = 2000
+
+Membership = Customer.campaigns.through
+
+
+def file_type_for(name, requested=None):
+    """Picks the format from an explicit `requested` value or the file extension."""
+    file_type = (requested or name.rsplit('.', 1)[-1]).lower()
+    if file_type in ('ndjson', 'json'):
+        file_type = 'jsonl'
+    if file_type not in FILE_TYPES:
+        raise ValueError(f"Unsupported file type '{file_type}'. Use one of: {', '.join(FILE_TYPES)}")
+    return file_type
+
+
+# --- Import ---
+
+def read_records(stream, file_type):
+    """Yields (line number, record dict or None if unreadable) from a text stream."""
+    if file_type == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            record = {key.strip(): value for key, value in row.items() if key and value not in (None, '')}
+            if 'campaigns' in record:
+                record['campaigns'] = [part.strip() for part in record['campaigns'].split(CAMPAIGN_SEPARATOR) if part.strip()]
+            yield reader.line_num, record
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+
+
+def import_customers(stream, file_type, campaign=None, assign=True, department=None, chunk_size=None):
+    """
+    Imports customers from a text stream. `campaign` (a Campaign) is joined by
+    every imported customer on top of the per-row `campaigns` column. Returns
+    a summary dict with counts and the first MAX_REPORTED_ERRORS row errors.
+    """
+    chunk_size = chunk_size or getattr(settings, 'CRM_IMPORT_CHUNK_SIZE', 1000)
+    result = {'created': 0, 'updated': 0, 'assigned': 0, 'memberships': 0, 'error_count': 0, 'errors': []}
+    records = read_records(stream, file_type)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return result
+        _import_chunk(chunk, campaign, assign, department, result)
+
+
+def _error(result, line, errors):
+    result['error_count'] += 1
+    if len(result['errors']) < MAX_REPORTED_ERRORS:
+        result['errors'].append({'line': line, 'errors': errors})
+
+
+def _import_chunk(chunk, campaign, assign, department, result):
+    valid = {}
+    for line, record in chunk:
+        if record is None:
+            _error(result, line, {'non_field_errors': ['Not a JSON object.']})
+            continue
+        serializer = CustomerImportSerializer(data=record)
+        if not serializer.is_valid():
+            _error(result, line, serializer.errors)
+            continue
+        data = serializer.validated_data
+        data['phone_normalized'] = normalize_phone(data['phone_number'])
+        # A later row for the same email wins.
+        valid[data['email']] = (line, data)
+
+    campaign_ids = {campaign_id for _, data in valid.values() for campaign_id in data.get('campaigns', ())}
+    known_campaigns = set(Campaign.objects.filter(pk__in=campaign_ids).values_list('pk', flat=True))
+    phones = {data['phone_normalized'] for _, data in valid.values() if data['phone_normalized']}
+    phone_owners = dict(Customer.objects.filter(phone_normalized__in=phones).values_list('phone_normalized', 'email'))
+
+    for email, (line, data) in list(valid.items()):
+        errors = {}
+        unknown = set(data.get('campaigns', ())) - known_campaigns
+        if unknown:
+            errors['campaigns'] = [f"Unknown campaign id(s): {', '.join(map(str, sorted(unknown)))}"]
+        if data['phone_normalized']:
+            owner = phone_owners.setdefault(data['phone_normalized'], email)
+            if owner != email:
+                errors['phone_number'] = [f'This number already belongs to {owner}.']
+        if errors:
+            _error(result, line, errors)
+            del valid[email]
+
+    if not valid:
+        return
+
+    with transaction.atomic():
+        existing = Customer.objects.in_bulk(list(valid), field_name='email')
+        updated, created = [], []
+        for email, (line, data) in valid.items():
+            customer = existing.get(email)
+            if customer is None:
+                created.append(Customer(**{field: data[field] for field in WRITE_FIELDS if field in data}))
+            else:
+                for field in WRITE_FIELDS:
+                    if field in data:
+                        setattr(customer, field, data[field])
+                updated.append(customer)
+
+        if updated:
+            Customer.objects.bulk_update(updated, WRITE_FIELDS)
+        if created:
+            # The conflict clause covers rows inserted by someone else since `existing` was read.
+            Customer.objects.bulk_create(
+                created,
+                update_conflicts=True,
+                unique_fields=['email'],
+                update_fields=[field for field in WRITE_FIELDS if field != 'email'],
+            )
+        ids = dict(Customer.objects.filter(email__in=list(valid)).values_list('email', 'pk'))
+        search.index_many(Customer, ids.values())
+
+        if assign:
+            result['assigned'] += assignment.assign_many(list(ids.values()), department=department)
+
+        memberships = {
+            (ids[email], campaign_id)
+            for email, (line, data) in valid.items()
+            for campaign_id in data.get('campaigns', ())
+        }
+        if campaign is not None:
+            memberships.update((customer_id, campaign.pk) for customer_id in ids.values())
+        Membership.objects.bulk_create(
+            [Membership(customer_id=customer_id, campaign_id=campaign_id) for customer_id, campaign_id in memberships],
+            ignore_conflicts=True,
+        )
+        response_cache.invalidate(Customer, Membership)
+
+    result['created'] += len(created)
+    result['updated'] += len(updated)
+    result['memberships'] += len(memberships)
+
+
+# --- Export ---
+
+def export_rows(queryset, batch_size=EXPORT_BATCH_SIZE):
+    """Yields one dict per customer of `queryset`, fetched in primary key batches."""
+    queryset = queryset.select_related(None).prefetch_related(None).order_by('pk')
+    to_representation = DateTimeField().to_representation
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values(
+            'customer_id', 'full_name', 'email', 'phone_number', 'address', 'account_status',
+            'registration_date', 'assigned_agent__username',
+        )[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1]['customer_id']
+        campaigns = defaultdict(list)
+        for customer_id, campaign_id in Membership.objects.filter(
+            customer_id__in=[row['customer_id'] for row in batch]
+        ).order_by('campaign_id').values_list('customer_id', 'campaign_id'):
+            campaigns[customer_id].append(campaign_id)
+        for row in batch:
+            row['assigned_agent'] = row.pop('assigned_agent__username')
+            row['registration_date'] = to_representation(row['registration_date'])
+            row['campaigns'] = campaigns[row['customer_id']]
+            yield row
+
+
+def stream_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+    for row in rows:
+        row['campaigns'] = CAMPAIGN_SEPARATOR.join(map(str, row['campaigns']))
+        writer.writerow([row[field] for field in EXPORT_FIELDS])
+        yield flush()
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps({field: row[field] for field in EXPORT_FIELDS}) + '\n'
+
+
+STREAMERS = {
+    'csv': (stream_csv, 'text/csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson'),
+}
@@ -0,0 +1,112 @@
+import hashlib
+import json
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from django.db.models import Func, IntegerField, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from core.models import User
+from core.permissions import IsAgent
+from .models import Call, Customer, Ticket
+
+RECENT_LIMIT_DEFAULT = 5
+RECENT_LIMIT_MAX = 20
+
+
+def _scalar(queryset, function='COUNT'):
+    """
+    Wraps an aggregate over `queryset` as a scalar subquery so several of them
+    can be evaluated inside one SELECT.
+    """
+    return Coalesce(
+        Subquery(queryset.order_by().annotate(_value=Func('pk', function=function)).values('_value')[:1]),
+        Value(0),
+        output_field=IntegerField(),
+    )
+
+
+class DashboardSummaryView(APIView):
+    """
+    Everything the agent dashboard shows, computed on the server.
+
+    Agents only see their own tickets, calls and customers; Supervisors and
+    Admins see everything (same rule as CustomerViewSet.get_queryset).
+    The counters come from a single aggregated query. The ETag hashes them
+    together with the recent tickets/customers, so edits to a row already on
+    the dashboard change it too. A client revalidating an unchanged dashboard
+    still gets a 304 with no body to serialize or send.
+    """
+    permission_classes = [IsAgent]
+
+    def get_querysets(self, user):
+        if user.role in ['Supervisor', 'Admin']:
+            return Ticket.objects.all(), Call.objects.all(), Customer.objects.all()
+        return (
+            Ticket.objects.filter(agent=user),
+            Call.objects.filter(agent=user),
+            Customer.objects.filter(assigned_agent=user),
+        )
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', RECENT_LIMIT_DEFAULT)), RECENT_LIMIT_MAX)
+        except ValueError:
+            limit = RECENT_LIMIT_DEFAULT
+        limit = max(limit, 0)
+
+        tickets, calls, customers = self.get_querysets(request.user)
+
+        # Anchor the subqueries on the requesting user's row: one statement, one row.
+        counts = User.objects.filter(pk=request.user.pk).annotate(
+            open_tickets=_scalar(tickets.filter(status='Open')),
+            pending_tickets=_scalar(tickets.filter(status='Pending')),
+            resolved_tickets=_scalar(tickets.filter(status='Resolved')),
+            active_calls=_scalar(calls.filter(call_end_time__isnull=True)),
+            total_customers=_scalar(customers),
+            latest_ticket_id=_scalar(tickets, 'MAX'),
+            latest_customer_id=_scalar(customers, 'MAX'),
+        ).values(
+            'open_tickets', 'pending_tickets', 'resolved_tickets', 'active_calls',
+            'total_customers', 'latest_ticket_id', 'latest_customer_id',
+        ).first()
+
+        recent_tickets = list(
+            tickets.order_by('-ticket_id').values(
+                'ticket_id', 'title', 'status', 'priority_level', 'created_at'
+            )[:limit]
+        )
+        recent_customers = list(
+            customers.order_by('-customer_id').values(
+                'customer_id', 'full_name', 'email', 'phone_number', 'account_status'
+            )[:limit]
+        )
+
+        fingerprint = json.dumps(
+            [request.user.pk, limit, counts, recent_tickets, recent_customers], sort_keys=True, default=str,
+        )
+        etag = '"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()
+
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return self._finalize(not_modified, etag)
+
+        response = Response({
+            'tickets': {
+                'open': counts['open_tickets'],
+                'pending': counts['pending_tickets'],
+                'resolved': counts['resolved_tickets'],
+            },
+            'active_calls': counts['active_calls'],
+            'total_customers': counts['total_customers'],
+            'recent_tickets': recent_tickets,
+            'recent_customers': recent_customers,
+        })
+        return self._finalize(response, etag)
+
+    def _finalize(self, response, etag):
+        response['ETag'] = etag
+        # Per-user data: browsers may keep it but must revalidate every time.
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Authorization'])
+        return response
@@ -3,14 +3,35 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .models import Ticket, Customer
-from django.utils import timezone
-from .utils import assign_agent_to_customer
+from . import ingestion
+
+
+def email_submission(data):
+    """
+    Validates an inbound email webhook. Returns (payload, dedupe_key) to
+    queue; raises ValueError for a bad request. Shared by the sync and async
+    (crm.async_views) views.
+    """
+    sender_email = data.get('sender')
+    subject = data.get('subject')
+    message_id = data.get('message_id')
+
+    if not sender_email or not subject:
+        raise ValueError('Missing sender or subject')
+    payload = {
+        'sender': sender_email,
+        'subject': subject,
+        'body': data.get('body') or '',
+        'name': data.get('name', 'Unknown Sender'),
+    }
+    return payload, f'email:{message_id}' if message_id else None
 
 @method_decorator(csrf_exempt, name='dispatch')
 class EmailWebhookView(APIView):
     """
     Receives webhooks from an Email Provider (e.g., SendGrid, Mailgun) for incoming emails.
+    The payload is queued and turned into a ticket by `manage.py process_webhooks`
+    (see crm.ingestion). An optional "message_id" deduplicates redeliveries.
     Simulated payload:
     {
         "sender": "customer@example.com",
@@ -22,40 +43,12 @@ class EmailWebhookView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request, format=None):
-        data = request.data
-        
-        sender_email = data.get('sender')
-        subject = data.get('subject')
-        body = data.get('body')
-        sender_name = data.get('name', 'Unknown Sender')
-
-        if not sender_email or not subject:
-            return Response({'error': 'Missing sender or subject'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Find or create customer based on email
-        customer, created = Customer.objects.get_or_create(
-            email=sender_email,
-            defaults={
-                'full_name': sender_name,
-                'phone_number': 'Unknown' # Placeholder
-            }
-        )
-
-        # Auto-assign agent
-        assign_agent_to_customer(customer)
-
-        # Create a Ticket automatically
-        ticket = Ticket.objects.create(
-            customer=customer,
-            title=subject,
-            description=body,
-            issue_category='General', # Default category
-            priority_level='Medium',
-            status='Open',
-            created_by=None # System created
-        )
+        try:
+            submission = email_submission(request.data)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            'message': 'Ticket created from email',
-            'ticket_id': ticket.ticket_id
-        }, status=status.HTTP_201_CREATED)
+        event, result = ingestion.submit('Email', *submission)
+        if result is not None:
+            return Response(result, status=status.HTTP_201_CREATED)
+        return Response({'message': 'Email queued', 'event_id': event.event_id}, status=status.HTTP_200_OK)
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.models import User
+from . import events
+
+SALT = 'crm.events'
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 3000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class EventTokenView(APIView):
+    """
+    A short-lived token for opening `crm/events/`. EventSource cannot send an
+    Authorization header, and a JWT in the URL would end up in access logs.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ttl = _setting('CRM_EVENT_TOKEN_TTL', 60)
+        return Response({'token': signing.dumps({'user': request.user.pk}, salt=SALT), 'expires_in': ttl})
+
+
+def _format(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+def _last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def _deadline():
+    # Streams end after a while so the client reconnects with a fresh token,
+    # which also picks up role changes and deactivations.
+    return time.monotonic() + _setting('CRM_EVENT_STREAM_MAX_SECONDS', 300)
+
+
+def _stream(user, listener, after):
+    """Blocking generator, for WSGI servers: one thread per open stream."""
+    deadline = _deadline()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        for event in events.hub.subscribe(listener, after):
+            if events.visible_to(user, event):
+                yield _format(event)
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = listener.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+            elif events.visible_to(user, event):
+                yield _format(event)
+    finally:
+        events.hub.unsubscribe(listener)
+
+
+async def _astream(user, listener, after):
+    """The same stream for ASGI servers: waits on the event loop, no thread held."""
+    deadline = _deadline()
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        for event in events.hub.subscribe(listener, after):
+            if events.visible_to(user, event):
+                yield _format(event)
+        while (remaining := deadline - time.monotonic()) > 0:
+            event = await listener.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            if event is None:
+                yield ': keepalive\n\n'
+            elif events.visible_to(user, event):
+                yield _format(event)
+    finally:
+        events.hub.unsubscribe(listener)
+
+
+@require_GET
+async def event_stream(request):
+    """
+    Server-sent events for the signed-in user (see crm.events). Open with
+    `?token=` from `crm/events/token/`; resume with the Last-Event-ID header
+    or `last_event_id`.
+    """
+    try:
+        claims = signing.loads(request.GET.get('token', ''), salt=SALT, max_age=_setting('CRM_EVENT_TOKEN_TTL', 60))
+    except signing.BadSignature:
+        return JsonResponse({'error': 'A valid stream token is required.'}, status=401)
+    user = await User.objects.filter(pk=claims.get('user'), is_active=True).afirst()
+    if user is None:
+        return JsonResponse({'error': 'A valid stream token is required.'}, status=401)
+
+    events.get_bus().start()
+    if isinstance(request, ASGIRequest):
+        listener = events.AsyncListener(asyncio.get_running_loop())
+        content = _astream(user, listener, _last_event_id(request))
+    else:
+        listener = events.Listener()
+        content = _stream(user, listener, _last_event_id(request))
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,305 @@
+"""
+Live change events for the dashboards, sent as server-sent events.
+
+post_save/post_delete on Call, Ticket and Customer publish one compact
+event per change once the transaction commits (crm.signals):
+
+    {"id": 42, "type": "ticket", "action": "updated", "pk": 7, "agents": [3, 5], "data": {...}}
+
+`data` is the row as its list endpoint renders it (absent for deletes).
+`agents` are the agents the row belongs to after and before the change, so
+an agent also hears about a ticket reassigned away from them and can drop
+it. Agents only receive events for their own rows; Supervisors and Admins
+receive everything, the same rules as the viewsets (`visible_to`).
+
+Delivery goes through a bus, chosen by CRM_EVENT_BUS:
+
+    database  Events go to the LiveEvent table. Every process serving
+              streams polls it every CRM_EVENT_POLL_INTERVAL seconds (one
+              query per process, not per client) and fans new rows out.
+              Works across processes: web workers, `manage.py process_webhooks`.
+              Such a process also keeps a LiveEventListener row fresh while
+              it has streams open; with none fresh, nothing is published, so
+              saves (webhooks included) skip the write when nobody watches.
+              Publishers prune events older than CRM_EVENT_RETENTION_SECONDS.
+    memory    Events go straight to this process's listeners. For tests and
+              single-process development.
+
+Each process remembers the last CRM_EVENT_BACKLOG events it has seen, so a
+client reconnecting with Last-Event-ID gets what it missed in between.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+from .models import Call, Customer, LiveEvent, LiveEventListener, Ticket
+from .serializers import CallSerializer, CustomerSerializer, TicketSerializer
+
+logger = logging.getLogger(__name__)
+
+# Event type, serializer and the fields sent, per model.
+EVENT_TYPES = {
+    Call: ('call', CallSerializer, (
+        'call_id', 'customer', 'customer_name', 'agent', 'agent_name', 'call_type',
+        'call_start_time', 'call_end_time', 'duration_seconds', 'notes',
+    )),
+    Ticket: ('ticket', TicketSerializer, (
+        'ticket_id', 'title', 'status', 'priority_level', 'issue_category', 'customer', 'customer_name',
+        'agent', 'agent_name', 'created_at', 'resolved_at',
+    )),
+    Customer: ('customer', CustomerSerializer, (
+        'customer_id', 'full_name', 'email', 'phone_number', 'account_status', 'assigned_agent',
+        'assigned_agent_name', 'registration_date',
+    )),
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def build(instance, action, previous_agent_id=None):
+    kind, serializer_class, fields = EVENT_TYPES[type(instance)]
+    agent_id = instance.assigned_agent_id if kind == 'customer' else instance.agent_id
+    event = {
+        'type': kind,
+        'action': action,
+        'pk': instance.pk,
+        'agents': sorted({agent for agent in (agent_id, previous_agent_id) if agent is not None}),
+    }
+    if action != 'deleted':
+        data = serializer_class(instance).data
+        event['data'] = {field: data[field] for field in fields if field in data}
+    return event
+
+
+def publish(instance, action, previous_agent_id=None):
+    """Publishes a change to `instance` once the current transaction commits."""
+    bus = get_bus()
+    if not bus.listening():
+        return
+    event = build(instance, action, previous_agent_id)
+    transaction.on_commit(lambda: bus.publish(event))
+
+
+def visible_to(user, event):
+    if user.role in ['Supervisor', 'Admin'] or user.is_superuser:
+        return True
+    return user.pk in event['agents']
+
+
+# --- In-process fan-out ---
+
+class Listener:
+    """One connected stream. Thread-safe `put`; `get` blocks up to `timeout` seconds."""
+    def __init__(self):
+        self._queue = queue.Queue(maxsize=_setting('CRM_EVENT_BACKLOG', 1000))
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            # A client this far behind reconnects and resumes from the backlog.
+            pass
+
+    def get(self, timeout):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class AsyncListener:
+    """A listener consumed from an event loop (ASGI); `put` may be called from any thread."""
+    def __init__(self, loop):
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=_setting('CRM_EVENT_BACKLOG', 1000))
+
+    def put(self, event):
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if not self._queue.full():
+            self._queue.put_nowait(event)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Hub:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = set()
+        self._recent = deque(maxlen=_setting('CRM_EVENT_BACKLOG', 1000))
+
+    def subscribe(self, listener, after=None):
+        """Registers `listener`; returns the remembered events with an id above `after`."""
+        with self._lock:
+            self._listeners.add(listener)
+            if after is None:
+                return []
+            return [event for event in self._recent if event['id'] > after]
+
+    def unsubscribe(self, listener):
+        with self._lock:
+            self._listeners.discard(listener)
+
+    def has_listeners(self):
+        with self._lock:
+            return bool(self._listeners)
+
+    def dispatch(self, events):
+        with self._lock:
+            self._recent.extend(events)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            for event in events:
+                listener.put(event)
+
+
+hub = Hub()
+
+
+# --- Buses ---
+
+class MemoryBus:
+    name = 'memory'
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def listening(self):
+        return True
+
+    def publish(self, event):
+        with self._lock:
+            event = {'id': next(self._ids), **event}
+        hub.dispatch([event])
+
+    def start(self):
+        pass
+
+
+class DatabaseBus:
+    name = 'database'
+    batch_size = 500
+    prune_every = 60
+    # A process with streams refreshes its LiveEventListener row this often;
+    # publishers treat rows older than listener_ttl as gone, and re-check at
+    # most every listening_check_every seconds.
+    heartbeat_every = 10
+    listener_ttl = 30
+    listening_check_every = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._process = f'{socket.gethostname()}:{os.getpid()}'
+        self._listening, self._checked_at = False, None
+        self._last_prune = 0
+
+    def listening(self):
+        """Whether any process had streams open recently; cached for listening_check_every seconds."""
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at > self.listening_check_every:
+            cutoff = timezone.now() - timedelta(seconds=self.listener_ttl)
+            try:
+                # Runs inside the caller's transaction: a savepoint keeps a failed check from aborting it.
+                with transaction.atomic():
+                    self._listening = LiveEventListener.objects.filter(seen_at__gte=cutoff).exists()
+            except DatabaseError:
+                logger.exception("Could not check for live event listeners")
+                self._listening = False
+            self._checked_at = now
+        return self._listening
+
+    def publish(self, event):
+        # Runs after the change has committed, but possibly inside an outer atomic block;
+        # a lost event must not fail the request, and savepoints keep an error from aborting it.
+        try:
+            with transaction.atomic():
+                LiveEvent.objects.create(payload=event)
+        except DatabaseError:
+            logger.exception("Could not publish live event %s %s", event['type'], event['action'])
+            return
+        if time.monotonic() - self._last_prune > self.prune_every:
+            self._last_prune = time.monotonic()
+            try:
+                with transaction.atomic():
+                    self.prune()
+            except DatabaseError:
+                logger.exception("Could not prune live events")
+
+    def prune(self):
+        cutoff = timezone.now() - timedelta(seconds=_setting('CRM_EVENT_RETENTION_SECONDS', 3600))
+        LiveEvent.objects.filter(created_at__lt=cutoff).delete()
+        LiveEventListener.objects.filter(seen_at__lt=timezone.now() - timedelta(seconds=self.listener_ttl)).delete()
+
+    def start(self):
+        """Starts this process's poller the first time a stream connects."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='live-event-poller', daemon=True)
+                self._thread.start()
+
+    def _heartbeat(self, last_beat):
+        """Keeps this process's LiveEventListener row fresh while it has streams; returns the beat time."""
+        if not hub.has_listeners():
+            if last_beat is not None:
+                LiveEventListener.objects.filter(process=self._process).delete()
+            return None
+        if last_beat is None or time.monotonic() - last_beat > self.heartbeat_every:
+            LiveEventListener.objects.update_or_create(process=self._process, defaults={'seen_at': timezone.now()})
+            # This process publishes too (e.g. a dashboard edit): no need to wait for the next check.
+            self._listening, self._checked_at = True, time.monotonic()
+            return time.monotonic()
+        return last_beat
+
+    def _run(self):
+        last_id, last_beat = None, None
+        while True:
+            try:
+                close_old_connections()
+                last_beat = self._heartbeat(last_beat)
+                if last_id is None:
+                    # Streams start from now; older events are only replayed from the backlog.
+                    last_id = LiveEvent.objects.order_by('-event_id').values_list('event_id', flat=True).first() or 0
+                rows = list(LiveEvent.objects.filter(event_id__gt=last_id).order_by('event_id').values_list(
+                    'event_id', 'payload'
+                )[:self.batch_size])
+                if rows:
+                    last_id = rows[-1][0]
+                    hub.dispatch([{'id': event_id, **payload} for event_id, payload in rows])
+            except DatabaseError:
+                logger.exception("Live event poll failed")
+            time.sleep(_setting('CRM_EVENT_POLL_INTERVAL', 1.0))
+
+
+BUSES = {bus.name: bus for bus in (MemoryBus, DatabaseBus)}
+_buses = {}
+_buses_lock = threading.Lock()
+
+
+def get_bus():
+    name = _setting('CRM_EVENT_BUS', 'database')
+    with _buses_lock:
+        if name not in _buses:
+            try:
+                _buses[name] = BUSES[name]()
+            except KeyError:
+                raise ValueError(f"Unknown event bus '{name}'. Choose from: {', '.join(BUSES)}")
+        return _buses[name]
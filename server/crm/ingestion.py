@@ -0,0 +1,251 @@
+"""
+Webhook ingestion queue.
+
+The webhook views only validate the request and persist the raw payload as a
+WebhookEvent, which keeps them fast enough that providers never time out
+and retry. `manage.py process_webhooks` drains the queue in batches: each
+event is handled in one transaction together with its status change, so a
+crashed or retried event never leaves half-applied work behind. Failures are
+retried with exponential backoff and end up as 'Dead' after
+CRM_WEBHOOK_MAX_ATTEMPTS, where supervisors can inspect and retry them
+(crm/webhooks/dead-letters/).
+
+With CRM_WEBHOOK_PROCESSING = 'sync' the views process the event inline
+instead, which is handy in development when no worker is running.
+"""
+import logging
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from core.concurrency import run_sync
+from .models import Call, Customer, Ticket, WebhookEvent
+from .phones import normalize_phone
+from .utils import assign_agent_to_customer
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# --- Handlers: the actual work behind each webhook ---
+
+# Twilio CallStatus values that start/continue a call, and those that end it.
+CALL_ACTIVE_STATUSES = ('queued', 'initiated', 'ringing', 'in-progress')
+CALL_FINAL_STATUSES = ('completed', 'no-answer', 'busy', 'failed', 'canceled')
+
+
+def _caller(payload):
+    from_number = payload.get('From')
+    customer_name = payload.get('Name', 'Unknown Caller')
+
+    # Find or create customer, matching on the normalized number so locally
+    # formatted entries ("(555) 123-4567") are found for "+15551234567".
+    normalized = normalize_phone(from_number)
+    lookup = {'phone_normalized': normalized} if normalized else {'phone_number': from_number}
+    customer, created = Customer.objects.get_or_create(
+        **lookup,
+        defaults={'phone_number': from_number, 'full_name': customer_name, 'email': f'{from_number}@placeholder.com'}
+    )
+
+    # Update name if it was "Unknown Caller" and we have a better name now
+    if not created and customer.full_name == 'Unknown Caller' and customer_name != 'Unknown Caller':
+        customer.full_name = customer_name
+        customer.save()
+
+    # Auto-assign agent
+    assign_agent_to_customer(customer)
+    return customer
+
+
+def handle_twilio_call(payload, received_at):
+    """
+    Upserts the single Call row for a CallSid. The first callback creates it
+    (routed to the customer's agent); a final status sets end time and
+    duration once. Replays and out-of-order callbacks are harmless. Times
+    are taken from when the webhook arrived, not when the worker ran.
+    """
+    call_sid = payload['CallSid']
+    status_param = payload.get('CallStatus')
+    now = received_at
+
+    call = Call.objects.filter(provider_sid=call_sid).first()
+    if call is None:
+        customer = _caller(payload)
+        try:
+            with transaction.atomic():
+                call = Call.objects.create(
+                    provider_sid=call_sid,
+                    customer=customer,
+                    agent=customer.assigned_agent,
+                    call_start_time=now,
+                    call_type='Inbound',
+                )
+        except IntegrityError:
+            # A concurrent callback for the same call created it first.
+            call = Call.objects.get(provider_sid=call_sid)
+
+    if status_param in CALL_FINAL_STATUSES and call.call_end_time is None:
+        duration = payload.get('CallDuration')
+        if duration not in (None, ''):
+            call.duration_seconds = int(duration)
+        else:
+            call.duration_seconds = max(0, int((now - call.call_start_time).total_seconds()))
+        call.call_end_time = now
+        call.save(update_fields=['call_end_time', 'duration_seconds'])
+
+    logger.debug("Call %s (%s) is %s", call.call_id, call_sid, status_param)
+    return {'message': 'Call logged', 'call_id': call.call_id}
+
+
+def handle_inbound_email(payload, received_at):
+    # Find or create customer based on email
+    customer, created = Customer.objects.get_or_create(
+        email=payload['sender'],
+        defaults={
+            'full_name': payload.get('name', 'Unknown Sender'),
+            'phone_number': 'Unknown' # Placeholder
+        }
+    )
+
+    # Auto-assign agent
+    assign_agent_to_customer(customer)
+
+    # Create a Ticket automatically
+    ticket = Ticket.objects.create(
+        customer=customer,
+        title=payload['subject'],
+        description=payload.get('body') or '', # Older events may carry a null body
+        issue_category='General', # Default category
+        priority_level='Medium',
+        status='Open',
+        created_by=None # System created
+    )
+    return {'message': 'Ticket created from email', 'ticket_id': ticket.ticket_id}
+
+
+HANDLERS = {
+    'Twilio': handle_twilio_call,
+    'Email': handle_inbound_email,
+}
+
+
+# --- Queue ---
+
+def enqueue(source, payload, dedupe_key=None):
+    """
+    Persists a webhook payload. Returns (event, created); a redelivery with a
+    known dedupe_key returns the original event with created=False.
+    """
+    try:
+        with transaction.atomic():
+            return WebhookEvent.objects.create(source=source, payload=payload, dedupe_key=dedupe_key), True
+    except IntegrityError:
+        if dedupe_key is None:
+            raise
+        return WebhookEvent.objects.get(dedupe_key=dedupe_key), False
+
+
+def submit(source, payload, dedupe_key=None):
+    """
+    Entry point for the webhook views. Queues the payload and, in 'sync'
+    mode, processes it straight away. Returns (event, result) where result
+    is the handler's output in sync mode and None otherwise.
+    """
+    event, created = enqueue(source, payload, dedupe_key)
+    if not created:
+        logger.info("Duplicate %s delivery dropped (key %s)", source, dedupe_key)
+        return event, None
+    if _setting('CRM_WEBHOOK_PROCESSING', 'queue') == 'sync':
+        return event, process_event(event)
+    return event, None
+
+
+async def asubmit(source, payload, dedupe_key=None):
+    """
+    submit() for the async webhook views (crm.async_views). The insert is a
+    single async ORM query; sync-mode processing runs on the bounded thread
+    pool (core.concurrency).
+    """
+    try:
+        event, created = await WebhookEvent.objects.acreate(source=source, payload=payload, dedupe_key=dedupe_key), True
+    except IntegrityError:
+        if dedupe_key is None:
+            raise
+        event, created = await WebhookEvent.objects.aget(dedupe_key=dedupe_key), False
+    if not created:
+        logger.info("Duplicate %s delivery dropped (key %s)", source, dedupe_key)
+        return event, None
+    if _setting('CRM_WEBHOOK_PROCESSING', 'queue') == 'sync':
+        return event, await run_sync(process_event, event)
+    return event, None
+
+
+def claim_batch(worker_id, size):
+    """
+    Atomically takes up to `size` due events for `worker_id`. Events locked
+    by a worker that died are reclaimed once CRM_WEBHOOK_LOCK_TIMEOUT passes.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting('CRM_WEBHOOK_LOCK_TIMEOUT', 300))
+    due = WebhookEvent.objects.filter(status='Pending', next_attempt_at__lte=now) | \
+        WebhookEvent.objects.filter(status='Processing', locked_at__lt=stale)
+    ids = list(due.order_by('next_attempt_at', 'event_id').values_list('event_id', flat=True)[:size])
+    if not ids:
+        return []
+    # Only rows still unclaimed (or stale) by the time the UPDATE runs are taken.
+    due.filter(event_id__in=ids).update(status='Processing', locked_by=worker_id, locked_at=now)
+    return list(WebhookEvent.objects.filter(event_id__in=ids, locked_by=worker_id, locked_at=now))
+
+
+def backoff(attempts):
+    base = _setting('CRM_WEBHOOK_RETRY_BASE_SECONDS', 5)
+    cap = _setting('CRM_WEBHOOK_RETRY_MAX_SECONDS', 3600)
+    delay = min(cap, base * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def process_event(event):
+    """Runs the handler for one event and records the outcome."""
+    handler = HANDLERS[event.source]
+    try:
+        with transaction.atomic():
+            result = handler(event.payload, event.received_at)
+            WebhookEvent.objects.filter(pk=event.pk).update(
+                status='Done', attempts=event.attempts + 1, processed_at=timezone.now(),
+                locked_by=None, locked_at=None, last_error=None,
+            )
+        event.status = 'Done'
+        return result
+    except Exception as exc:
+        event.attempts += 1
+        dead = event.attempts >= _setting('CRM_WEBHOOK_MAX_ATTEMPTS', 8)
+        event.status = 'Dead' if dead else 'Pending'
+        event.last_error = f"{type(exc).__name__}: {exc}"
+        event.next_attempt_at = timezone.now() + backoff(event.attempts)
+        event.locked_by = event.locked_at = None
+        event.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'locked_by', 'locked_at'])
+        logger.warning("%s event %s failed (attempt %s): %s", event.source, event.pk, event.attempts, exc)
+        return None
+
+
+def drain(worker_id, batch_size=50):
+    """Processes one batch; returns the number of events taken."""
+    batch = claim_batch(worker_id, batch_size)
+    for event in batch:
+        process_event(event)
+    return len(batch)
+
+
+def retry(event):
+    """Puts a dead (or pending) event back at the front of the queue."""
+    event.status = 'Pending'
+    event.attempts = 0
+    event.next_attempt_at = timezone.now()
+    event.locked_by = event.locked_at = None
+    event.save(update_fields=['status', 'attempts', 'next_attempt_at', 'locked_by', 'locked_at'])
+    return event
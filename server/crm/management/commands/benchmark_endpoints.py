@@ -0,0 +1,393 @@
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from core import elevation, metrics
+from core.models import SecurityLog, User
+from crm import synthetic
+from crm.models import Call, Customer, Ticket
+
+URL_MODULES = ('core', 'crm')
+
+# Routes without a scenario, and why.
+UNBENCHMARKED = {
+    'crm:event-stream': 'a server-sent event stream that stays open; crm:event-token covers opening one',
+}
+
+# Latency figures compared against the baseline; query counts are always compared.
+COMPARED = ('p50_ms', 'p95_ms')
+
+# Settings a baseline is only comparable under.
+CONFIG_KEYS = ('database', 'scale', 'concurrency', 'response_cache', 'async_views')
+
+
+def route_names():
+    """'<app>:<url name>' of every route in core/urls.py and crm/urls.py."""
+    def names(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from names(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name
+    return {f'{app}:{name}' for app in URL_MODULES for name in names(import_module(f'{app}.urls').urlpatterns)}
+
+
+def _value(value, number):
+    return value(number) if callable(value) else value
+
+
+class Scenario:
+    """
+    One kind of request. `path`, `data` and `headers` may be functions of the
+    request number, so writes can touch a different row each time. `data` is
+    sent as JSON, as a form with content_type=None, or as the query string
+    of a GET.
+    """
+
+    def __init__(self, name, route, role, path, method='get', data=None, content_type='application/json',
+                 headers=None, max_requests=None, reset_throttles=False):
+        self.name = name
+        self.route = route
+        self.role = role
+        self.path = path
+        self.method = method
+        self.data = data
+        self.content_type = content_type
+        self.headers = headers
+        self.max_requests = max_requests
+        self.reset_throttles = reset_throttles
+
+    def send(self, client, number):
+        path, data, headers = _value(self.path, number), _value(self.data, number), _value(self.headers, number) or {}
+        if self.method == 'get':
+            response = client.get(path, data, headers=headers)
+        elif self.content_type is None:
+            response = client.post(path, data, headers=headers)
+        else:
+            response = getattr(client, self.method)(path, data, content_type=self.content_type, headers=headers)
+        if response.streaming:
+            # The body is the work: time all of it.
+            b''.join(response.streaming_content)
+        return response
+
+
+def benchmark_agent(generator):
+    """The first synthetic agent who has customers."""
+    return User.objects.get(pk=Customer.objects.filter(assigned_agent_id__in=generator.agent_ids)
+                            .order_by('pk').values_list('assigned_agent_id', flat=True).first())
+
+
+def scenarios(generator, agent):
+    """Every scenario, against the data of a synthetic.Generator, with `agent` as the agent."""
+    customers = list(Customer.objects.filter(assigned_agent=agent).order_by('pk').values_list('pk', flat=True))
+    phones = list(Customer.objects.order_by('pk').values_list('phone_number', flat=True)[:500])
+    ticket = Ticket.objects.filter(agent=agent).order_by('pk').first()
+    call = Call.objects.filter(agent=agent).order_by('pk').first()
+    campaign = generator.campaign_ids[0]
+    security_log = SecurityLog.objects.order_by('pk').values_list('pk', flat=True).first()
+    dead_letters = generator.dead_letter_ids
+    refresh = str(RefreshToken.for_user(agent))
+    elevated = {'X-Elevation-Token': elevation.issue(agent, 'tickets')}
+    now = timezone.now().isoformat()
+
+    def customer(number):
+        return customers[number % len(customers)]
+
+    def import_file(number):
+        rows = ''.join(
+            f'Bench Import {number}-{index},import-{number}-{index}@bench.example.com,+1 556 {number:04d} {index:03d}\n'
+            for index in range(10)
+        )
+        return {'file': SimpleUploadedFile(f'import-{number}.csv', f'full_name,email,phone_number\n{rows}'.encode())}
+
+    return [
+        # crm/urls.py
+        Scenario('crm-root', 'crm:api-root', 'agent', '/api/crm/'),
+        Scenario('customer-list:agent', 'crm:customer-list', 'agent', reverse('customer-list')),
+        Scenario('customer-list:supervisor', 'crm:customer-list', 'supervisor', reverse('customer-list')),
+        Scenario('customer-create', 'crm:customer-list', 'agent', reverse('customer-list'), 'post', lambda n: {
+            'full_name': f'Bench Customer {n}', 'email': f'bench-{n}@bench.example.com', 'phone_number': f'+1 557 {n:07d}',
+        }),
+        Scenario('customer-detail', 'crm:customer-detail', 'agent', lambda n: reverse('customer-detail', args=[customer(n)])),
+        Scenario('customer-update', 'crm:customer-detail', 'agent', lambda n: reverse('customer-detail', args=[customer(n)]),
+                 'patch', lambda n: {'address': f'{n} Bench St'}),
+        Scenario('customer-export', 'crm:customer-export', 'agent', reverse('customer-export')),
+        Scenario('customer-import', 'crm:customer-import-customers', 'supervisor', reverse('customer-import-customers'), 'post', import_file,
+                 content_type=None),
+        Scenario('call-list', 'crm:call-list', 'agent', reverse('call-list')),
+        Scenario('call-create', 'crm:call-list', 'agent', reverse('call-list'), 'post', lambda n: {
+            'customer': customer(n), 'call_start_time': now, 'call_type': 'Outbound',
+        }),
+        Scenario('call-detail', 'crm:call-detail', 'agent', reverse('call-detail', args=[call.pk])),
+        Scenario('ticket-list:agent', 'crm:ticket-list', 'agent', reverse('ticket-list')),
+        Scenario('ticket-list:supervisor', 'crm:ticket-list', 'supervisor', reverse('ticket-list')),
+        Scenario('ticket-list:filtered', 'crm:ticket-list', 'supervisor', reverse('ticket-list'),
+                 data={'status': 'Open,Pending', 'priority_level': 'High', 'ordering': 'created_at'}),
+        Scenario('ticket-counts', 'crm:ticket-counts', 'supervisor', reverse('ticket-counts')),
+        Scenario('ticket-detail', 'crm:ticket-detail', 'agent', reverse('ticket-detail', args=[ticket.pk]), headers=elevated),
+        Scenario('ticket-update', 'crm:ticket-detail', 'agent', reverse('ticket-detail', args=[ticket.pk]), 'patch',
+                 lambda n: {'priority_level': ('Low', 'Medium', 'High')[n % 3]}),
+        Scenario('campaign-list', 'crm:campaign-list', 'supervisor', reverse('campaign-list')),
+        Scenario('campaign-detail', 'crm:campaign-detail', 'supervisor', reverse('campaign-detail', args=[campaign])),
+        Scenario('campaign-members', 'crm:campaign-members', 'supervisor', reverse('campaign-members', args=[campaign])),
+        Scenario('campaign-members-count', 'crm:campaign-members-count', 'supervisor',
+                 reverse('campaign-members-count', args=[campaign])),
+        Scenario('campaign-members-stream', 'crm:campaign-members-stream', 'supervisor',
+                 reverse('campaign-members-stream', args=[campaign])),
+        Scenario('campaign-add-customers', 'crm:campaign-add-customers', 'supervisor',
+                 reverse('campaign-add-customers', args=[campaign]), 'post', {'filter': {'assigned_agent': agent.pk}}),
+        Scenario('campaign-remove-customers', 'crm:campaign-remove-customers', 'supervisor',
+                 reverse('campaign-remove-customers', args=[campaign]), 'post', {'filter': {'assigned_agent': agent.pk}}),
+        Scenario('campaign-add-customer', 'crm:campaign-add-customer', 'supervisor',
+                 reverse('campaign-add-customer', args=[campaign]), 'post', lambda n: {'customer_id': customer(n)}),
+        Scenario('campaign-remove-customer', 'crm:campaign-remove-customer', 'supervisor',
+                 reverse('campaign-remove-customer', args=[campaign]), 'post', lambda n: {'customer_id': customer(n)}),
+        Scenario('dead-letter-list', 'crm:dead-letter-list', 'supervisor', reverse('dead-letter-list')),
+        Scenario('dead-letter-detail', 'crm:dead-letter-detail', 'supervisor', reverse('dead-letter-detail', args=[dead_letters[-1]])),
+        # Each retry takes another dead event out of the list (see --requests).
+        Scenario('dead-letter-retry', 'crm:dead-letter-retry', 'supervisor',
+                 lambda n: reverse('dead-letter-retry', args=[dead_letters[n]]), 'post'),
+        Scenario('twilio-webhook', 'crm:twilio-webhook', 'anonymous', reverse('twilio-webhook'), 'post', lambda n: urllib.parse.urlencode({
+            'CallSid': f'CA-bench-{n}', 'From': phones[n % len(phones)], 'To': '+15550000000', 'CallStatus': 'ringing',
+        }), content_type='application/x-www-form-urlencoded'),
+        Scenario('email-webhook', 'crm:email-webhook', 'anonymous', reverse('email-webhook'), 'post', lambda n: {
+            'sender': f'bench{n % 50}@bench.example.com', 'subject': 'Benchmark', 'body': 'benchmark', 'message_id': f'bench-{n}',
+        }),
+        Scenario('supervisor-stats', 'crm:supervisor-stats', 'supervisor', reverse('supervisor-stats')),
+        Scenario('dashboard-summary', 'crm:dashboard-summary', 'agent', reverse('dashboard-summary')),
+        Scenario('search', 'crm:search', 'agent', reverse('search'), data={'q': synthetic.LAST_NAMES[0]}),
+        Scenario('event-token', 'crm:event-token', 'agent', reverse('event-token'), 'post'),
+
+        # core/urls.py
+        Scenario('core-root', 'core:api-root', 'admin', '/api/core/'),
+        Scenario('current-user', 'core:current-user', 'agent', reverse('current-user')),
+        Scenario('security-log-list', 'core:securitylog-list', 'supervisor', reverse('securitylog-list')),
+        Scenario('security-log-detail', 'core:securitylog-detail', 'supervisor', reverse('securitylog-detail', args=[security_log])),
+        Scenario('security-log-archive', 'core:securitylog-archive', 'supervisor', reverse('securitylog-archive')),
+        Scenario('user-list', 'core:user-list', 'admin', reverse('user-list')),
+        Scenario('user-detail', 'core:user-detail', 'admin', reverse('user-detail', args=[agent.pk])),
+        # Password checks run PBKDF2 on purpose; a few requests show their cost.
+        Scenario('token', 'core:token_obtain_pair', 'anonymous', reverse('token_obtain_pair'), 'post',
+                 {'username': agent.username, 'password': generator.password}, max_requests=10),
+        Scenario('token-refresh', 'core:token_refresh', 'anonymous', reverse('token_refresh'), 'post', {'refresh': refresh}),
+        Scenario('verify-password', 'core:verify-password', 'agent', reverse('verify-password'), 'post',
+                 {'password': generator.password}, max_requests=10, reset_throttles=True),
+        Scenario('response-cache', 'core:response-cache', 'admin', reverse('response-cache')),
+        Scenario('metrics', 'core:metrics', 'admin', reverse('metrics')),
+    ]
+
+
+def percentile(ordered, share):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every route in core/urls.py and crm/urls.py, webhooks included, "
+        "through the test client against a throwaway database filled by crm.synthetic. "
+        "Reports p50/p95/p99 latency, requests/second and SQL queries per request, "
+        "and fails if query counts grow or latencies regress beyond --tolerance "
+        "compared to the stored baseline (BENCHMARK_BASELINE_PATH). Record a new "
+        "baseline with --save-baseline on the machine that runs the comparison. "
+        "Queries run while a response streams are not counted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.1, help='Synthetic data scale (see generate_synthetic_data).')
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per scenario first.')
+        parser.add_argument('--concurrency', type=int, default=1, help='Requests in flight at once.')
+        parser.add_argument('--only', help='Comma separated scenario names (or prefixes) to run.')
+        parser.add_argument('--response-cache', action='store_true', help='Serve repeated reads from the response cache.')
+        parser.add_argument('--baseline', default=settings.BENCHMARK_BASELINE_PATH, help='Baseline JSON file.')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline.')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Allowed latency growth over the baseline, as a fraction (default 0.5: +50%%).')
+        parser.add_argument('--min-regression-ms', type=float, default=5.0,
+                            help='Latency changes smaller than this never count as regressions.')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+
+    def handle(self, *args, **options):
+        config = {
+            'database': connection.vendor,
+            'scale': options['scale'],
+            'concurrency': options['concurrency'],
+            'response_cache': options['response_cache'],
+            'async_views': settings.ASYNC_VIEWS,
+        }
+        baseline = None
+        if not options['save_baseline'] and os.path.exists(options['baseline']):
+            with open(options['baseline'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+            recorded = baseline['config']
+            differing = [f'{key}={recorded.get(key)}' for key in CONFIG_KEYS if recorded.get(key) != config[key]]
+            if differing and not options['only']:
+                raise CommandError(
+                    f"The baseline was recorded with {', '.join(differing)}. Run with the same "
+                    "options, or record a new baseline with --save-baseline."
+                )
+
+        results = self._run(options)
+        failures = [f"{name}: {result['errors']} failed requests ({result['error']})"
+                    for name, result in results.items() if result['errors']]
+        if baseline is not None:
+            failures += self._regressions(results, baseline['results'], options['tolerance'], options['min_regression_ms'])
+
+        if options['json']:
+            self.stdout.write(json.dumps({'config': config, 'results': results}, indent=2))
+        else:
+            self._print(results, baseline['results'] if baseline else {})
+
+        if options['save_baseline']:
+            if failures:
+                raise CommandError("Not saving a baseline with failed requests:\n" + '\n'.join(failures))
+            os.makedirs(os.path.dirname(os.path.abspath(options['baseline'])), exist_ok=True)
+            with open(options['baseline'], 'w', encoding='utf-8') as stream:
+                json.dump({'config': {**config, 'requests': options['requests']}, 'results': results}, stream, indent=2, sort_keys=True)
+                stream.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Saved the baseline to {options['baseline']}."))
+        elif failures:
+            raise CommandError("Performance regressions:\n" + '\n'.join(failures))
+        elif baseline is None:
+            self.stdout.write(self.style.WARNING(f"No baseline at {options['baseline']}; nothing compared."))
+
+    # --- Running ---
+
+    def _run(self, options):
+        # A file database, so concurrent requests contend for the same lock as in production.
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        overrides = dict(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            METRICS_ENABLED=True,
+            METRICS_SLOW_REQUEST_MS=0,
+            RESPONSE_CACHE_TTL=settings.RESPONSE_CACHE_TTL if options['response_cache'] else 0,
+            # Private caches: nothing from the throwaway database may reach a running server's cache.
+            CACHES={alias: {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'benchmark-{alias}'}
+                    for alias in settings.CACHES},
+        )
+        try:
+            with override_settings(**overrides):
+                return self._run_scenarios(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run_scenarios(self, options):
+        counts = synthetic.scaled_counts(options['scale'])
+        # One dead event per retry, plus one left for the detail view.
+        counts['dead_letters'] = max(counts['dead_letters'], options['warmup'] + options['requests'] + 1)
+        self.stderr.write(f"Generating synthetic data (scale {options['scale']})...")
+        generator = synthetic.generate(counts, prefix='bench')
+
+        agent = benchmark_agent(generator)
+        selected = scenarios(generator, agent)
+        if options['only']:
+            wanted = [name.strip() for name in options['only'].split(',') if name.strip()]
+            selected = [scenario for scenario in selected if any(scenario.name.startswith(name) for name in wanted)]
+            if not selected:
+                raise CommandError(f"No scenario matches {options['only']}.")
+        else:
+            uncovered = route_names() - {scenario.route for scenario in selected} - set(UNBENCHMARKED)
+            if uncovered:
+                raise CommandError(f"Routes without a benchmark scenario: {', '.join(sorted(uncovered))}")
+
+        users = {
+            'agent': agent,
+            'supervisor': User.objects.get(pk=generator.supervisor_ids[0]),
+            'admin': User.objects.get(pk=generator.admin_id),
+        }
+        headers = {role: {'Authorization': f'Bearer {AccessToken.for_user(user)}'} for role, user in users.items()}
+        headers['anonymous'] = {}
+
+        results = {}
+        # Each worker connects before its first request, so connection setup is neither timed nor counted.
+        with ThreadPoolExecutor(max_workers=options['concurrency'], initializer=connection.ensure_connection) as pool:
+            for scenario in selected:
+                self.stderr.write(f"  {scenario.name}")
+                results[scenario.name] = self._measure(pool, scenario, headers[scenario.role], options)
+        return results
+
+    def _measure(self, pool, scenario, headers, options):
+        requests = min(options['requests'], scenario.max_requests or options['requests'])
+        numbers = itertools.count()
+        local = threading.local()
+        caches['default'].clear()
+
+        def send(_):
+            client = getattr(local, 'client', None) or Client(headers=headers)
+            local.client = client
+            if scenario.reset_throttles:
+                caches['default'].clear()
+            started = time.perf_counter()
+            response = scenario.send(client, next(numbers))
+            elapsed = time.perf_counter() - started
+            return elapsed, response.status_code, None if response.status_code < 400 else response.content[:200]
+
+        list(pool.map(send, range(options['warmup'])))
+        metrics.registry.reset()
+
+        started = time.perf_counter()
+        outcomes = list(pool.map(send, range(requests)))
+        elapsed = time.perf_counter() - started
+
+        count, queries, sql_seconds = metrics.registry.totals()
+        ordered = sorted(latency for latency, _, _ in outcomes)
+        errors = [(status, body) for _, status, body in outcomes if body is not None]
+        return {
+            'requests': requests,
+            'errors': len(errors),
+            'error': f'{errors[0][0]} {errors[0][1]!r}' if errors else None,
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+            'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+            'rps': round(requests / elapsed, 1),
+            'queries': round(queries / count, 1) if count else 0,
+            'sql_ms': round(sql_seconds / count * 1000, 2) if count else 0,
+        }
+
+    # --- Reporting ---
+
+    def _regressions(self, results, baseline, tolerance, min_ms):
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result['queries'] > base['queries']:
+                regressions.append(f"{name}: {base['queries']} -> {result['queries']} queries per request")
+            for field in COMPARED:
+                if result[field] > base[field] * (1 + tolerance) and result[field] - base[field] >= min_ms:
+                    regressions.append(f"{name}: {field} {base[field]} -> {result[field]}")
+        return regressions
+
+    def _print(self, results, baseline):
+        self.stdout.write(
+            f"{'scenario':<28} {'reqs':>5} {'errs':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'req/s':>8} {'queries':>7} {'p50 vs baseline':>16}"
+        )
+        for name, result in results.items():
+            base = baseline.get(name)
+            change = f"{(result['p50_ms'] / base['p50_ms'] - 1) * 100:+.0f}%" if base and base['p50_ms'] else '-'
+            self.stdout.write(
+                f"{name:<28} {result['requests']:>5} {result['errors']:>4} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                f"{result['p99_ms']:>8} {result['rps']:>8} {result['queries']:>7} {change:>16}"
+            )
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+
+MODES = ('wsgi', 'asgi')
+TWILIO_URL = '/api/crm/webhooks/twilio/'
+EMAIL_URL = '/api/crm/webhooks/email/'
+
+
+def webhook_requests(count):
+    """Alternating Twilio callbacks (form) and inbound emails (JSON), each with a unique delivery id."""
+    run = f'{os.getpid()}-{int(time.time())}'
+    for index in range(count):
+        if index % 2 == 0:
+            body = urllib.parse.urlencode({
+                'CallSid': f'CA-bench-{run}-{index}', 'From': f'+1555{index % 10_000_000:07d}',
+                'To': '+15550000000', 'CallStatus': 'ringing',
+            })
+            yield TWILIO_URL, 'application/x-www-form-urlencoded', body
+        else:
+            body = json.dumps({
+                'sender': f'bench{index % 500}@example.com', 'subject': 'Load test',
+                'body': 'benchmark', 'message_id': f'bench-{run}-{index}',
+            })
+            yield EMAIL_URL, 'application/json', body
+
+
+def summarize(mode, latencies, errors, elapsed, concurrency):
+    ordered = sorted(latencies)
+    percentile = lambda share: ordered[min(len(ordered) - 1, int(len(ordered) * share))] * 1000 if ordered else None
+    return {
+        'mode': mode,
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(0.50), 1) if ordered else None,
+        'p99_ms': round(percentile(0.99), 1) if ordered else None,
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 1) if ordered else None,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests the webhook endpoints with concurrent Twilio and email "
+        "deliveries and reports requests/second and p50/p99 latency. By "
+        "default it compares the WSGI (sync DRF views) and ASGI (async views) "
+        "handlers in-process, each in a subprocess against a throwaway test "
+        "database. With --url it benchmarks a running server instead, e.g. "
+        "gunicorn server.wsgi vs uvicorn server.asgi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per mode.')
+        parser.add_argument('--concurrency', type=int, default=50, help='Requests in flight at once.')
+        parser.add_argument('--modes', default=','.join(MODES), help='Comma separated: wsgi, asgi.')
+        parser.add_argument('--url', help='Base URL of a running server (e.g. http://127.0.0.1:8000).')
+        parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+        parser.add_argument('--run-mode', choices=MODES, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['run_mode']:
+            # Child process: one mode, result as a JSON line.
+            result = self._run_in_process(options['run_mode'], options['requests'], options['concurrency'])
+            self.stdout.write(json.dumps(result))
+            return
+
+        if options['url']:
+            results = [self._run_http(options['url'], options['requests'], options['concurrency'])]
+        else:
+            modes = [mode.strip() for mode in options['modes'].split(',') if mode.strip()]
+            unknown = set(modes) - set(MODES)
+            if unknown:
+                raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}. Use: {', '.join(MODES)}")
+            results = [self._spawn(mode, options['requests'], options['concurrency']) for mode in modes]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"{'mode':<6} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<6} {result['requests']:>8} {result['errors']:>6} {result['rps']:>8} "
+                f"{result['p50_ms']:>8} {result['p99_ms']:>8}"
+            )
+
+    # --- In-process ---
+
+    def _spawn(self, mode, count, concurrency):
+        self.stderr.write(f"Benchmarking {mode} ({count} requests, concurrency {concurrency})...")
+        env = {**os.environ, 'ASYNC_VIEWS': '1' if mode == 'asgi' else '0'}
+        completed = subprocess.run(
+            [sys.executable, sys.argv[0], 'benchmark_webhooks', '--run-mode', mode,
+             '--requests', str(count), '--concurrency', str(concurrency)],
+            env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f"{mode} run failed:\n{completed.stderr}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def _run_in_process(self, mode, count, concurrency):
+        # A file database, so writers contend for the same lock as in production.
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        try:
+            requests = list(webhook_requests(count))
+            if mode == 'wsgi':
+                return self._run_threads(requests, concurrency)
+            return asyncio.run(self._run_async(requests, concurrency))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _run_threads(self, requests, concurrency):
+        local = threading.local()
+
+        def send(request):
+            url, content_type, body = request
+            client = getattr(local, 'client', None) or Client()
+            local.client = client
+            started = time.perf_counter()
+            response = client.post(url, body, content_type=content_type)
+            return time.perf_counter() - started, response.status_code < 400
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(send, requests))
+        return self._summary('wsgi', outcomes, time.perf_counter() - started, concurrency)
+
+    async def _run_async(self, requests, concurrency):
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def send(request):
+            url, content_type, body = request
+            async with slots:
+                started = time.perf_counter()
+                response = await client.post(url, body, content_type=content_type)
+                return time.perf_counter() - started, response.status_code < 400
+
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(send(request) for request in requests))
+        return self._summary('asgi', outcomes, time.perf_counter() - started, concurrency)
+
+    # --- Against a running server ---
+
+    def _run_http(self, base_url, count, concurrency):
+        def send(request):
+            url, content_type, body = request
+            http_request = urllib.request.Request(
+                base_url.rstrip('/') + url, data=body.encode(), headers={'Content-Type': content_type}, method='POST'
+            )
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(http_request, timeout=30) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return time.perf_counter() - started, ok
+
+        requests = list(webhook_requests(count))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(send, requests))
+        return self._summary(base_url, outcomes, time.perf_counter() - started, concurrency)
+
+    def _summary(self, mode, outcomes, elapsed, concurrency):
+        latencies = [latency for latency, ok in outcomes if ok]
+        return summarize(mode, latencies, len(outcomes) - len(latencies), elapsed, concurrency)
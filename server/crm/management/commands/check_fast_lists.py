@@ -0,0 +1,163 @@
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from core import metrics, renderers
+from core.mixins import values_plan
+from core.models import User
+from crm import synthetic
+from crm.models import Call, Customer, Ticket
+from crm.serializers import CallSerializer, CustomerSerializer, TicketSerializer
+
+# (url, query, role, serializer): every list the fast path serves, plus the serializer fallback.
+CHECKS = [
+    ('/api/crm/calls/', {'page_size': 500}, 'supervisor', CallSerializer),
+    ('/api/crm/calls/', {'page_size': 500, 'fields': 'call_id,agent_name,customer_name,call_start_time'}, 'agent', CallSerializer),
+    ('/api/crm/tickets/', {'page_size': 500}, 'supervisor', TicketSerializer),
+    ('/api/crm/tickets/', {'page_size': 500}, 'agent', TicketSerializer),
+    ('/api/crm/tickets/', {'page_size': 200, 'status': 'Open,Pending', 'ordering': 'created_at'}, 'supervisor', TicketSerializer),
+    ('/api/crm/tickets/', {'page_size': 500, 'fields': 'ticket_id,title,agent_name,resolved_at'}, 'supervisor', TicketSerializer),
+    ('/api/crm/customers/', {'page_size': 500, 'fields': 'customer_id,full_name,email'}, 'supervisor', CustomerSerializer),
+    ('/api/crm/customers/', {'page_size': 500, 'fields': 'customer_id,full_name,assigned_agent_name'}, 'agent', CustomerSerializer),
+    ('/api/crm/customers/', {'page_size': 100}, 'supervisor', CustomerSerializer),
+]
+
+# Text that JSON encoders are known to disagree on.
+AWKWARD_TEXT = 'Zoë "Q" \\ back\\slash  line para \x01\x1f\x7f tab\t 🎧 <b>&amp;</b>'
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def _stdlib_json():
+    with mock.patch.object(renderers, 'orjson', None):
+        yield
+
+
+def _compare(before, after):
+    """`before -> after (speedup)`, in ms."""
+    speedup = f"{before / after:.1f}x" if after else '-'
+    return f"{before:.1f} -> {after:.1f} ({speedup})"
+
+
+class Command(BaseCommand):
+    help = (
+        "Contract check for the fast list path (core.mixins.FastListMixin): "
+        "every call, ticket and customer list page must be byte-identical "
+        "whether rows go through the serializers or through .values() and "
+        "orjson (or the stdlib encoder without orjson). Then times both paths. "
+        "Runs inside a transaction that is always rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=0.02, help='Synthetic data scale (see generate_synthetic_data).')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed requests per list and path.')
+
+    def handle(self, *args, **options):
+        try:
+            with override_settings(RESPONSE_CACHE_TTL=0, METRICS_SLOW_REQUEST_MS=0), transaction.atomic():
+                failures, timings = self._check(options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        # Request: median time of the whole request. Serialize: rows to Python data (metrics' serializer time).
+        self.stdout.write(f"\n{'path':<10} {'request ms':>16} {'serialize ms':>18}  list")
+        for label, path, slow, fast in timings:
+            self.stdout.write(
+                f"{path:<10} {_compare(slow['request_ms'], fast['request_ms']):>16} "
+                f"{_compare(slow['serialize_ms'], fast['serialize_ms']):>18}  {label}"
+            )
+        if failures:
+            raise CommandError("Fast path output differs:\n" + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS("Both paths return identical bytes for every list."))
+
+    def _check(self, options):
+        generator = synthetic.generate(synthetic.scaled_counts(options['scale']), prefix='_fast_check')
+        users = {
+            'supervisor': User.objects.get(pk=generator.supervisor_ids[0]),
+            'agent': User.objects.get(pk=Customer.objects.filter(assigned_agent_id__in=generator.agent_ids)
+                                      .order_by('pk').values_list('assigned_agent_id', flat=True).first()),
+        }
+        self._awkward_rows(users['agent'])
+
+        failures, timings = [], []
+        for url, query, role, serializer_class in CHECKS:
+            client = APIClient(HTTP_HOST='localhost')
+            client.force_authenticate(users[role])
+            label = f"{url}?{'&'.join(f'{key}={value}' for key, value in query.items())} ({role})"
+            path = 'fast' if self._takes_fast_path(url, query, users[role], serializer_class) else 'serializer'
+
+            # Two pages, so the cursors are checked too.
+            params = dict(query)
+            for page in (1, 2):
+                with override_settings(FAST_LIST_SERIALIZATION=False):
+                    expected = self._get(client, url, params).content
+                actual = self._get(client, url, params).content
+                with _stdlib_json():
+                    stdlib = self._get(client, url, params).content
+                for name, content in (('orjson', actual), ('stdlib json', stdlib)):
+                    if content != expected:
+                        failures.append(f"{label} page {page} ({name}): {self._first_difference(expected, content)}")
+                cursor = client.get(url, params).json().get('next')
+                if not cursor:
+                    break
+                params = dict(parse_qsl(urlsplit(cursor).query))
+
+            with override_settings(FAST_LIST_SERIALIZATION=False):
+                slow = self._time(client, url, query, options['repeat'])
+            fast = self._time(client, url, query, options['repeat'])
+            timings.append((label, path, slow, fast))
+        return failures, timings
+
+    def _awkward_rows(self, agent):
+        """Rows with text, nulls and timestamps that a careless encoder would render differently."""
+        now = timezone.now()
+        customer = Customer.objects.create(
+            full_name=AWKWARD_TEXT, email='awkward@fast-check.example.com', phone_number='+1 558 000 0001',
+            address=None, assigned_agent=agent,
+        )
+        orphan = Customer.objects.create(full_name='No Agent', email='orphan@fast-check.example.com', phone_number='')
+        Call.objects.create(customer=customer, agent=agent, call_start_time=now.replace(microsecond=0),
+                            call_type='Inbound', notes=AWKWARD_TEXT)
+        Call.objects.create(customer=orphan, agent=None, call_start_time=now - timedelta(seconds=1), call_type='Outbound')
+        Ticket.objects.create(customer=customer, agent=agent, created_by=agent, title=AWKWARD_TEXT,
+                              description=AWKWARD_TEXT, status='Resolved', resolved_at=now.replace(microsecond=0))
+        Ticket.objects.create(customer=orphan, agent=None, created_by=None, title='Unassigned', description='')
+
+    def _takes_fast_path(self, url, query, user, serializer_class):
+        request = Request(APIRequestFactory().get(url, query))
+        request.user = user
+        return values_plan(serializer_class(context={'request': request})) is not None
+
+    def _get(self, client, url, params):
+        response = client.get(url, params)
+        if response.status_code != 200:
+            raise CommandError(f"{url} returned {response.status_code}: {response.content[:200]!r}")
+        return response
+
+    def _time(self, client, url, query, repeat):
+        self._get(client, url, query)
+        durations = []
+        metrics.registry.reset()
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self._get(client, url, query)
+            durations.append(time.perf_counter() - started)
+        serializer_seconds = sum(metrics.registry.serializer_seconds.values())
+        return {'request_ms': statistics.median(durations) * 1000, 'serialize_ms': serializer_seconds / repeat * 1000}
+
+    def _first_difference(self, expected, actual):
+        index = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+        return f"at byte {index}: expected {expected[max(0, index - 40):index + 40]!r}, got {actual[max(0, index - 40):index + 40]!r}"
@@ -0,0 +1,104 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import User, SecurityLog
+from crm.models import Call, Campaign, Customer, Ticket
+
+LIST_ENDPOINTS = [
+    '/api/crm/customers/',
+    '/api/crm/calls/',
+    '/api/crm/tickets/',
+    '/api/crm/campaigns/',
+    '/api/core/security-logs/',
+    '/api/core/users/',
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Guards against N+1 regressions: measures the SQL query count of every "
+        "list endpoint at two data sizes and fails if any count grows with the "
+        "row count. Runs inside a transaction that is always rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--small', type=int, default=5, help='Rows per model in the first pass.')
+        parser.add_argument('--large', type=int, default=40, help='Rows per model in the second pass.')
+
+    def handle(self, *args, **options):
+        try:
+            # With the response cache on, repeated reads would be served from it
+            # and rows from this rolled back transaction would be cached.
+            with override_settings(RESPONSE_CACHE_TTL=0), transaction.atomic():
+                results = self._measure(options['small'], options['large'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        failures = []
+        for url, (small, large) in results.items():
+            ok = small == large
+            self.stdout.write(f"{'OK  ' if ok else 'FAIL'} {url}: {small} -> {large} queries")
+            if not ok:
+                failures.append(url)
+        if failures:
+            raise CommandError(f"Query count grows with row count for: {', '.join(failures)}")
+
+    def _measure(self, small, large):
+        admin = User.objects.create_user('_query_count_admin', role='Admin')
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(admin)
+
+        results = {}
+        self._seed(admin, small, 0)
+        first = {url: self._count(client, url) for url in LIST_ENDPOINTS}
+        self._seed(admin, large - small, small)
+        for url in LIST_ENDPOINTS:
+            results[url] = (first[url], self._count(client, url))
+        return results
+
+    def _count(self, client, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, {'page_size': 500})
+        if response.status_code != 200:
+            raise CommandError(f"{url} returned {response.status_code}")
+        return len(queries)
+
+    def _seed(self, admin, count, offset):
+        now = timezone.now()
+        agents = User.objects.bulk_create([
+            User(username=f'_qc_agent_{offset + i}', role='Agent') for i in range(count)
+        ])
+        campaigns = Campaign.objects.bulk_create([
+            Campaign(campaign_name=f'QC {offset + i}', type='Survey', start_date=now.date(),
+                     end_date=now.date(), status='Active', target_group='All')
+            for i in range(count)
+        ])
+        customers = Customer.objects.bulk_create([
+            Customer(full_name=f'QC Customer {offset + i}', email=f'qc{offset + i}@example.com',
+                     phone_number=f'555{offset + i:07d}', assigned_agent=agents[i])
+            for i in range(count)
+        ])
+        Customer.campaigns.through.objects.bulk_create([
+            Customer.campaigns.through(customer_id=customer.pk, campaign_id=campaign.pk)
+            for customer, campaign in zip(customers, campaigns)
+        ])
+        Call.objects.bulk_create([
+            Call(customer=customers[i], agent=agents[i], call_start_time=now, call_type='Inbound')
+            for i in range(count)
+        ])
+        Ticket.objects.bulk_create([
+            Ticket(customer=customers[i], agent=agents[i], created_by=admin,
+                   title=f'QC {offset + i}', description='-')
+            for i in range(count)
+        ])
+        SecurityLog.objects.bulk_create([
+            SecurityLog(user=agents[i], event_type='Login', ip_address='127.0.0.1')
+            for i in range(count)
+        ])
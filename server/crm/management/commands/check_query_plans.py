@@ -0,0 +1,83 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from crm.models import AgentDailyStats, AgentLoad, Call, Customer, Ticket, WebhookEvent
+
+# Placeholder ids/values: plans depend on the query shape, not on the data.
+AGENT, CUSTOMER, PAGE = 1, 1, 51
+
+
+def hot_queries():
+    """The queries behind the viewsets, webhooks and supervisor stats, shaped as the code issues them."""
+    now = timezone.now()
+    today = timezone.localdate()
+    return {
+        # Webhooks (crm.ingestion)
+        'webhook: caller by phone': Customer.objects.filter(phone_normalized='+15550000000'),
+        'webhook: sender by email': Customer.objects.filter(email='sender@example.com'),
+        'webhook: call by CallSid': Call.objects.filter(provider_sid='CA0000'),
+        'webhook: due events': WebhookEvent.objects.filter(
+            status='Pending', next_attempt_at__lte=now,
+        ).order_by('next_attempt_at', 'event_id')[:50],
+        # Viewset lists (keyset pagination order)
+        'customers: agent list': Customer.objects.filter(assigned_agent=AGENT).order_by('customer_id')[:PAGE],
+        'calls: list': Call.objects.order_by('-call_start_time', '-call_id')[:PAGE],
+        'calls: customer history': Call.objects.filter(customer=CUSTOMER).order_by('-call_start_time'),
+        'calls: agent history': Call.objects.filter(agent=AGENT).order_by('-call_start_time'),
+        'calls: active': Call.objects.filter(call_end_time__isnull=True),
+        'tickets: list': Ticket.objects.order_by('-created_at', '-ticket_id')[:PAGE],
+        'tickets: by status': Ticket.objects.filter(status='Open').order_by('-created_at')[:PAGE],
+        'tickets: agent by status': Ticket.objects.filter(agent=AGENT, status__in=['Open', 'Pending']),
+        'tickets: customer history': Ticket.objects.filter(customer=CUSTOMER).order_by('-created_at'),
+        'tickets: agent board column': Ticket.objects.filter(
+            agent=AGENT, status='Open',
+        ).order_by('-created_at', '-ticket_id')[:PAGE],
+        'tickets: board counts': Ticket.objects.order_by().values('status').annotate(count=Count('pk')),
+        'tickets: agent board counts': Ticket.objects.filter(agent=AGENT).order_by().values('status').annotate(count=Count('pk')),
+        # Assignment engine (crm.assignment)
+        'assignment: least loaded': AgentLoad.objects.order_by('customer_count', 'agent_id')[:1],
+        # Supervisor stats (crm.supervisor_views)
+        'stats: date range': AgentDailyStats.objects.filter(date__gte=today, date__lte=today),
+        'stats: agent day': AgentDailyStats.objects.filter(agent=AGENT, date=today),
+    }
+
+
+def full_scans(plan):
+    """Tables read in full according to an EXPLAIN plan from `QuerySet.explain()`."""
+    if connection.vendor == 'postgresql':
+        return re.findall(r'Seq Scan on (\w+)', plan)
+    if connection.vendor == 'sqlite':
+        # "SCAN t" reads the whole table; "SCAN t USING [COVERING] INDEX i" walks an index in order.
+        return re.findall(r'\bSCAN (\w+)(?! USING)\s*$', plan, re.MULTILINE)
+    raise CommandError(f"No plan parser for database vendor {connection.vendor!r}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Guards against missing indexes: runs EXPLAIN on every hot CRM query "
+        "and fails if any of them falls back to a full table scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan.')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Tiny dev/CI tables make a seq scan the cheapest plan; ask whether an index *can* be used.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            for name, queryset in hot_queries().items():
+                plan = queryset.explain()
+                scans = full_scans(plan)
+                self.stdout.write(f"{'FAIL' if scans else 'OK  '} {name}" + (f": full scan of {', '.join(scans)}" if scans else ''))
+                if options['verbose_plans']:
+                    self.stdout.write('       ' + plan.replace('\n', '\n       '))
+                if scans:
+                    failures.append(name)
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand
+from django.db import IntegrityError, transaction
+from crm.models import Customer
+from crm.phones import normalize_phone
+from crm.utils import merge_customers
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfills Customer.phone_normalized and merges customers whose numbers "
+        "normalize to one already taken (with their calls, tickets and campaign "
+        "memberships) into the customer holding it. Works in short batches, so "
+        "it can run against a live database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help='Customers examined per transaction.')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change.')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        claimed = {}  # dry run only: normalized number -> customer that would hold it
+        backfilled = merged = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Customer.objects.filter(phone_normalized__isnull=True, pk__gt=last_pk)
+                .order_by('pk')[:options['batch_size']]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                for customer in batch:
+                    normalized = normalize_phone(customer.phone_number)
+                    if normalized is None:
+                        continue
+                    owner = Customer.objects.filter(phone_normalized=normalized).first()
+                    if dry_run:
+                        if owner is None and normalized not in claimed:
+                            claimed[normalized] = customer.pk
+                            backfilled += 1
+                        else:
+                            merged += 1
+                        continue
+                    if owner is None:
+                        try:
+                            with transaction.atomic():
+                                customer.phone_normalized = normalized
+                                customer.save(update_fields=['phone_normalized'])
+                            backfilled += 1
+                            continue
+                        except IntegrityError:
+                            # Taken meanwhile by a customer created through the API or a webhook.
+                            owner = Customer.objects.get(phone_normalized=normalized)
+                    self.stdout.write(f"Merging {customer} (ID: {customer.pk}) into {owner} (ID: {owner.pk})")
+                    merge_customers(customer, owner)
+                    merged += 1
+
+        if dry_run:
+            summary = f"Would backfill {backfilled} numbers and merge {merged} duplicate customers."
+        else:
+            summary = f"Backfilled {backfilled} numbers and merged {merged} duplicate customers."
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from crm import bulk
+from crm.models import Customer
+
+
+class Command(BaseCommand):
+    help = "Streams every customer to a CSV or JSON lines file (or standard output)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="Destination file, or '-' for standard output.")
+        parser.add_argument('--file-type', choices=bulk.FILE_TYPES, default='csv')
+
+    def handle(self, *args, **options):
+        streamer, _ = bulk.STREAMERS[options['file_type']]
+        chunks = streamer(bulk.export_rows(Customer.objects.all()))
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        else:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(chunks)
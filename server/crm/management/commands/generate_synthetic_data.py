@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from crm import synthetic
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with synthetic supervisors, agents, campaigns, customers, "
+        "calls, tickets, security logs and dead webhook events for load testing (see "
+        "crm.synthetic). --scale multiplies the default counts; per-model options "
+        "override them, e.g. --calls 1000000. Users log in with --password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for the default counts.')
+        for name, count in synthetic.DEFAULT_COUNTS.items():
+            option = name.replace('_', '-')
+            parser.add_argument(f'--{option}', type=int, dest=name, help=f'Number of {name.replace("_", " ")} (default {count} x scale).')
+        parser.add_argument('--days', type=int, default=90, help='Spread calls, tickets and logs over this many days.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed and counts give the same data.')
+        parser.add_argument('--prefix', default='synthetic', help='Prefix of the generated usernames and emails.')
+        parser.add_argument('--password', default='synthetic', help='Password of every generated user.')
+        parser.add_argument('--batch-size', type=int, default=synthetic.BATCH_SIZE, help='Rows per bulk insert.')
+
+    def handle(self, *args, **options):
+        counts = synthetic.scaled_counts(options['scale'], **{name: options[name] for name in synthetic.DEFAULT_COUNTS})
+        started = time.perf_counter()
+        try:
+            generator = synthetic.generate(
+                counts,
+                progress=self.stdout.write,
+                seed=options['seed'],
+                days=options['days'],
+                prefix=options['prefix'],
+                password=options['password'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {sum(generator.created.values())} rows in {time.perf_counter() - started:.1f}s. "
+            f"Log in as {options['prefix']}_admin, {options['prefix']}_supervisor_0 or {options['prefix']}_agent_0."
+        ))
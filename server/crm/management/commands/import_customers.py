@@ -0,0 +1,52 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from crm import bulk
+from crm.models import Campaign
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk upserts customers (matched on email) from a CSV or JSON lines file, "
+        "assigns agents and joins campaigns. See crm.bulk for the file format."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for standard input.")
+        parser.add_argument('--file-type', choices=bulk.FILE_TYPES, help='Defaults to the file extension.')
+        parser.add_argument('--campaign', type=int, help='Campaign id every imported customer joins.')
+        parser.add_argument('--department', help='Prefer agents of this department when assigning.')
+        parser.add_argument('--no-assign', action='store_true', help='Leave new customers unassigned.')
+        parser.add_argument('--chunk-size', type=int, help='Records per transaction (default CRM_IMPORT_CHUNK_SIZE).')
+
+    def handle(self, *args, **options):
+        try:
+            file_type = bulk.file_type_for(options['path'], options['file_type'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        campaign = None
+        if options['campaign']:
+            campaign = Campaign.objects.filter(pk=options['campaign']).first()
+            if campaign is None:
+                raise CommandError(f"Campaign {options['campaign']} not found")
+
+        import_options = dict(
+            campaign=campaign,
+            assign=not options['no_assign'],
+            department=options['department'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['path'] == '-':
+            result = bulk.import_customers(sys.stdin, file_type, **import_options)
+        else:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = bulk.import_customers(stream, file_type, **import_options)
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, updated {result['updated']}, assigned {result['assigned']} customers; "
+            f"{result['memberships']} campaign memberships; {result['error_count']} rows rejected."
+        ))
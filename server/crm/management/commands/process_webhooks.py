@@ -0,0 +1,60 @@
+import logging
+import os
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from crm import ingestion
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Runs a pool of workers that drain the webhook queue (crm.WebhookEvent)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Number of worker threads.')
+        parser.add_argument('--batch-size', type=int, default=50, help='Events claimed per batch.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty instead of polling.')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        processed = [0] * options['workers']
+
+        def work(index):
+            worker_id = f"{prefix}:{index}"
+            try:
+                while not stop.is_set():
+                    close_old_connections()
+                    try:
+                        taken = ingestion.drain(worker_id, options['batch_size'])
+                    except Exception:
+                        # e.g. the database is locked; claimed events are picked up
+                        # again once CRM_WEBHOOK_LOCK_TIMEOUT expires.
+                        logger.exception("Webhook worker %s failed to drain a batch", worker_id)
+                        stop.wait(options['poll_interval'])
+                        continue
+                    processed[index] += taken
+                    if not taken:
+                        if options['once']:
+                            return
+                        stop.wait(options['poll_interval'])
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(options['workers'])]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Started {len(threads)} webhook workers ({prefix}).")
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS(f"Processed {sum(processed)} events."))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from crm import assignment
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-agent load counters used for agent assignment from scratch."
+
+    def handle(self, *args, **options):
+        count = assignment.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt load counters for {count} agents."))
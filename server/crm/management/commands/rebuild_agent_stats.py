@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from crm import rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-agent daily statistics rollups from the call and ticket tables."
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} daily rollup rows."))
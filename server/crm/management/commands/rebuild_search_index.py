@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from crm import search
+
+
+class Command(BaseCommand):
+    help = "Reindexes every customer and ticket for full-text search (crm.search)."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the '{search.get_backend().name}' search index."))
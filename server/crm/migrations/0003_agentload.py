@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_agent_load(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    AgentLoad = apps.get_model('crm', 'AgentLoad')
+    agents = User.objects.filter(role='Agent').annotate(
+        num_customers=Count('assigned_customers', distinct=True),
+        num_open_tickets=Count(
+            'assigned_tickets',
+            filter=Q(assigned_tickets__status__in=['Open', 'Pending']),
+            distinct=True,
+        ),
+    )
+    AgentLoad.objects.bulk_create([
+        AgentLoad(agent_id=agent.pk, customer_count=agent.num_customers, open_ticket_count=agent.num_open_tickets)
+        for agent in agents
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('crm', '0002_customer_assigned_agent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentLoad',
+            fields=[
+                ('agent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='load', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('customer_count', models.IntegerField(default=0)),
+                ('open_ticket_count', models.IntegerField(default=0)),
+                ('last_assigned_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['customer_count', 'agent'], name='agentload_least_loaded_idx'), models.Index(fields=['last_assigned_at', 'agent'], name='agentload_round_robin_idx')],
+            },
+        ),
+        migrations.RunPython(populate_agent_load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+LEGACY_SID_PREFIX = 'Twilio Call SID: '
+
+
+def backfill_provider_sid(apps, schema_editor):
+    """
+    Webhook calls used to keep their SID in `notes` and were never ended, so
+    they all counted as active forever. Move the SID to provider_sid and end
+    every legacy call.
+
+    A SID logged more than once (ringing, in-progress, ...) is one call: the
+    first row is kept and ended at the last callback, and the duplicates are
+    deleted (their ticket, if any, moves to the kept row). A call logged once
+    ends at its start, since its real end is unknown.
+    """
+    Call = apps.get_model('crm', 'Call')
+    Ticket = apps.get_model('crm', 'Ticket')
+    kept = {}
+    legacy = Call.objects.filter(notes__startswith=LEGACY_SID_PREFIX).order_by('call_id')
+    for call in legacy.iterator():
+        sid = call.notes[len(LEGACY_SID_PREFIX):].strip()
+        if not sid or sid == 'None':
+            if call.call_end_time is None:
+                Call.objects.filter(pk=call.pk).update(call_end_time=call.call_start_time)
+            continue
+        first = kept.get(sid)
+        if first is None:
+            kept[sid] = call
+            call.provider_sid = sid
+            call.notes = None
+            call.call_end_time = call.call_end_time or call.call_start_time
+            continue
+        first.call_end_time = max(first.call_end_time, call.call_end_time or call.call_start_time)
+        if not Ticket.objects.filter(call=first).exists():
+            Ticket.objects.filter(call=call).update(call=first)
+        call.delete()
+
+    for call in kept.values():
+        if call.duration_seconds is None and call.call_end_time > call.call_start_time:
+            call.duration_seconds = int((call.call_end_time - call.call_start_time).total_seconds())
+        Call.objects.filter(pk=call.pk).update(
+            provider_sid=call.provider_sid, notes=None,
+            call_end_time=call.call_end_time, duration_seconds=call.duration_seconds,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0004_webhookevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='call',
+            name='duration_seconds',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='call',
+            name='provider_sid',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='call',
+            index=models.Index(condition=models.Q(('call_end_time__isnull', True)), fields=['call_end_time'], name='call_active_idx'),
+        ),
+        migrations.RunPython(backfill_provider_sid, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_rollups(apps, schema_editor):
+    from crm.rollups import build_rows
+
+    AgentDailyStats = apps.get_model('crm', 'AgentDailyStats')
+    rows = build_rows(apps.get_model('crm', 'Call'), apps.get_model('crm', 'Ticket'), AgentDailyStats)
+    AgentDailyStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0005_call_provider_sid'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('calls', models.IntegerField(default=0)),
+                ('calls_timed', models.IntegerField(default=0)),
+                ('call_seconds', models.BigIntegerField(default=0)),
+                ('tickets_assigned', models.IntegerField(default=0)),
+                ('tickets_open', models.IntegerField(default=0)),
+                ('tickets_pending', models.IntegerField(default=0)),
+                ('tickets_resolved', models.IntegerField(default=0)),
+                ('resolutions_timed', models.IntegerField(default=0)),
+                ('resolution_seconds', models.BigIntegerField(default=0)),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', 'agent'], name='agentdailystats_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('agent', 'date'), name='agentdailystats_agent_date_uniq'), models.UniqueConstraint(condition=models.Q(('agent__isnull', True)), fields=('date',), name='agentdailystats_unassigned_date_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:41
+
+from django.db import migrations, models
+from crm.phones import normalize_phone
+
+
+def backfill_phone_normalized(apps, schema_editor):
+    """
+    Only the oldest customer of each number gets phone_normalized; later
+    duplicates stay NULL until `manage.py dedupe_customer_phones` merges them
+    into it.
+    """
+    Customer = apps.get_model('crm', 'Customer')
+    seen = set()
+    for customer in Customer.objects.order_by('customer_id').only('customer_id', 'phone_number').iterator():
+        normalized = normalize_phone(customer.phone_number)
+        if normalized is None or normalized in seen:
+            continue
+        seen.add(normalized)
+        Customer.objects.filter(pk=customer.pk).update(phone_normalized=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0007_crm_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.RunPython(backfill_phone_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:02
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Raw SQL over the current tables; see crm.search for the per-backend layout.
+    from crm import search
+    search.get_backend(schema_editor.connection.vendor).setup(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from crm import search
+    search.get_backend(schema_editor.connection.vendor).teardown(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0008_customer_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0011_liveevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEventListener',
+            fields=[
+                ('process', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('seen_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
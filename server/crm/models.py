@@ -1,5 +1,8 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+from .phones import normalize_phone
 
 class Campaign(models.Model):
     campaign_id = models.AutoField(primary_key=True)
@@ -18,6 +21,8 @@ class Customer(models.Model):
     full_name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
     phone_number = models.CharField(max_length=20)
+    # E.164 form of phone_number (see crm.phones), set on save; callers are matched on it.
+    phone_normalized = models.CharField(max_length=16, unique=True, null=True, blank=True, editable=False)
     address = models.TextField(blank=True, null=True)
     registration_date = models.DateTimeField(auto_now_add=True)
     account_status = models.CharField(max_length=50, default='Active')
@@ -28,9 +33,57 @@ class Customer(models.Model):
     # N-M Relationship with Campaign
     campaigns = models.ManyToManyField(Campaign, related_name='customers', blank=True)
 
+    class Meta:
+        indexes = [
+            # Caller lookup on every Twilio webhook.
+            models.Index(fields=['phone_number'], name='customer_phone_idx'),
+            # An agent's own customers, in list (keyset) order.
+            models.Index(fields=['assigned_agent', 'customer_id'], name='customer_agent_idx'),
+        ]
+
     def __str__(self):
         return self.full_name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The number as stored, so save() can tell whether it changed.
+        instance._stored_phone_number = instance.__dict__.get('phone_number')
+        return instance
+
+    def phone_changed(self, phone_number=None):
+        """Whether `phone_number` (default: the current one) is another number than the stored one, in any spelling."""
+        stored = getattr(self, '_stored_phone_number', None)
+        if self._state.adding or stored is None:
+            return True
+        number = self.phone_number if phone_number is None else phone_number
+        return number != stored and normalize_phone(number) != normalize_phone(stored)
+
+    def phone_owner(self):
+        """Another customer already holding this phone number, if any."""
+        normalized = normalize_phone(self.phone_number)
+        if normalized is None:
+            return None
+        return Customer.objects.filter(phone_normalized=normalized).exclude(pk=self.pk).first()
+
+    def clean(self):
+        if not self.phone_changed():
+            return
+        owner = self.phone_owner()
+        if owner is not None:
+            raise ValidationError({'phone_number': f'This number already belongs to {owner} (ID: {owner.customer_id}).'})
+
+    def save(self, *args, **kwargs):
+        # Only when the number changes: a duplicate left NULL by migration 0008
+        # stays editable until `dedupe_customer_phones` merges it.
+        if self.phone_changed():
+            self.phone_normalized = normalize_phone(self.phone_number)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'phone_number' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'phone_normalized'}
+        super().save(*args, **kwargs)
+        self._stored_phone_number = self.phone_number
+
 class Call(models.Model):
     CALL_TYPE_CHOICES = (
         ('Inbound', 'Inbound'),
@@ -45,9 +98,22 @@ class Call(models.Model):
     call_end_time = models.DateTimeField(null=True, blank=True)
     call_type = models.CharField(max_length=10, choices=CALL_TYPE_CHOICES)
     recording_path = models.URLField(blank=True, null=True, help_text="Path to recording")
+    # Telephony provider id (Twilio CallSid); every status callback for a call upserts this row.
+    provider_sid = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    duration_seconds = models.PositiveIntegerField(null=True, blank=True)
     
     notes = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Partial index: only calls still in progress, so "active calls" stays tiny.
+            models.Index(fields=['call_end_time'], condition=models.Q(call_end_time__isnull=True), name='call_active_idx'),
+            # Call log in list (keyset) order, overall, per customer and per agent.
+            models.Index(fields=['call_start_time', 'call_id'], name='call_start_idx'),
+            models.Index(fields=['customer', 'call_start_time'], name='call_customer_start_idx'),
+            models.Index(fields=['agent', 'call_start_time'], name='call_agent_start_idx'),
+        ]
+
     def __str__(self):
         return f"Call {self.call_id} - {self.customer}"
 
@@ -79,5 +145,140 @@ class Ticket(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
 
+    class Meta:
+        indexes = [
+            # Ticket board in list (keyset) order, and per status counts/filters.
+            models.Index(fields=['created_at', 'ticket_id'], name='ticket_created_idx'),
+            models.Index(fields=['status', 'created_at'], name='ticket_status_created_idx'),
+            # An agent's tickets by status (dashboard, open ticket load) and an
+            # agent's board columns in list order.
+            models.Index(fields=['agent', 'status', 'created_at'], name='ticket_agent_status_idx'),
+            # A customer's ticket history.
+            models.Index(fields=['customer', 'created_at'], name='ticket_customer_created_idx'),
+        ]
+
     def __str__(self):
         return f"#{self.ticket_id} - {self.title}"
+
+class AgentLoad(models.Model):
+    """
+    Denormalized per-agent workload used by the assignment engine
+    (crm.assignment). Kept in sync by crm.signals; rebuild with
+    `manage.py rebuild_agent_load` if it ever drifts.
+    """
+    agent = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='load')
+    customer_count = models.IntegerField(default=0)
+    open_ticket_count = models.IntegerField(default=0)
+    last_assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer_count', 'agent'], name='agentload_least_loaded_idx'),
+            models.Index(fields=['last_assigned_at', 'agent'], name='agentload_round_robin_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.agent} - {self.customer_count} customers, {self.open_ticket_count} open tickets"
+
+class WebhookEvent(models.Model):
+    """
+    Raw webhook payload persisted by the webhook views and processed later by
+    `manage.py process_webhooks` (see crm.ingestion).
+    """
+    SOURCE_CHOICES = (
+        ('Twilio', 'Twilio'),
+        ('Email', 'Email'),
+    )
+    STATUS_CHOICES = (
+        ('Pending', 'Pending'),
+        ('Processing', 'Processing'),
+        ('Done', 'Done'),
+        ('Dead', 'Dead'),
+    )
+
+    event_id = models.AutoField(primary_key=True)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    payload = models.JSONField()
+    # Provider delivery id; a redelivered webhook with the same key is dropped on enqueue.
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, null=True)
+
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='webhookevent_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} event {self.event_id} ({self.status})"
+
+class AgentDailyStats(models.Model):
+    """
+    Per agent, per day activity rollup read by the supervisor stats endpoint.
+    Maintained incrementally by crm.signals (see crm.rollups); rebuild with
+    `manage.py rebuild_agent_stats`. Rows with no agent hold unassigned work,
+    including a deleted agent's, folded in by crm.rollups.release_agent.
+
+    Call figures are bucketed on the call's start date; ticket counts on the
+    ticket's creation date, except resolutions, which land on resolved_at
+    (or the creation date for legacy tickets resolved without a timestamp).
+    """
+    agent = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True, related_name='daily_stats')
+    date = models.DateField()
+
+    calls = models.IntegerField(default=0)
+    calls_timed = models.IntegerField(default=0)
+    call_seconds = models.BigIntegerField(default=0)
+
+    tickets_assigned = models.IntegerField(default=0)
+    tickets_open = models.IntegerField(default=0)
+    tickets_pending = models.IntegerField(default=0)
+    tickets_resolved = models.IntegerField(default=0)
+    resolutions_timed = models.IntegerField(default=0)
+    resolution_seconds = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['agent', 'date'], name='agentdailystats_agent_date_uniq'),
+            models.UniqueConstraint(fields=['date'], condition=models.Q(agent__isnull=True), name='agentdailystats_unassigned_date_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['date', 'agent'], name='agentdailystats_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.agent} - {self.date}"
+
+class LiveEvent(models.Model):
+    """
+    Outbox of change events for the live dashboards (see crm.events). Written
+    on commit when CRM_EVENT_BUS = 'database' and polled by every process
+    serving event streams; pruned after CRM_EVENT_RETENTION_SECONDS.
+    """
+    event_id = models.BigAutoField(primary_key=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    payload = models.JSONField()
+
+    def __str__(self):
+        return f"{self.payload.get('type')} {self.payload.get('action')} ({self.event_id})"
+
+
+class LiveEventListener(models.Model):
+    """
+    A process with live streams connected (see crm.events.DatabaseBus). The
+    process refreshes `seen_at` while streams are open; events are only
+    written to the outbox while some process was seen recently.
+    """
+    process = models.CharField(max_length=255, primary_key=True)
+    seen_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.process
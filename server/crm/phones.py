@@ -0,0 +1,46 @@
+"""
+Phone number normalization for caller matching.
+
+Customers are matched to incoming calls on `Customer.phone_normalized`, the
+E.164 form ("+15551234567") of whatever was typed or received, so
+"(555) 123-4567", "555.123.4567" and Twilio's "+15551234567" are the same
+customer. Numbers written without a country code are taken to be national
+numbers of CRM_PHONE_DEFAULT_COUNTRY_CODE, with a leading
+CRM_PHONE_TRUNK_PREFIX (e.g. the "0" in "0532 ...") dropped.
+
+This is deliberately a formatting canonicalizer, not a numbering-plan
+validator: anything that is not 7-15 digits once punctuation is removed
+(e.g. the "Unknown" placeholder of email-created customers) has no
+normalized form and is never matched.
+"""
+import re
+
+from django.conf import settings
+
+SEPARATORS = re.compile(r'[\s().\-/]')
+EXTENSION = re.compile(r'\s*(?:ext\.?|x|#)\s*\d+$', re.IGNORECASE)
+
+
+def normalize_phone(value):
+    """Returns `value` in E.164 form, or None if it does not look like a phone number."""
+    if not value:
+        return None
+    number = SEPARATORS.sub('', EXTENSION.sub('', value.strip()))
+
+    if number.startswith('+'):
+        digits = number[1:]
+    elif number.startswith('00'):
+        digits = number[2:]
+    else:
+        digits = number
+        country_code = getattr(settings, 'CRM_PHONE_DEFAULT_COUNTRY_CODE', '1')
+        trunk_prefix = getattr(settings, 'CRM_PHONE_TRUNK_PREFIX', '')
+        if trunk_prefix and digits.startswith(trunk_prefix):
+            digits = country_code + digits[len(trunk_prefix):]
+        # Longer than a national number and already led by the country code: keep as is.
+        elif not (digits.startswith(country_code) and len(digits) > 10):
+            digits = country_code + digits
+
+    if not digits.isdigit() or not 7 <= len(digits) <= 15 or digits.startswith('0'):
+        return None
+    return '+' + digits
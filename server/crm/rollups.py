@@ -0,0 +1,167 @@
+"""
+Incremental maintenance of AgentDailyStats.
+
+Each Call and Ticket "contributes" a few counters to one or two
+(agent, day) rows. On save the row's old contribution is subtracted and
+the new one added, so reassigning, resolving, re-opening or deleting keeps
+the rollups exact without ever rescanning the base tables. Bulk operations
+bypass signals; `manage.py rebuild_agent_stats` recomputes from scratch.
+"""
+from collections import Counter, defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from core import response_cache
+from .models import AgentDailyStats, Call, Ticket
+
+
+def call_state(call):
+    return {
+        'agent_id': call.agent_id,
+        'call_start_time': call.call_start_time,
+        'duration_seconds': call.duration_seconds,
+    }
+
+
+def ticket_state(ticket):
+    return {
+        'agent_id': ticket.agent_id,
+        'status': ticket.status,
+        'created_at': ticket.created_at,
+        'resolved_at': ticket.resolved_at,
+    }
+
+
+def call_contributions(state):
+    if state is None:
+        return {}
+    counters = Counter(calls=1)
+    if state['duration_seconds'] is not None:
+        counters.update(calls_timed=1, call_seconds=state['duration_seconds'])
+    return {(state['agent_id'], timezone.localdate(state['call_start_time'])): counters}
+
+
+def ticket_contributions(state):
+    if state is None:
+        return {}
+    created = (state['agent_id'], timezone.localdate(state['created_at']))
+    contributions = defaultdict(Counter)
+    contributions[created]['tickets_assigned'] += 1
+    if state['status'] == 'Open':
+        contributions[created]['tickets_open'] += 1
+    elif state['status'] == 'Pending':
+        contributions[created]['tickets_pending'] += 1
+    elif state['status'] == 'Resolved':
+        if state['resolved_at'] is None:
+            contributions[created]['tickets_resolved'] += 1
+        else:
+            resolved = (state['agent_id'], timezone.localdate(state['resolved_at']))
+            contributions[resolved]['tickets_resolved'] += 1
+            contributions[resolved]['resolutions_timed'] += 1
+            contributions[resolved]['resolution_seconds'] += max(
+                0, int((state['resolved_at'] - state['created_at']).total_seconds())
+            )
+    return contributions
+
+
+def apply(old, new):
+    """Replaces the `old` contributions with the `new` ones."""
+    deltas = defaultdict(Counter)
+    for key, counters in new.items():
+        deltas[key].update(counters)
+    for key, counters in old.items():
+        deltas[key].subtract(counters)
+    for (agent_id, day), counters in deltas.items():
+        changes = {field: value for field, value in counters.items() if value}
+        if changes:
+            _upsert(agent_id, day, changes)
+
+
+def _upsert(agent_id, day, changes):
+    expressions = {field: F(field) + value for field, value in changes.items()}
+    rows = AgentDailyStats.objects.filter(agent_id=agent_id, date=day)
+    if rows.update(**expressions):
+        return
+    try:
+        with transaction.atomic():
+            AgentDailyStats.objects.create(agent_id=agent_id, date=day, **changes)
+    except IntegrityError:
+        # Created concurrently; both uniqueness constraints make the row unique.
+        rows.update(**expressions)
+
+
+COUNTERS = (
+    'calls', 'calls_timed', 'call_seconds', 'tickets_assigned', 'tickets_open', 'tickets_pending',
+    'tickets_resolved', 'resolutions_timed', 'resolution_seconds',
+)
+
+
+def release_agent(agent_id):
+    """
+    Folds a user's rows into the unassigned ones before the user is deleted:
+    their calls and tickets are kept with no agent, through a bulk SET_NULL
+    that sends no signals.
+    """
+    rows = AgentDailyStats.objects.filter(agent_id=agent_id)
+    for row in rows.values('date', *COUNTERS):
+        changes = {field: row[field] for field in COUNTERS if row[field]}
+        if changes:
+            _upsert(None, row['date'], changes)
+    if rows.delete()[0]:
+        response_cache.invalidate(Call, Ticket)
+
+
+def build_rows(call_model, ticket_model, stats_model):
+    """
+    Computes all rollup rows from the base tables with three grouped queries.
+    Takes the models as arguments so migrations can pass historical ones.
+    """
+    rows = defaultdict(Counter)
+
+    calls = call_model.objects.annotate(day=TruncDate('call_start_time')).values('agent_id', 'day').annotate(
+        num=Count('pk'), timed=Count('duration_seconds'), seconds=Sum('duration_seconds'),
+    ).order_by()
+    for row in calls:
+        rows[row['agent_id'], row['day']].update(
+            calls=row['num'], calls_timed=row['timed'], call_seconds=row['seconds'] or 0,
+        )
+
+    created = ticket_model.objects.annotate(day=TruncDate('created_at')).values('agent_id', 'day').annotate(
+        num=Count('pk'),
+        open=Count('pk', filter=Q(status='Open')),
+        pending=Count('pk', filter=Q(status='Pending')),
+        resolved_untimed=Count('pk', filter=Q(status='Resolved', resolved_at__isnull=True)),
+    ).order_by()
+    for row in created:
+        rows[row['agent_id'], row['day']].update(
+            tickets_assigned=row['num'], tickets_open=row['open'], tickets_pending=row['pending'],
+            tickets_resolved=row['resolved_untimed'],
+        )
+
+    resolved = ticket_model.objects.filter(status='Resolved', resolved_at__isnull=False).annotate(
+        day=TruncDate('resolved_at'),
+        took=ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField()),
+    ).values('agent_id', 'day').annotate(num=Count('pk'), total=Sum('took')).order_by()
+    for row in resolved:
+        rows[row['agent_id'], row['day']].update(
+            tickets_resolved=row['num'],
+            resolutions_timed=row['num'],
+            resolution_seconds=max(0, int(row['total'].total_seconds())) if row['total'] else 0,
+        )
+
+    return [
+        stats_model(agent_id=agent_id, date=day, **counters)
+        for (agent_id, day), counters in rows.items()
+    ]
+
+
+def rebuild():
+    """Recomputes every rollup row; returns the number of rows written."""
+    with transaction.atomic():
+        AgentDailyStats.objects.all().delete()
+        rows = AgentDailyStats.objects.bulk_create(build_rows(Call, Ticket, AgentDailyStats), batch_size=1000)
+        # Cached stats follow the rollups through the call and ticket generations.
+        response_cache.invalidate(Call, Ticket)
+    return len(rows)
@@ -0,0 +1,269 @@
+"""
+Full-text search over customers and tickets.
+
+Each searchable model is described by a `Document`: the text columns that
+make it up, as SQL expressions over the model's own table, and their
+weights. How those documents are indexed depends on CRM_SEARCH_BACKEND:
+
+    fts5      SQLite: one FTS5 table per document (crm_<kind>_search), rowid =
+              the model's primary key, ranked with bm25(). Rows are re-indexed
+              by crm.signals on save/delete and by crm.bulk after imports.
+    postgres  PostgreSQL: a GIN index over the weighted tsvector expression,
+              ranked with ts_rank(). Postgres maintains the index itself on
+              every write, so there is nothing to sync.
+    basic     Any other database: unranked icontains filters.
+
+The default, 'auto', picks fts5 or postgres from the database vendor.
+
+Queries are split into words and every word is prefix matched, all of them
+must occur ("jan do" finds "Jane Doe"). Searches run inside a scope
+queryset (e.g. an agent's own customers), so results obey the same
+visibility rules as the viewsets.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from .models import Customer, Ticket
+
+TERM = re.compile(r'\w+', re.UNICODE)
+MAX_TERMS = 8
+BATCH_SIZE = 500
+
+
+class Document:
+    def __init__(self, kind, model, columns, weights):
+        self.kind = kind
+        self.model = model
+        # name -> SQL expression over the model's table
+        self.columns = columns
+        self.weights = weights
+
+    @property
+    def table(self):
+        return f'crm_{self.kind}_search'
+
+    @property
+    def base_table(self):
+        return self.model._meta.db_table
+
+    @property
+    def pk_column(self):
+        return self.model._meta.pk.column
+
+
+def _digits(column):
+    """SQL for `column` without the usual phone punctuation, so 5551234567 matches (555) 123-4567."""
+    expression = f'COALESCE("{column}", \'\')'
+    for character in ('(', ')', '-', '.', ' ', '+'):
+        expression = f"REPLACE({expression}, '{character}', '')"
+    return expression
+
+
+DOCUMENTS = {
+    Customer: Document('customer', Customer, {
+        'full_name': 'COALESCE("full_name", \'\')',
+        'email': 'COALESCE("email", \'\')',
+        'phone': f"""COALESCE("phone_number", '') || ' ' || {_digits('phone_number')} || ' ' || {_digits('phone_normalized')}""",
+        'address': 'COALESCE("address", \'\')',
+    }, weights=(10.0, 5.0, 5.0, 1.0)),
+    Ticket: Document('ticket', Ticket, {
+        'title': 'COALESCE("title", \'\')',
+        'description': 'COALESCE("description", \'\')',
+        'category': 'COALESCE("issue_category", \'\')',
+    }, weights=(10.0, 1.0, 3.0)),
+}
+
+
+def parse_terms(text):
+    return [term.lower() for term in TERM.findall(text or '')][:MAX_TERMS]
+
+
+def _batches(pks):
+    pks = list(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        yield pks[start:start + BATCH_SIZE]
+
+
+class SearchBackend:
+    name = None
+
+    def setup(self, connection):
+        """Creates the index structures and fills them (run by the migration)."""
+
+    def teardown(self, connection):
+        """Drops what `setup` created."""
+
+    def index(self, document, pks):
+        """(Re)indexes the rows with these primary keys; a missing row is dropped."""
+
+    def remove(self, document, pks):
+        """Drops these primary keys from the index."""
+
+    def rebuild(self, document):
+        """Reindexes every row."""
+
+    def search(self, document, terms, scope, limit):
+        """Returns the primary keys of the best `limit` matches within `scope`, best first."""
+        raise NotImplementedError
+
+
+class Fts5Backend(SearchBackend):
+    name = 'fts5'
+
+    def setup(self, connection):
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS.values():
+                cursor.execute(
+                    f'CREATE VIRTUAL TABLE IF NOT EXISTS "{document.table}" USING fts5('
+                    f"{', '.join(document.columns)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+                )
+                self._fill(cursor, document)
+
+    def teardown(self, connection):
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS.values():
+                cursor.execute(f'DROP TABLE IF EXISTS "{document.table}"')
+
+    def _fill(self, cursor, document, pks=None):
+        sql = (
+            f'INSERT INTO "{document.table}" (rowid, {", ".join(document.columns)}) '
+            f'SELECT "{document.pk_column}", {", ".join(document.columns.values())} FROM "{document.base_table}"'
+        )
+        if pks is None:
+            cursor.execute(sql)
+        else:
+            cursor.execute(f'{sql} WHERE "{document.pk_column}" IN ({", ".join(["%s"] * len(pks))})', pks)
+
+    def index(self, document, pks):
+        with connection.cursor() as cursor:
+            for batch in _batches(pks):
+                self._delete(cursor, document, batch)
+                self._fill(cursor, document, batch)
+
+    def remove(self, document, pks):
+        with connection.cursor() as cursor:
+            for batch in _batches(pks):
+                self._delete(cursor, document, batch)
+
+    def _delete(self, cursor, document, pks):
+        cursor.execute(f'DELETE FROM "{document.table}" WHERE rowid IN ({", ".join(["%s"] * len(pks))})', pks)
+
+    def rebuild(self, document):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{document.table}"')
+            self._fill(cursor, document)
+
+    def search(self, document, terms, scope, limit):
+        scope_sql, scope_params = scope.values('pk').query.sql_with_params()
+        match = ' '.join('"%s"*' % term.replace('"', '""') for term in terms)
+        weights = ', '.join(str(weight) for weight in document.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                # "+rowid" keeps the scope from being offered to FTS5 as a rowid constraint:
+                # the MATCH must drive the query, the scope only filters its hits.
+                f'SELECT rowid FROM "{document.table}" WHERE "{document.table}" MATCH %s '
+                f'AND +rowid IN ({scope_sql}) ORDER BY bm25("{document.table}", {weights}) LIMIT %s',
+                [match, *scope_params, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresBackend(SearchBackend):
+    name = 'postgres'
+    config = 'simple'
+    labels = 'ABCD'
+
+    def vector(self, document):
+        # Must stay byte-for-byte identical between the index and the queries for the index to be used.
+        return ' || '.join(
+            f"setweight(to_tsvector('{self.config}', {expression}), '{label}')"
+            for expression, label in zip(document.columns.values(), self.labels)
+        )
+
+    def setup(self, connection):
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS.values():
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{document.table}_idx" '
+                    f'ON "{document.base_table}" USING gin (({self.vector(document)}))'
+                )
+
+    def teardown(self, connection):
+        with connection.cursor() as cursor:
+            for document in DOCUMENTS.values():
+                cursor.execute(f'DROP INDEX IF EXISTS "{document.table}_idx"')
+
+    def search(self, document, terms, scope, limit):
+        scope_sql, scope_params = scope.values('pk').query.sql_with_params()
+        query = ' & '.join(f'{term}:*' for term in terms)
+        vector = self.vector(document)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT "{document.pk_column}" FROM "{document.base_table}" '
+                f"WHERE ({vector}) @@ to_tsquery('{self.config}', %s) AND \"{document.pk_column}\" IN ({scope_sql}) "
+                f"ORDER BY ts_rank({vector}, to_tsquery('{self.config}', %s)) DESC LIMIT %s",
+                [query, *scope_params, query, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class BasicBackend(SearchBackend):
+    name = 'basic'
+    fields = {
+        Customer: ('full_name', 'email', 'phone_number', 'phone_normalized', 'address'),
+        Ticket: ('title', 'description', 'issue_category'),
+    }
+
+    def search(self, document, terms, scope, limit):
+        for term in terms:
+            match = Q()
+            for field in self.fields[document.model]:
+                match |= Q(**{f'{field}__icontains': term})
+            scope = scope.filter(match)
+        return list(scope.order_by('-pk').values_list('pk', flat=True)[:limit])
+
+
+BACKENDS = {backend.name: backend for backend in (Fts5Backend, PostgresBackend, BasicBackend)}
+VENDOR_BACKENDS = {'sqlite': 'fts5', 'postgresql': 'postgres'}
+
+
+def get_backend(vendor=None):
+    name = getattr(settings, 'CRM_SEARCH_BACKEND', 'auto')
+    if name == 'auto':
+        name = VENDOR_BACKENDS.get(vendor or connection.vendor, 'basic')
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown search backend '{name}'. Choose from: auto, {', '.join(BACKENDS)}")
+
+
+# --- Entry points ---
+
+def index(instance):
+    get_backend().index(DOCUMENTS[type(instance)], [instance.pk])
+
+
+def index_many(model, pks):
+    get_backend().index(DOCUMENTS[model], pks)
+
+
+def remove(instance):
+    get_backend().remove(DOCUMENTS[type(instance)], [instance.pk])
+
+
+def rebuild():
+    backend = get_backend()
+    for document in DOCUMENTS.values():
+        backend.rebuild(document)
+
+
+def search(model, text, scope, limit=20):
+    """Returns instances of `model` from `scope` matching `text`, best match first."""
+    terms = parse_terms(text)
+    if not terms:
+        return []
+    pks = get_backend().search(DOCUMENTS[model], terms, scope, limit)
+    found = scope.in_bulk(pks)
+    return [found[pk] for pk in pks if pk in found]
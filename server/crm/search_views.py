@@ -0,0 +1,62 @@
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from core.permissions import IsAgent
+from .models import Customer, Ticket
+from . import search
+
+SEARCH_LIMIT_DEFAULT = 20
+SEARCH_LIMIT_MAX = 100
+CUSTOMER_FIELDS = ('customer_id', 'full_name', 'email', 'phone_number', 'account_status')
+TICKET_FIELDS = ('ticket_id', 'title', 'status', 'priority_level', 'issue_category', 'created_at')
+
+
+class SearchView(APIView):
+    """
+    Ranked, prefix-matched search over customers and tickets (see crm.search).
+
+    `q` is required; `type` narrows to `customers` or `tickets`; `limit` caps
+    each list. Agents only find their own customers and tickets, as in the
+    viewsets; Supervisors and Admins search everything.
+    """
+    permission_classes = [IsAgent]
+
+    def scoped(self, queryset, agent_field):
+        user = self.request.user
+        if user.role in ['Supervisor', 'Admin']:
+            return queryset
+        return queryset.filter(**{agent_field: user})
+
+    def get(self, request):
+        text = request.query_params.get('q', '')
+        if not search.parse_terms(text):
+            return Response({'error': 'q must contain at least one word'}, status=400)
+        kind = request.query_params.get('type')
+        if kind not in (None, 'customers', 'tickets'):
+            return Response({'error': 'type must be customers or tickets'}, status=400)
+        try:
+            limit = min(int(request.query_params.get('limit', SEARCH_LIMIT_DEFAULT)), SEARCH_LIMIT_MAX)
+        except ValueError:
+            limit = SEARCH_LIMIT_DEFAULT
+        limit = max(limit, 1)
+
+        results = {}
+        if kind in (None, 'customers'):
+            customers = search.search(
+                Customer, text, self.scoped(Customer.objects.select_related('assigned_agent'), 'assigned_agent'), limit
+            )
+            results['customers'] = [
+                {
+                    **{field: getattr(customer, field) for field in CUSTOMER_FIELDS},
+                    'assigned_agent_name': customer.assigned_agent.username if customer.assigned_agent else None,
+                }
+                for customer in customers
+            ]
+        if kind in (None, 'tickets'):
+            tickets = search.search(
+                Ticket, text, self.scoped(Ticket.objects.select_related('customer'), 'agent'), limit
+            )
+            results['tickets'] = [
+                {**{field: getattr(ticket, field) for field in TICKET_FIELDS}, 'customer_name': ticket.customer.full_name}
+                for ticket in tickets
+            ]
+        return Response(results)
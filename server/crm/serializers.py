@@ -1,19 +1,42 @@
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Customer, Call, Ticket, Campaign
+from .models import Customer, Call, Ticket, Campaign, WebhookEvent
+from core.serializers import FieldsProjectionMixin
 
-class CampaignSerializer(serializers.ModelSerializer):
+class CampaignSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Campaign
         fields = '__all__'
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     assigned_agent_name = serializers.ReadOnlyField(source='assigned_agent.username')
 
     class Meta:
         model = Customer
         fields = '__all__'
 
-class CallSerializer(serializers.ModelSerializer):
+    def validate_phone_number(self, value):
+        if self.instance is not None and not self.instance.phone_changed(value):
+            return value
+        owner = Customer(pk=getattr(self.instance, 'pk', None), phone_number=value).phone_owner()
+        if owner is not None:
+            raise serializers.ValidationError(f'This number already belongs to {owner} (ID: {owner.customer_id}).')
+        return value
+
+class CustomerImportSerializer(serializers.Serializer):
+    """One record of a bulk import (see crm.bulk); uniqueness is handled by the importer."""
+    full_name = serializers.CharField(max_length=255)
+    email = serializers.EmailField(max_length=254)
+    phone_number = serializers.CharField(max_length=20)
+    address = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    account_status = serializers.CharField(max_length=50, required=False)
+    campaigns = serializers.ListField(child=serializers.IntegerField(), required=False)
+
+class CustomerImportOptionsSerializer(serializers.Serializer):
+    """The form fields sent alongside an import upload."""
+    campaign = serializers.PrimaryKeyRelatedField(queryset=Campaign.objects.all(), required=False, allow_null=True)
+
+class CallSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     agent_name = serializers.ReadOnlyField(source='agent.username')
     customer_name = serializers.ReadOnlyField(source='customer.full_name')
 
@@ -21,10 +44,32 @@ class CallSerializer(serializers.ModelSerializer):
         model = Call
         fields = '__all__'
 
-class TicketSerializer(serializers.ModelSerializer):
+class TicketSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
     customer_name = serializers.ReadOnlyField(source='customer.full_name')
     agent_name = serializers.ReadOnlyField(source='agent.username')
 
     class Meta:
         model = Ticket
         fields = '__all__'
+
+    def validate(self, attrs):
+        """
+        resolved_at follows the status: a ticket becoming Resolved without one
+        is stamped now, re-opening clears it, and an unresolved ticket can't
+        be given one. Supervisor resolution times are measured from it.
+        """
+        instance = self.instance
+        status = attrs.get('status', instance.status if instance else Ticket._meta.get_field('status').get_default())
+        if status == 'Resolved':
+            if attrs.get('resolved_at', instance.resolved_at if instance else None) is None:
+                attrs['resolved_at'] = timezone.now()
+        elif attrs.get('resolved_at') is not None:
+            raise serializers.ValidationError({'resolved_at': 'Only resolved tickets have a resolution time.'})
+        elif instance is not None and instance.resolved_at is not None:
+            attrs['resolved_at'] = None
+        return attrs
+
+class WebhookEventSerializer(FieldsProjectionMixin, serializers.ModelSerializer):
+    class Meta:
+        model = WebhookEvent
+        fields = '__all__'
@@ -0,0 +1,137 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from core import response_cache
+from core.models import User
+from .models import AgentLoad, Call, Campaign, Customer, Ticket
+from . import assignment, events, rollups, search
+
+def _touches(update_fields, *names):
+    return update_fields is None or any(name in update_fields for name in names)
+
+# --- Agent load counters (see crm.assignment) ---
+
+@receiver(post_save, sender=User)
+def sync_agent_load_row(sender, instance, created, update_fields=None, **kwargs):
+    if not created and not _touches(update_fields, 'role'):
+        return
+    if instance.role == 'Agent':
+        AgentLoad.objects.get_or_create(agent=instance)
+    elif not created:
+        AgentLoad.objects.filter(agent=instance).delete()
+
+@receiver(pre_save, sender=Customer)
+def remember_previous_agent(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk:
+        instance._previous_agent_id = None
+    elif _touches(update_fields, 'assigned_agent'):
+        instance._previous_agent_id = Customer.objects.filter(pk=instance.pk).values_list(
+            'assigned_agent_id', flat=True
+        ).first()
+    else:
+        instance._previous_agent_id = instance.assigned_agent_id
+
+@receiver(post_save, sender=Customer)
+def update_customer_load(sender, instance, created, **kwargs):
+    previous = None if created else instance._previous_agent_id
+    if previous != instance.assigned_agent_id:
+        assignment.adjust(previous, customers=-1)
+        assignment.adjust(instance.assigned_agent_id, customers=1)
+
+@receiver(post_delete, sender=Customer)
+def release_customer_load(sender, instance, **kwargs):
+    assignment.adjust(instance.assigned_agent_id, customers=-1)
+
+@receiver(pre_save, sender=Ticket)
+def remember_previous_ticket(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Ticket.objects.filter(pk=instance.pk).values(
+            'agent_id', 'status', 'created_at', 'resolved_at'
+        ).first()
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_load(sender, instance, **kwargs):
+    previous = instance._previous_state
+    previous_open = previous['agent_id'] if previous and previous['status'] in assignment.OPEN_TICKET_STATUSES else None
+    current = instance.agent_id if assignment.is_open(instance) else None
+    if previous_open != current:
+        assignment.adjust(previous_open, open_tickets=-1)
+        assignment.adjust(current, open_tickets=1)
+
+@receiver(post_delete, sender=Ticket)
+def release_ticket_load(sender, instance, **kwargs):
+    if assignment.is_open(instance):
+        assignment.adjust(instance.agent_id, open_tickets=-1)
+
+# --- Supervisor statistics rollups (see crm.rollups) ---
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_rollups(sender, instance, **kwargs):
+    rollups.apply(
+        rollups.ticket_contributions(instance._previous_state),
+        rollups.ticket_contributions(rollups.ticket_state(instance)),
+    )
+
+@receiver(post_delete, sender=Ticket)
+def remove_ticket_rollups(sender, instance, **kwargs):
+    rollups.apply(rollups.ticket_contributions(rollups.ticket_state(instance)), {})
+
+@receiver(pre_save, sender=Call)
+def remember_previous_call(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk:
+        instance._previous_state = Call.objects.filter(pk=instance.pk).values(
+            'agent_id', 'call_start_time', 'duration_seconds'
+        ).first()
+
+@receiver(post_save, sender=Call)
+def update_call_rollups(sender, instance, **kwargs):
+    rollups.apply(
+        rollups.call_contributions(instance._previous_state),
+        rollups.call_contributions(rollups.call_state(instance)),
+    )
+
+@receiver(post_delete, sender=Call)
+def remove_call_rollups(sender, instance, **kwargs):
+    rollups.apply(rollups.call_contributions(rollups.call_state(instance)), {})
+
+@receiver(pre_delete, sender=User)
+def release_agent_rollups(sender, instance, **kwargs):
+    rollups.release_agent(instance.pk)
+
+# --- Full-text search index (see crm.search) ---
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Ticket)
+def update_search_index(sender, instance, **kwargs):
+    search.index(instance)
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Ticket)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove(instance)
+
+# --- Live dashboard events (see crm.events) ---
+
+@receiver(post_save, sender=Call)
+@receiver(post_save, sender=Ticket)
+@receiver(post_save, sender=Customer)
+def publish_change(sender, instance, created, **kwargs):
+    if sender is Customer:
+        previous_agent = instance._previous_agent_id
+    else:
+        previous_agent = (instance._previous_state or {}).get('agent_id')
+    events.publish(instance, 'created' if created else 'updated', previous_agent)
+
+@receiver(post_delete, sender=Call)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_delete, sender=Customer)
+def publish_delete(sender, instance, **kwargs):
+    events.publish(instance, 'deleted')
+
+# --- Cached responses (see core.response_cache) ---
+
+response_cache.register('campaigns', Campaign)
+response_cache.register('customers', Customer, Customer.campaigns.through, User)
+# Stats read the rollups, which only change with a call or a ticket (above).
+response_cache.register('supervisor-stats', Call, Ticket, User)
@@ -1,46 +1,100 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import permissions
-from django.db.models import Count, Q
+from django.db.models import Sum
+from django.utils.dateparse import parse_date
 from core.models import User
-from .models import Call, Ticket
+from .models import AgentDailyStats
 from core.permissions import IsSupervisor
+from core import response_cache
+from core.mixins import AnalyticsMixin
 
-class SupervisorStatsView(APIView):
+ROLLUP_FIELDS = (
+    'calls', 'calls_timed', 'call_seconds',
+    'tickets_assigned', 'tickets_open', 'tickets_pending',
+    'tickets_resolved', 'resolutions_timed', 'resolution_seconds',
+)
+
+SUMS = {field: Sum(field) for field in ROLLUP_FIELDS}
+AGENT_FIELDS = ('id', 'username', 'first_name', 'last_name')
+
+def _average(total, count):
+    return round(total / count, 1) if count else None
+
+def stats_querysets(params):
+    """
+    (rollups, per-agent sums, agents) for the request filters; raises
+    ValueError with the message for a 400. Shared with crm.async_views.
+    """
+    rollups = AgentDailyStats.objects.all()
+    agents = User.objects.filter(role='Agent')
+
+    for param, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+        value = params.get(param)
+        if value:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f'{param} must be a YYYY-MM-DD date')
+            rollups = rollups.filter(**{lookup: day})
+
+    team = params.get('team')
+    if team:
+        # Out of the 64-bit range, the database rejects the parameter instead of finding nothing.
+        if not team.isdecimal() or not 0 < int(team) < 2 ** 63:
+            raise ValueError('team must be a supervisor id')
+        team = int(team)
+        agents = agents.filter(supervisor_id=team)
+        rollups = rollups.filter(agent__supervisor_id=team)
+
+    per_agent = rollups.filter(agent__isnull=False).values('agent_id').annotate(**SUMS).order_by()
+    return rollups, per_agent, agents.only(*AGENT_FIELDS)
+
+def stats_payload(agents, per_agent_rows, totals):
+    per_agent = {row['agent_id']: row for row in per_agent_rows}
+
+    # 1. Agent Performance
+    agent_data = []
+    for agent in agents:
+        row = per_agent.get(agent.id, {})
+        agent_data.append({
+            'id': agent.id,
+            'username': agent.username,
+            'full_name': f"{agent.first_name} {agent.last_name}".strip() or agent.username,
+            'calls_count': row.get('calls') or 0,
+            'tickets_assigned': row.get('tickets_assigned') or 0,
+            'tickets_resolved': row.get('tickets_resolved') or 0,
+            'avg_call_duration': _average(row.get('call_seconds') or 0, row.get('calls_timed')),
+            'avg_resolution_time': _average(row.get('resolution_seconds') or 0, row.get('resolutions_timed')),
+        })
+
+    # 2. Overall Stats
+    return {
+        'agents': agent_data,
+        'stats': {
+            'total_calls': totals['calls'] or 0,
+            'total_tickets': totals['tickets_assigned'] or 0,
+            'open_tickets': totals['tickets_open'] or 0,
+            'pending_tickets': totals['tickets_pending'] or 0,
+            'resolved_tickets': totals['tickets_resolved'] or 0,
+            'avg_call_duration': _average(totals['call_seconds'] or 0, totals['calls_timed']),
+            'avg_resolution_time': _average(totals['resolution_seconds'] or 0, totals['resolutions_timed']),
+        }
+    }
+
+class SupervisorStatsView(AnalyticsMixin, APIView):
+    """
+    Team statistics read from the AgentDailyStats rollups (see crm.rollups),
+    never from the call/ticket tables, on the analytics database (see core.db).
+
+    Optional filters: `start` / `end` (YYYY-MM-DD, inclusive) and `team`
+    (a supervisor's user id: only agents reporting to them).
+    """
     permission_classes = [IsSupervisor]
 
+    @response_cache.cached_response('supervisor-stats')
     def get(self, request):
-        # 1. Agent Performance
-        # We filter for users with role='Agent'
-        agents = User.objects.filter(role='Agent').annotate(
-            total_calls=Count('calls', distinct=True),
-            total_tickets_assigned=Count('assigned_tickets', distinct=True),
-            total_tickets_resolved=Count('assigned_tickets', filter=Q(assigned_tickets__status='Resolved'), distinct=True)
-        )
-        
-        agent_data = []
-        for agent in agents:
-            agent_data.append({
-                'id': agent.id,
-                'username': agent.username,
-                'full_name': f"{agent.first_name} {agent.last_name}".strip() or agent.username,
-                'calls_count': agent.total_calls,
-                'tickets_assigned': agent.total_tickets_assigned,
-                'tickets_resolved': agent.total_tickets_resolved,
-            })
-
-        # 2. Overall Stats
-        total_calls = Call.objects.count()
-        total_tickets = Ticket.objects.count()
-        open_tickets = Ticket.objects.filter(status='Open').count()
-        resolved_tickets = Ticket.objects.filter(status='Resolved').count()
-        
-        return Response({
-            'agents': agent_data,
-            'stats': {
-                'total_calls': total_calls,
-                'total_tickets': total_tickets,
-                'open_tickets': open_tickets,
-                'resolved_tickets': resolved_tickets
-            }
-        })
+        try:
+            rollups, per_agent, agents = stats_querysets(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        return Response(stats_payload(agents, per_agent, rollups.aggregate(**SUMS)))
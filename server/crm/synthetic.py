@@ -0,0 +1,356 @@
+"""
+Synthetic call-center data for load tests and benchmarks.
+
+`generate` fills the database with realistic looking users, campaigns,
+customers, calls, tickets, security logs and dead webhook events. Rows are
+written with bulk_create in batches and only primary keys are kept in
+memory, so a million calls is a matter of minutes. The same seed and counts
+always produce the same data.
+
+The data has the shape the endpoints are tuned for:
+
+- every agent reports to a supervisor;
+- most customers have an agent, and most of a customer's calls and tickets
+  are handled by that agent;
+- calls and tickets are spread over the last `days` days;
+- a small share of calls is still in progress, and most tickets are
+  resolved.
+
+bulk_create sends no signals, so the derived tables (agent load, daily
+stats, search index) are rebuilt at the end and the response cache is
+invalidated.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from core import response_cache
+from core.models import SecurityLog, User
+from . import assignment, rollups, search
+from .models import Call, Campaign, Customer, Ticket, WebhookEvent
+from .phones import normalize_phone
+
+BATCH_SIZE = 2000
+
+# Row counts at scale 1; `scaled_counts` multiplies them.
+DEFAULT_COUNTS = {
+    'supervisors': 10,
+    'agents': 100,
+    'campaigns': 50,
+    'customers': 20_000,
+    'calls': 100_000,
+    'tickets': 30_000,
+    'security_logs': 50_000,
+    'dead_letters': 200,
+}
+
+FIRST_NAMES = (
+    'Ada', 'Amir', 'Ana', 'Ben', 'Chen', 'Chloe', 'Daniel', 'Elif', 'Emma', 'Fatima', 'Grace', 'Hana',
+    'Ivan', 'James', 'Jin', 'Kofi', 'Lena', 'Liam', 'Lucia', 'Mateo', 'Maya', 'Mehmet', 'Nia', 'Noah',
+    'Olga', 'Omar', 'Priya', 'Rosa', 'Sara', 'Sofia', 'Tariq', 'Yuki', 'Zeynep',
+)
+LAST_NAMES = (
+    'Adams', 'Ahmed', 'Brown', 'Costa', 'Demir', 'Diaz', 'Fischer', 'Garcia', 'Hansen', 'Ito', 'Jones',
+    'Kaya', 'Kim', 'Kowalski', 'Lee', 'Martin', 'Meyer', 'Nguyen', 'Novak', 'Okafor', 'Patel', 'Rossi',
+    'Silva', 'Smith', 'Tanaka', 'Walker', 'Wang', 'Yilmaz',
+)
+STREETS = ('Main St', 'Oak Ave', 'Park Rd', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Lake View', 'Hill Rd')
+DEPARTMENTS = ('Sales', 'Support', 'Billing', 'Retention')
+CAMPAIGN_TYPES = ('Survey', 'Promotion', 'Retention', 'Upsell', 'Onboarding')
+CAMPAIGN_STATUSES = ('Active', 'Active', 'Planned', 'Completed')
+ACCOUNT_STATUSES = ('Active',) * 8 + ('Inactive', 'Suspended')
+ISSUE_CATEGORIES = ('General', 'Billing', 'Technical', 'Delivery', 'Account', 'Complaint')
+TICKET_TITLES = (
+    'Cannot log in', 'Refund request', 'Invoice is wrong', 'Package not delivered', 'Change of address',
+    'Upgrade plan', 'Cancel subscription', 'Payment failed', 'App crashes on start', 'Slow connection',
+)
+SECURITY_EVENTS = ('Login',) * 6 + ('Data Access',) * 3 + ('Failed Attempt',)
+
+# Share of customers without an agent, calls still in progress, and calls that opened a ticket.
+UNASSIGNED_SHARE = 0.05
+ACTIVE_CALL_SHARE = 0.002
+CALL_TICKET_SHARE = 0.3
+
+
+def scaled_counts(scale=1.0, **overrides):
+    """DEFAULT_COUNTS times `scale` (at least one of each), with explicit counts taking precedence."""
+    counts = {name: max(1, round(count * scale)) for name, count in DEFAULT_COUNTS.items()}
+    counts.update({name: count for name, count in overrides.items() if count is not None})
+    return counts
+
+
+@contextmanager
+def _explicit_timestamps(*fields):
+    """Lets bulk_create keep the given auto_now_add values instead of stamping every row with now."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _insert(model, rows, batch_size):
+    """bulk_creates `rows` (any iterable) in batches and returns the new primary keys."""
+    pks = []
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            pks += [obj.pk for obj in model.objects.bulk_create(batch)]
+            batch = []
+    if batch:
+        pks += [obj.pk for obj in model.objects.bulk_create(batch)]
+    return pks
+
+
+class Generator:
+    def __init__(self, counts, seed=0, days=90, prefix='synthetic', password='synthetic', batch_size=BATCH_SIZE):
+        self.counts = counts
+        self.random = random.Random(seed)
+        self.days = days
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = batch_size
+        self.now = timezone.now()
+
+    def moment(self):
+        """A random time within the last `days` days."""
+        return self.now - timedelta(seconds=self.random.randrange(self.days * 86400))
+
+    def name(self):
+        return self.random.choice(FIRST_NAMES), self.random.choice(LAST_NAMES)
+
+    def run(self, progress=None):
+        if User.objects.filter(username__startswith=f'{self.prefix}_').exists():
+            raise ValueError(f"Synthetic data with prefix '{self.prefix}' already exists; pick another --prefix.")
+        steps = (
+            ('users', self.users), ('campaigns', self.campaigns), ('customers', self.customers),
+            ('memberships', self.memberships), ('calls', self.calls), ('tickets', self.tickets),
+            ('security logs', self.security_logs), ('dead letters', self.dead_letters),
+        )
+        self.created = {}
+        # One transaction: a failed run leaves nothing behind.
+        with transaction.atomic():
+            for label, step in steps:
+                self.created[label] = step()
+                if progress:
+                    progress(f"{label}: {self.created[label]}")
+            assignment.rebuild()
+            rollups.rebuild()
+            search.rebuild()
+            response_cache.invalidate(User, Campaign, Customer, Customer.campaigns.through, Call, Ticket)
+        return self.created
+
+    def users(self):
+        password = make_password(self.password)
+        supervisors = []
+        for index in range(self.counts['supervisors']):
+            first, last = self.name()
+            supervisors.append(User(
+                username=f'{self.prefix}_supervisor_{index}', password=password, role='Supervisor',
+                first_name=first, last_name=last, email=f'{self.prefix}.supervisor.{index}@example.com',
+                department=DEPARTMENTS[index % len(DEPARTMENTS)], access_level='Team', dashboard_access=True,
+            ))
+        self.supervisor_ids = _insert(User, supervisors, self.batch_size)
+        self.supervisor_departments = {pk: obj.department for pk, obj in zip(self.supervisor_ids, supervisors)}
+
+        def agents():
+            for index in range(self.counts['agents']):
+                first, last = self.name()
+                supervisor_id = self.supervisor_ids[index % len(self.supervisor_ids)]
+                yield User(
+                    username=f'{self.prefix}_agent_{index}', password=password, role='Agent',
+                    first_name=first, last_name=last, email=f'{self.prefix}.agent.{index}@example.com',
+                    department=self.supervisor_departments[supervisor_id], supervisor_id=supervisor_id,
+                    phone_extension=f'{1000 + index}',
+                )
+        self.agent_ids = _insert(User, agents(), self.batch_size)
+        admin = User.objects.create(
+            username=f'{self.prefix}_admin', password=password, role='Admin', email=f'{self.prefix}.admin@example.com',
+        )
+        self.admin_id = admin.pk
+        return len(self.supervisor_ids) + len(self.agent_ids) + 1
+
+    def campaigns(self):
+        def rows():
+            for index in range(self.counts['campaigns']):
+                start = (self.now - timedelta(days=self.random.randrange(self.days + 30))).date()
+                yield Campaign(
+                    campaign_name=f'{self.random.choice(CAMPAIGN_TYPES)} {start:%b %Y} #{index}',
+                    type=self.random.choice(CAMPAIGN_TYPES),
+                    start_date=start,
+                    end_date=start + timedelta(days=self.random.choice((14, 30, 60, 90))),
+                    status=self.random.choice(CAMPAIGN_STATUSES),
+                    target_group=self.random.choice(DEPARTMENTS),
+                )
+        self.campaign_ids = _insert(Campaign, rows(), self.batch_size)
+        return len(self.campaign_ids)
+
+    def customers(self):
+        # Customer index -> agent id (or None), so calls and tickets can follow the owner.
+        self.customer_agents = []
+
+        # Numbers follow on from the highest customer id, so a second run doesn't reuse the first run's.
+        offset = Customer.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        def rows():
+            for index in range(self.counts['customers']):
+                first, last = self.name()
+                number = offset + index
+                phone = f'+1 (555) {number // 10_000 % 1000:03d}-{number % 10_000:04d}'
+                if number >= 10_000_000:
+                    phone = f'+44 20 {number:010d}'
+                agent_id = None if self.random.random() < UNASSIGNED_SHARE else self.random.choice(self.agent_ids)
+                self.customer_agents.append(agent_id)
+                yield Customer(
+                    full_name=f'{first} {last}',
+                    email=f'{first.lower()}.{last.lower()}.{index}@{self.prefix}.example.com',
+                    phone_number=phone,
+                    phone_normalized=normalize_phone(phone),
+                    address=f'{self.random.randrange(1, 999)} {self.random.choice(STREETS)}',
+                    registration_date=self.now - timedelta(days=self.random.randrange(self.days * 4)),
+                    account_status=self.random.choice(ACCOUNT_STATUSES),
+                    assigned_agent_id=agent_id,
+                )
+        with _explicit_timestamps(Customer._meta.get_field('registration_date')):
+            self.customer_ids = _insert(Customer, rows(), self.batch_size)
+        return len(self.customer_ids)
+
+    def memberships(self):
+        through = Customer.campaigns.through
+
+        def rows():
+            for customer_id in self.customer_ids:
+                for campaign_id in self.random.sample(self.campaign_ids, min(self.random.randrange(4), len(self.campaign_ids))):
+                    yield through(customer_id=customer_id, campaign_id=campaign_id)
+        return len(_insert(through, rows(), self.batch_size))
+
+    def customer(self):
+        """A random customer id and the agent who usually handles them."""
+        index = self.random.randrange(len(self.customer_ids))
+        agent_id = self.customer_agents[index]
+        if agent_id is None or self.random.random() < 0.1:
+            agent_id = self.random.choice(self.agent_ids)
+        return self.customer_ids[index], agent_id
+
+    def calls(self):
+        # Calls that opened a ticket: (call id, customer id, agent id, start time).
+        self.ticket_calls = []
+
+        def rows():
+            for index in range(self.counts['calls']):
+                customer_id, agent_id = self.customer()
+                start = self.moment()
+                active = self.random.random() < ACTIVE_CALL_SHARE
+                duration = None if active else int(self.random.lognormvariate(5, 0.8))
+                yield Call(
+                    customer_id=customer_id,
+                    agent_id=agent_id,
+                    call_start_time=start,
+                    call_end_time=None if active else start + timedelta(seconds=duration),
+                    call_type='Inbound' if self.random.random() < 0.7 else 'Outbound',
+                    provider_sid=f'CA{self.prefix}{index:012d}',
+                    duration_seconds=duration,
+                    notes=self.random.choice(TICKET_TITLES) if self.random.random() < 0.3 else None,
+                )
+        created = 0
+        iterator = rows()
+        while True:
+            # Batch by batch, keeping only the calls picked for tickets.
+            batch = [call for _, call in zip(range(self.batch_size), iterator)]
+            if not batch:
+                return created
+            pks = [call.pk for call in Call.objects.bulk_create(batch)]
+            self._pick_ticket_calls(zip(pks, batch))
+            created += len(pks)
+
+    def _pick_ticket_calls(self, calls):
+        wanted = self.counts['tickets']
+        for pk, call in calls:
+            if len(self.ticket_calls) < wanted and self.random.random() < CALL_TICKET_SHARE:
+                self.ticket_calls.append((pk, call.customer_id, call.agent_id, call.call_start_time))
+
+    def tickets(self):
+        calls = iter(self.ticket_calls)
+
+        def rows():
+            for index in range(self.counts['tickets']):
+                call = next(calls, None)
+                if call is not None:
+                    call_id, customer_id, agent_id, created = call
+                    created = min(self.now, created + timedelta(minutes=self.random.randrange(1, 30)))
+                else:
+                    call_id = None
+                    customer_id, agent_id = self.customer()
+                    created = self.moment()
+                roll = self.random.random()
+                status = 'Resolved' if roll < 0.6 else 'Pending' if roll < 0.75 else 'Open'
+                resolved = None
+                if status == 'Resolved':
+                    resolved = min(self.now, created + timedelta(minutes=int(self.random.lognormvariate(6, 1))))
+                title = self.random.choice(TICKET_TITLES)
+                yield Ticket(
+                    issue_category=self.random.choice(ISSUE_CATEGORIES),
+                    priority_level=self.random.choice(('Low', 'Medium', 'Medium', 'High')),
+                    status=status,
+                    created_at=created,
+                    resolved_at=resolved,
+                    created_by_id=agent_id,
+                    customer_id=customer_id,
+                    agent_id=agent_id,
+                    call_id=call_id,
+                    title=title,
+                    description=f'{title}. Customer called about it on {created:%Y-%m-%d}.',
+                )
+        with _explicit_timestamps(Ticket._meta.get_field('created_at')):
+            self.ticket_ids = _insert(Ticket, rows(), self.batch_size)
+        return len(self.ticket_ids)
+
+    def security_logs(self):
+        user_ids = [*self.agent_ids, *self.supervisor_ids]
+
+        def rows():
+            for _ in range(self.counts['security_logs']):
+                event_type = self.random.choice(SECURITY_EVENTS)
+                yield SecurityLog(
+                    user_id=self.random.choice(user_ids),
+                    event_type=event_type,
+                    ip_address=f'10.{self.random.randrange(256)}.{self.random.randrange(256)}.{self.random.randrange(1, 255)}',
+                    timestamp=self.moment(),
+                    description=f'{event_type} (synthetic)',
+                )
+        return len(_insert(SecurityLog, rows(), self.batch_size))
+
+    def dead_letters(self):
+        def rows():
+            for index in range(self.counts['dead_letters']):
+                failed = self.moment()
+                yield WebhookEvent(
+                    source='Twilio',
+                    payload={'CallSid': f'CA{self.prefix}dead{index:08d}', 'From': '+15550000000', 'CallStatus': 'ringing'},
+                    dedupe_key=f'{self.prefix}-dead-{index}',
+                    status='Dead',
+                    attempts=5,
+                    next_attempt_at=failed,
+                    last_error='OperationalError: database is locked',
+                    processed_at=failed,
+                )
+        self.dead_letter_ids = _insert(WebhookEvent, rows(), self.batch_size)
+        return len(self.dead_letter_ids)
+
+
+def generate(counts, progress=None, **options):
+    """
+    Writes synthetic data for `counts` (see scaled_counts). Returns the
+    Generator: `created` holds the row counts, and the *_ids attributes the
+    new primary keys.
+    """
+    generator = Generator(counts, **options)
+    generator.run(progress)
+    return generator
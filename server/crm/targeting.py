@@ -0,0 +1,126 @@
+"""
+Set-based campaign membership.
+
+Campaign targets are picked either by a list of customer ids or by a filter
+(account status, assigned agent, registration date range, membership of
+other campaigns) and added or removed with one statement against the
+Customer.campaigns through table, whatever the number of customers:
+
+    INSERT INTO crm_customer_campaigns (customer_id, campaign_id)
+    SELECT customer_id, <campaign> FROM crm_customer WHERE <filter> AND <not yet a member>
+
+    DELETE FROM crm_customer_campaigns WHERE campaign_id = <campaign> AND customer_id IN (<filter>)
+"""
+from django.db import connection, transaction
+from django.db.models import IntegerField, Value
+from django.db.models.constants import OnConflict
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from core import response_cache
+from .models import Customer
+
+Membership = Customer.campaigns.through
+
+FILTER_KEYS = (
+    'account_status', 'assigned_agent', 'registered_after', 'registered_before',
+    'in_campaigns', 'not_in_campaigns',
+)
+
+
+def _id(name, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Expected a single id.'})
+
+
+def _id_list(name, value):
+    values = value if isinstance(value, list) else [value]
+    try:
+        return [int(item) for item in values]
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Expected an id or a list of ids.'})
+
+
+def parse_target(data):
+    """
+    Validates a bulk membership request body: `customer_ids` (list of ids)
+    and/or `filter` (object with any of FILTER_KEYS; `assigned_agent` is one id,
+    or null for unassigned customers). At least one criterion is required, so an
+    empty body never targets every customer.
+    """
+    target = {}
+    if data.get('customer_ids') is not None:
+        target['customer_ids'] = _id_list('customer_ids', data['customer_ids'])
+
+    filters = data.get('filter')
+    if filters is not None:
+        if not isinstance(filters, dict):
+            raise ValidationError({'filter': 'Expected an object.'})
+        unknown = set(filters) - set(FILTER_KEYS)
+        if unknown:
+            raise ValidationError({'filter': f"Unknown keys: {', '.join(sorted(unknown))}. Use: {', '.join(FILTER_KEYS)}"})
+        for key in ('registered_after', 'registered_before'):
+            if key in filters and parse_date(str(filters[key])) is None:
+                raise ValidationError({'filter': f'{key} must be a YYYY-MM-DD date.'})
+        for key in ('in_campaigns', 'not_in_campaigns'):
+            if key in filters:
+                filters[key] = _id_list(key, filters[key])
+        if filters.get('assigned_agent') is not None:
+            filters['assigned_agent'] = _id('assigned_agent', filters['assigned_agent'])
+        target.update(filters)
+
+    if not target:
+        raise ValidationError({'non_field_errors': 'Give customer_ids or a filter.'})
+    return target
+
+
+def target_queryset(target):
+    customers = Customer.objects.all()
+    if 'customer_ids' in target:
+        customers = customers.filter(pk__in=target['customer_ids'])
+    if 'account_status' in target:
+        customers = customers.filter(account_status=target['account_status'])
+    if 'assigned_agent' in target:
+        customers = customers.filter(assigned_agent=target['assigned_agent'])
+    if 'registered_after' in target:
+        customers = customers.filter(registration_date__date__gte=parse_date(str(target['registered_after'])))
+    if 'registered_before' in target:
+        customers = customers.filter(registration_date__date__lte=parse_date(str(target['registered_before'])))
+    for campaign_id in target.get('in_campaigns', ()):
+        customers = customers.filter(pk__in=Membership.objects.filter(campaign_id=campaign_id).values('customer_id'))
+    if target.get('not_in_campaigns'):
+        customers = customers.exclude(
+            pk__in=Membership.objects.filter(campaign_id__in=target['not_in_campaigns']).values('customer_id')
+        )
+    return customers
+
+
+def add_members(campaign, customers):
+    """Adds every customer of `customers` to `campaign` in one INSERT ... SELECT; returns the number added."""
+    rows = customers.exclude(
+        pk__in=Membership.objects.filter(campaign=campaign).values('customer_id')
+    ).annotate(
+        _campaign_id=Value(campaign.pk, output_field=IntegerField())
+    ).order_by().values_list('pk', '_campaign_id')
+    select_sql, params = rows.query.sql_with_params()
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(Membership._meta.get_field(name).column) for name in ('customer', 'campaign'))
+    # Concurrent additions of the same customer are skipped rather than failing on the unique pair.
+    insert = connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)
+    suffix = connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None)
+    sql = f"{insert} {quote(Membership._meta.db_table)} ({columns}) {select_sql} {suffix}"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        if cursor.rowcount:
+            response_cache.invalidate(Membership)
+        return cursor.rowcount
+
+
+def remove_members(campaign, customers):
+    """Removes every customer of `customers` from `campaign` in one DELETE; returns the number removed."""
+    deleted, _ = Membership.objects.filter(campaign=campaign, customer__in=customers.values('pk')).delete()
+    if deleted:
+        response_cache.invalidate(Membership)
+    return deleted
@@ -0,0 +1,44 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from core.models import User
+from crm.management.commands.check_query_counts import LIST_ENDPOINTS, Command as QueryCountCommand
+
+# Queries per list page, whatever the number of rows. Customers add one for the prefetched campaigns.
+EXPECTED_QUERIES = {
+    '/api/crm/customers/': 2,
+    '/api/crm/calls/': 1,
+    '/api/crm/tickets/': 1,
+    '/api/crm/campaigns/': 1,
+    '/api/core/security-logs/': 1,
+    '/api/core/users/': 1,
+}
+
+
+# Cached responses would skip the queries being counted.
+@override_settings(RESPONSE_CACHE_TTL=0)
+class ListQueryCountTests(TestCase):
+    """N+1 guard for the list endpoints; `manage.py check_query_counts` does the same against a real database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('_query_count_admin', role='Admin')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_every_list_endpoint_has_an_expected_count(self):
+        self.assertEqual(sorted(EXPECTED_QUERIES), sorted(LIST_ENDPOINTS))
+
+    def test_query_count_does_not_grow_with_rows(self):
+        seed = QueryCountCommand()._seed
+        seed(self.admin, 3, 0)
+        self._assert_counts()
+        seed(self.admin, 30, 3)
+        self._assert_counts()
+
+    def _assert_counts(self):
+        for url in LIST_ENDPOINTS:
+            with self.subTest(url=url), self.assertNumQueries(EXPECTED_QUERIES[url]):
+                response = self.client.get(url, {'page_size': 500})
+                self.assertEqual(response.status_code, 200)
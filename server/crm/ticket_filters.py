@@ -0,0 +1,99 @@
+"""
+Ticket list filters, orderings and per-status counts for the ticket board.
+
+`crm/tickets/` accepts:
+
+    status, priority_level, issue_category   exact match; comma separated for several
+    agent, customer                          id; agent=none for unassigned tickets
+    created_after, created_before            ISO date or datetime (a bare
+    resolved_after, resolved_before          `_before` date includes that day)
+    ordering                                 one of ORDERINGS
+
+`crm/tickets/counts/` takes the same filters and returns the number of
+tickets per status in one GROUP BY query, so the board can show each
+column's size while loading only its first page.
+"""
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from core.archive import parse_bound
+from .models import Ticket
+
+# Keyset orderings: each ends with the primary key so the cursor is unique.
+ORDERINGS = {
+    '-created_at': ('-created_at', '-ticket_id'),
+    'created_at': ('created_at', 'ticket_id'),
+    '-ticket_id': ('-ticket_id',),
+    'ticket_id': ('ticket_id',),
+}
+DEFAULT_ORDERING = '-created_at'
+
+CHOICE_FILTERS = {
+    'status': {value for value, _ in Ticket.STATUS_CHOICES},
+    'priority_level': {value for value, _ in Ticket.PRIORITY_CHOICES},
+    'issue_category': None,
+}
+DATE_FILTERS = {
+    'created_after': ('created_at', False),
+    'created_before': ('created_at', True),
+    'resolved_after': ('resolved_at', False),
+    'resolved_before': ('resolved_at', True),
+}
+
+
+def _id(name, value):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Expected an id.'})
+
+
+def parse_filters(params):
+    filters = {}
+    for name, allowed in CHOICE_FILTERS.items():
+        if params.get(name):
+            values = [value.strip() for value in params[name].split(',') if value.strip()]
+            if allowed is not None and set(values) - allowed:
+                raise ValidationError({name: f"Expected one of: {', '.join(sorted(allowed))}"})
+            filters[name] = values
+    if params.get('agent'):
+        filters['agent'] = None if params['agent'] == 'none' else _id('agent', params['agent'])
+    if params.get('customer'):
+        filters['customer'] = _id('customer', params['customer'])
+    for name in DATE_FILTERS:
+        if params.get(name):
+            filters[name] = parse_bound(name, params[name], end=DATE_FILTERS[name][1])
+    return filters
+
+
+def parse_ordering(params):
+    ordering = params.get('ordering') or DEFAULT_ORDERING
+    if ordering not in ORDERINGS:
+        raise ValidationError({'ordering': f"Expected one of: {', '.join(ORDERINGS)}"})
+    return ORDERINGS[ordering]
+
+
+def filter_queryset(queryset, filters):
+    for name in CHOICE_FILTERS:
+        if name in filters:
+            queryset = queryset.filter(**{f'{name}__in': filters[name]})
+    if 'agent' in filters:
+        if filters['agent'] is None:
+            queryset = queryset.filter(agent__isnull=True)
+        else:
+            queryset = queryset.filter(agent=filters['agent'])
+    if 'customer' in filters:
+        queryset = queryset.filter(customer=filters['customer'])
+    for name, (field, end) in DATE_FILTERS.items():
+        if name in filters:
+            moment, inclusive = filters[name]
+            lookup = 'gte' if not end else 'lte' if inclusive else 'lt'
+            queryset = queryset.filter(**{f'{field}__{lookup}': moment})
+    return queryset
+
+
+def status_counts(queryset):
+    """{status: count} for every status, zeros included, from one grouped query."""
+    counts = dict.fromkeys((value for value, _ in Ticket.STATUS_CHOICES), 0)
+    rows = queryset.order_by().values('status').annotate(count=Count('pk')).values_list('status', 'count')
+    counts.update(rows)
+    return counts
@@ -1,19 +1,29 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CustomerViewSet, CallViewSet, TicketViewSet, CampaignViewSet
+from .views import CustomerViewSet, CallViewSet, TicketViewSet, CampaignViewSet, DeadLetterViewSet
 from .twilio_views import TwilioWebhookView
 from .email_views import EmailWebhookView
 from .supervisor_views import SupervisorStatsView
+from .dashboard_views import DashboardSummaryView
+from .search_views import SearchView
+from .event_views import EventTokenView, event_stream
+from . import async_views
 
 router = DefaultRouter()
 router.register(r'customers', CustomerViewSet, basename='customer')
 router.register(r'calls', CallViewSet)
 router.register(r'tickets', TicketViewSet)
 router.register(r'campaigns', CampaignViewSet)
+router.register(r'webhooks/dead-letters', DeadLetterViewSet, basename='dead-letter')
 
 urlpatterns = [
     path('', include(router.urls)),
-    path('webhooks/twilio/', TwilioWebhookView.as_view(), name='twilio-webhook'),
-    path('webhooks/email/', EmailWebhookView.as_view(), name='email-webhook'),
-    path('supervisor/stats/', SupervisorStatsView.as_view(), name='supervisor-stats'),
+    path('webhooks/twilio/', async_views.twilio_webhook if settings.ASYNC_VIEWS else TwilioWebhookView.as_view(), name='twilio-webhook'),
+    path('webhooks/email/', async_views.email_webhook if settings.ASYNC_VIEWS else EmailWebhookView.as_view(), name='email-webhook'),
+    path('supervisor/stats/', async_views.supervisor_stats if settings.ASYNC_VIEWS else SupervisorStatsView.as_view(), name='supervisor-stats'),
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('events/', event_stream, name='event-stream'),
+    path('events/token/', EventTokenView.as_view(), name='event-token'),
 ]
@@ -1,22 +1,48 @@
-from core.models import User
-from django.db.models import Count
+from django.db import transaction
+from . import assignment
+from .models import Call, Customer, Ticket
 
-def assign_agent_to_customer(customer):
+PLACEHOLDER_NAMES = ('Unknown Caller', 'Unknown Sender')
+PLACEHOLDER_EMAIL_DOMAIN = '@placeholder.com'
+
+def assign_agent_to_customer(customer, department=None):
+    """
+    Assigns an agent to the customer using the configured strategy
+    (CRM_ASSIGNMENT_STRATEGY, Load Balancing by default: the agent with the
+    fewest assigned customers). See crm.assignment.
     """
-    Assigns an agent to the customer using a Load Balancing strategy.
-    It selects the agent with the fewest assigned customers.
+    return assignment.assign(customer, department=department)
+
+def merge_customers(duplicate, survivor):
     """
-    if customer.assigned_agent:
-        return
+    Folds `duplicate` into `survivor`: calls, tickets and campaign memberships
+    move over, blanks and webhook placeholders on the survivor are filled
+    from the duplicate, and the duplicate is deleted.
+    """
+    with transaction.atomic():
+        Call.objects.filter(customer=duplicate).update(customer=survivor)
+        Ticket.objects.filter(customer=duplicate).update(customer=survivor)
+        Membership = Customer.campaigns.through
+        shared = Membership.objects.filter(customer=survivor).values('campaign_id')
+        Membership.objects.filter(customer=duplicate).exclude(campaign_id__in=shared).update(customer=survivor)
+        Membership.objects.filter(customer=duplicate).delete()
+
+        changed = []
+        if not survivor.address and duplicate.address:
+            survivor.address = duplicate.address
+            changed.append('address')
+        if survivor.assigned_agent_id is None and duplicate.assigned_agent_id is not None:
+            survivor.assigned_agent_id = duplicate.assigned_agent_id
+            changed.append('assigned_agent')
+        if survivor.full_name in PLACEHOLDER_NAMES and duplicate.full_name not in PLACEHOLDER_NAMES:
+            survivor.full_name = duplicate.full_name
+            changed.append('full_name')
+        if survivor.email.endswith(PLACEHOLDER_EMAIL_DOMAIN) and not duplicate.email.endswith(PLACEHOLDER_EMAIL_DOMAIN):
+            survivor.email = duplicate.email
+            changed.append('email')
 
-    # Find all users with role 'Agent', count their customers, and order by that count (ascending)
-    # 'assigned_customers' is the related_name defined in the Customer model
-    agents = User.objects.filter(role='Agent').annotate(
-        num_customers=Count('assigned_customers')
-    ).order_by('num_customers')
-    
-    if agents.exists():
-        # Pick the agent with the fewest customers
-        selected_agent = agents.first()
-        customer.assigned_agent = selected_agent
-        customer.save()
+        # Delete first: the email is unique.
+        duplicate.delete()
+        if changed:
+            survivor.save(update_fields=changed)
+    return survivor
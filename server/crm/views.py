@@ -1,54 +1,117 @@
+import io
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Customer, Call, Ticket, Campaign
-from .serializers import CustomerSerializer, CallSerializer, TicketSerializer, CampaignSerializer
+from .models import Customer, Call, Ticket, Campaign, WebhookEvent
+from .serializers import (
+    CustomerSerializer, CustomerImportOptionsSerializer, CallSerializer, TicketSerializer, CampaignSerializer,
+    WebhookEventSerializer,
+)
+from . import bulk, ingestion, targeting, ticket_filters
 from core.permissions import IsAdmin, IsSupervisor, IsAgent
-from core.models import SecurityLog
+from core.mixins import FastListMixin, RelatedFieldsMixin
+from core.pagination import KeysetPagination
+from core import elevation, response_cache
+from core.audit import log_security_event
 from core.signals import get_client_ip
 
-class CampaignViewSet(viewsets.ModelViewSet):
+class CampaignMemberPagination(KeysetPagination):
+    def get_ordering(self, request, queryset, view):
+        return ('customer_id',)
+
+class CampaignViewSet(RelatedFieldsMixin, viewsets.ModelViewSet):
     queryset = Campaign.objects.all()
     serializer_class = CampaignSerializer
     permission_classes = [IsSupervisor]
+    cursor_ordering = 'campaign_id'
+
+    @response_cache.cached_response('campaigns')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     @action(detail=True, methods=['get'])
     def members(self, request, pk=None):
+        """Members one keyset page at a time (`page_size` up to 500)."""
+        campaign = self.get_object()
+        customers = campaign.customers.select_related('assigned_agent').prefetch_related('campaigns')
+        paginator = CampaignMemberPagination()
+        page = paginator.paginate_queryset(customers, request, view=self)
+        serializer = CustomerSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='members/count')
+    def members_count(self, request, pk=None):
         campaign = self.get_object()
-        customers = campaign.customers.all()
-        serializer = CustomerSerializer(customers, many=True)
-        return Response(serializer.data)
+        return Response({'count': campaign.customers.count()})
+
+    @action(detail=True, methods=['get'], url_path='members/stream')
+    def members_stream(self, request, pk=None):
+        """Every member as CSV (default) or JSON lines (`file_type=jsonl`), streamed (see crm.bulk)."""
+        campaign = self.get_object()
+        try:
+            file_type = bulk.file_type_for('', request.query_params.get('file_type', 'csv'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        streamer, content_type = bulk.STREAMERS[file_type]
+        response = StreamingHttpResponse(
+            streamer(bulk.export_rows(Customer.objects.filter(campaigns=campaign))), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="campaign-{campaign.pk}-members.{file_type}"'
+        return response
+
+    @action(detail=True, methods=['post'])
+    def add_customers(self, request, pk=None):
+        """Bulk add by `customer_ids` and/or `filter` (see crm.targeting)."""
+        campaign = self.get_object()
+        customers = targeting.target_queryset(targeting.parse_target(request.data))
+        return Response({'added': targeting.add_members(campaign, customers)})
+
+    @action(detail=True, methods=['post'])
+    def remove_customers(self, request, pk=None):
+        """Bulk remove by `customer_ids` and/or `filter` (see crm.targeting)."""
+        campaign = self.get_object()
+        customers = targeting.target_queryset(targeting.parse_target(request.data))
+        return Response({'removed': targeting.remove_members(campaign, customers)})
 
     @action(detail=True, methods=['post'])
     def add_customer(self, request, pk=None):
         campaign = self.get_object()
-        customer_id = request.data.get('customer_id')
-        try:
-            customer = Customer.objects.get(pk=customer_id)
-            customer.campaigns.add(campaign)
-            return Response({'status': 'customer added'})
-        except Customer.DoesNotExist:
+        customers = Customer.objects.filter(pk=request.data.get('customer_id'))
+        if not targeting.add_members(campaign, customers) and not customers.exists():
             return Response({'error': 'customer not found'}, status=404)
+        return Response({'status': 'customer added'})
 
     @action(detail=True, methods=['post'])
     def remove_customer(self, request, pk=None):
         campaign = self.get_object()
-        customer_id = request.data.get('customer_id')
-        try:
-            customer = Customer.objects.get(pk=customer_id)
-            customer.campaigns.remove(campaign)
-            return Response({'status': 'customer removed'})
-        except Customer.DoesNotExist:
+        customers = Customer.objects.filter(pk=request.data.get('customer_id'))
+        if not targeting.remove_members(campaign, customers) and not customers.exists():
             return Response({'error': 'customer not found'}, status=404)
+        return Response({'status': 'customer removed'})
+
+def customer_scope(request):
+    # Supervisors and admins share one view of every customer; agents see their own.
+    user = request.user
+    return 'all' if user.role in ['Supervisor', 'Admin'] else f'agent:{user.pk}'
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(FastListMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
+    queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
+    cursor_ordering = 'customer_id'
 
     def get_queryset(self):
+        queryset = super().get_queryset()
         user = self.request.user
         if user.role in ['Supervisor', 'Admin']:
-            return Customer.objects.all()
-        return Customer.objects.filter(assigned_agent=user)
+            return queryset
+        return queryset.filter(assigned_agent=user)
+
+    @response_cache.cached_response('customers', scope=customer_scope)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         serializer.save(assigned_agent=self.request.user)
@@ -56,13 +119,62 @@ class CustomerViewSet(viewsets.ModelViewSet):
     def get_permissions(self):
         if self.action in ['destroy']:
             return [IsAdmin()]
+        if self.action in ['import_customers']:
+            return [IsSupervisor()]
         return [IsAgent()]
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_customers(self, request):
+        """
+        Bulk upsert from an uploaded CSV or JSON lines `file` (see crm.bulk).
+        Optional: `campaign` (id) joined by every imported customer,
+        `assign=false` to skip agent assignment, `department` for assignment.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload the records as "file" (CSV or JSON lines).'}, status=400)
+        try:
+            file_type = bulk.file_type_for(upload.name, request.data.get('file_type'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+
+        options = CustomerImportOptionsSerializer(data={'campaign': request.data.get('campaign') or None})
+        options.is_valid(raise_exception=True)
+        campaign = options.validated_data['campaign']
+
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        result = bulk.import_customers(
+            stream, file_type,
+            campaign=campaign,
+            assign=str(request.data.get('assign', 'true')).lower() != 'false',
+            department=request.data.get('department') or None,
+        )
+        return Response(result)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Streams the customers visible to the user as CSV (default) or JSON lines (`file_type=jsonl`)."""
+        try:
+            file_type = bulk.file_type_for('', request.query_params.get('file_type', 'csv'))
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=400)
+        streamer, content_type = bulk.STREAMERS[file_type]
+        log_security_event(
+            user=request.user,
+            event_type='Data Access',
+            ip_address=get_client_ip(request),
+            description=f"Exported customer list ({file_type})",
+        )
+        response = StreamingHttpResponse(streamer(bulk.export_rows(self.get_queryset())), content_type=content_type)
+        filename = f"customers-{timezone.localdate():%Y%m%d}.{file_type}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
         # Log Data Access
         if request.user.is_authenticated:
-            SecurityLog.objects.create(
+            log_security_event(
                 user=request.user,
                 event_type='Data Access',
                 ip_address=get_client_ip(request),
@@ -70,23 +182,46 @@ class CustomerViewSet(viewsets.ModelViewSet):
             )
         return super().retrieve(request, *args, **kwargs)
 
-class CallViewSet(viewsets.ModelViewSet):
+class CallViewSet(FastListMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
     queryset = Call.objects.all()
     serializer_class = CallSerializer
     permission_classes = [IsAgent]
+    cursor_ordering = ('-call_start_time', '-call_id')
 
     def perform_create(self, serializer):
         serializer.save(agent=self.request.user)
 
-class TicketViewSet(viewsets.ModelViewSet):
+class TicketViewSet(FastListMixin, RelatedFieldsMixin, viewsets.ModelViewSet):
+    """
+    The list and `counts` take the board filters and `ordering` (see
+    crm.ticket_filters); agents only list their own tickets.
+    """
     queryset = Ticket.objects.all()
     serializer_class = TicketSerializer
-    
+    cursor_ordering = ticket_filters.ORDERINGS[ticket_filters.DEFAULT_ORDERING]
+
     def get_permissions(self):
         if self.action in ['destroy']:
             return [IsSupervisor()]
         return [IsAgent()]
 
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action not in ['list', 'counts']:
+            return queryset
+        user = self.request.user
+        if user.role not in ['Supervisor', 'Admin']:
+            queryset = queryset.filter(agent=user)
+        if self.action == 'list':
+            self.cursor_ordering = ticket_filters.parse_ordering(self.request.query_params)
+        return ticket_filters.filter_queryset(queryset, ticket_filters.parse_filters(self.request.query_params))
+
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """Tickets per status for the filtered list, in one grouped query."""
+        counts = ticket_filters.status_counts(self.filter_queryset(Ticket.objects.all()))
+        return Response({'counts': counts, 'total': sum(counts.values())})
+
     def perform_create(self, serializer):
         serializer.save(agent=self.request.user, created_by=self.request.user)
 
@@ -95,6 +230,9 @@ class TicketViewSet(viewsets.ModelViewSet):
         # Check if user is assigned agent or supervisor/admin
         if request.user.role not in ['Supervisor', 'Admin'] and instance.agent != request.user:
             return Response({'error': 'You are not authorized to view this ticket details.'}, status=403)
+        # Details need a recent password re-check (see core.elevation).
+        if not elevation.is_elevated(request, 'tickets'):
+            return Response({'error': 'Verify your password to view ticket details.', 'code': 'elevation_required'}, status=403)
         return super().retrieve(request, *args, **kwargs)
 
     def update(self, request, *args, **kwargs):
@@ -108,3 +246,15 @@ class TicketViewSet(viewsets.ModelViewSet):
         if request.user.role not in ['Supervisor', 'Admin'] and instance.agent != request.user:
             return Response({'error': 'You are not authorized to edit this ticket.'}, status=403)
         return super().partial_update(request, *args, **kwargs)
+
+class DeadLetterViewSet(viewsets.ReadOnlyModelViewSet):
+    """Webhook events that exhausted their retries (see crm.ingestion)."""
+    queryset = WebhookEvent.objects.filter(status='Dead')
+    serializer_class = WebhookEventSerializer
+    permission_classes = [IsSupervisor]
+    cursor_ordering = '-event_id'
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        event = ingestion.retry(self.get_object())
+        return Response({'status': 'requeued', 'event_id': event.event_id})
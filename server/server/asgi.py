@@ -0,0 +1,15 @@
+"""
+ASGI entry point, e.g. `uvicorn server.asgi:application --workers 4`.
+
+Serves the async variants of the webhook, current user and supervisor stats
+views (ASYNC_VIEWS) unless the environment sets ASYNC_VIEWS=0; everything
+else runs as in WSGI mode, in Django's thread pool.
+"""
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'server.settings')
+os.environ.setdefault('ASYNC_VIEWS', '1')
+
+application = get_asgi_application()
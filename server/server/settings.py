@@ -1,6 +1,8 @@
 import os
 from pathlib import Path
 from datetime import timedelta
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -37,6 +39,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware', # First, so it times everything below
     'corsheaders.middleware.CorsMiddleware', # CORS Middleware must be high up
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -45,6 +48,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.ReplicaReadMiddleware',
 ]
 
 ROOT_URLCONF = 'server.urls'
@@ -66,17 +70,90 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'server.wsgi.application'
+ASGI_APPLICATION = 'server.asgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Profile (see core.db): 'sqlite' (default) or 'postgres'.
+DATABASE_PROFILE = os.environ.get('DATABASE_PROFILE', 'sqlite')
+ANALYTICS_SNAPSHOT_PATH = os.environ.get('ANALYTICS_SNAPSHOT_PATH', str(BASE_DIR / 'analytics.sqlite3'))
+ANALYTICS_SNAPSHOT_INTERVAL = int(os.environ.get('ANALYTICS_SNAPSHOT_INTERVAL', 60))
+
+if DATABASE_PROFILE == 'postgres':
+    # Requires psycopg (pip install "psycopg[binary]"; add psycopg-pool for POSTGRES_POOL_SIZE).
+    POSTGRES_POOL_SIZE = int(os.environ.get('POSTGRES_POOL_SIZE', 0))
+    _postgres = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('POSTGRES_DB', 'crm'),
+        'USER': os.environ.get('POSTGRES_USER', 'crm'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # A pool replaces persistent connections; Django does not allow both.
+        'CONN_MAX_AGE': 0 if POSTGRES_POOL_SIZE else int(os.environ.get('POSTGRES_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'connect_timeout': 5},
+    }
+    if POSTGRES_POOL_SIZE:
+        _postgres['OPTIONS']['pool'] = {'min_size': 1, 'max_size': POSTGRES_POOL_SIZE}
+    DATABASES = {'default': _postgres}
+    if os.environ.get('POSTGRES_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **_postgres,
+            'HOST': os.environ['POSTGRES_REPLICA_HOST'],
+            'PORT': os.environ.get('POSTGRES_REPLICA_PORT', _postgres['PORT']),
+            'OPTIONS': {**_postgres['OPTIONS']},
+            'TEST': {'MIRROR': 'default'},
+        }
+    # Reports (see core.db): read-only, and cut off after ANALYTICS_STATEMENT_TIMEOUT_MS.
+    _analytics_source = DATABASES.get('replica', _postgres)
+    DATABASES['analytics'] = {
+        **_analytics_source,
+        'HOST': os.environ.get('POSTGRES_ANALYTICS_HOST', _analytics_source['HOST']),
+        'PORT': os.environ.get('POSTGRES_ANALYTICS_PORT', _analytics_source['PORT']),
+        'OPTIONS': {
+            **_postgres['OPTIONS'],
+            'options': '-c default_transaction_read_only=on '
+                       f"-c statement_timeout={int(os.environ.get('ANALYTICS_STATEMENT_TIMEOUT_MS', 30000))}",
+        },
+        'TEST': {'MIRROR': 'default'},
     }
+elif DATABASE_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    # Reports (see core.db) read a snapshot of the database instead, refreshed by
+    # `manage.py refresh_analytics_snapshot`.
+    if os.environ.get('ANALYTICS_SNAPSHOT', '0') == '1':
+        DATABASES['analytics'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': f'file:{ANALYTICS_SNAPSHOT_PATH}?mode=ro',
+            'OPTIONS': {'timeout': 20},
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    raise ImproperlyConfigured(f"Unknown DATABASE_PROFILE {DATABASE_PROFILE!r}; use 'sqlite' or 'postgres'.")
+
+# Run on every new SQLite connection (see core.db).
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -64000,  # KiB
+    'temp_store': 'MEMORY',
 }
 
+DATABASE_ROUTERS = ['core.db.DatabaseRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -123,15 +200,25 @@ AUTH_USER_MODEL = 'core.User'
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
 ]
+CORS_ALLOW_HEADERS = (*default_headers, 'x-elevation-token')
+# Freshness of analytics responses (see core.db).
+CORS_EXPOSE_HEADERS = ['X-Data-As-Of', 'X-Data-Lag-Seconds']
 
 # DRF Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+    # Password re-verification (see core.elevation)
+    'DEFAULT_THROTTLE_RATES': {
+        'verify_password_user': os.environ.get('VERIFY_PASSWORD_USER_RATE', '10/min'),
+        'verify_password_ip': os.environ.get('VERIFY_PASSWORD_IP_RATE', '30/min'),
+    },
 }
 
 # JWT Configuration
@@ -161,3 +248,98 @@ SIMPLE_JWT = {
 
     'JTI_CLAIM': 'jti',
 }
+
+# Async views (core.async_views, crm.async_views) replace the DRF webhook,
+# current user and supervisor stats views. On by default under server/asgi.py.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+# Threads for blocking work called from async views (see core.concurrency).
+ASYNC_THREAD_POOL_SIZE = int(os.environ.get('ASYNC_THREAD_POOL_SIZE', 8))
+
+# Authenticated user cache (see core.authentication): role changes and
+# deactivations reach every process within AUTH_USER_CACHE_TTL seconds.
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 30))
+AUTH_USER_CACHE_SIZE = 1000
+
+# Response cache for read-heavy endpoints (see core.response_cache)
+# 'locmem': this process only; 'file': shared by every worker on the host.
+RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'locmem')
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('RESPONSE_CACHE_DIR', str(BASE_DIR / 'cache' / 'responses')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+}
+
+# Request metrics (see core.metrics), served in Prometheus format at core/metrics/
+# to admins and to scrapers sending `Authorization: Bearer <METRICS_TOKEN>`.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Requests slower than this are logged with their slowest queries; 0 turns the log off.
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 1000))
+METRICS_SLOW_REQUEST_QUERIES = 5
+
+# Stored results `manage.py benchmark_endpoints` compares against; record them on the CI machine.
+BENCHMARK_BASELINE_PATH = os.environ.get('BENCHMARK_BASELINE_PATH', str(BASE_DIR / 'benchmarks' / 'baseline.json'))
+
+# Calls, tickets and customers lists read .values() rows and render them with
+# orjson when it is installed (see core.mixins.FastListMixin); same output.
+FAST_LIST_SERIALIZATION = os.environ.get('FAST_LIST_SERIALIZATION', '1') == '1'
+
+# Elevation after a password re-check (see core.elevation), in seconds.
+AUTH_ELEVATION_TTL = int(os.environ.get('AUTH_ELEVATION_TTL', 600))
+
+# Agent assignment (see crm.assignment)
+# One of: least_loaded, round_robin, department, weighted_tickets
+CRM_ASSIGNMENT_STRATEGY = os.environ.get('CRM_ASSIGNMENT_STRATEGY', 'least_loaded')
+CRM_ASSIGNMENT_TICKET_WEIGHT = 2
+
+# Webhook ingestion (see crm.ingestion)
+# 'queue': webhooks only persist the payload; run `manage.py process_webhooks`.
+# 'sync': process inline in the request (development).
+CRM_WEBHOOK_PROCESSING = os.environ.get('CRM_WEBHOOK_PROCESSING', 'queue')
+CRM_WEBHOOK_MAX_ATTEMPTS = 8
+CRM_WEBHOOK_RETRY_BASE_SECONDS = 5
+CRM_WEBHOOK_RETRY_MAX_SECONDS = 3600
+CRM_WEBHOOK_LOCK_TIMEOUT = 300
+
+# Full-text search (see crm.search): 'auto' (fts5 on SQLite, postgres on PostgreSQL), 'fts5', 'postgres' or 'basic'.
+CRM_SEARCH_BACKEND = os.environ.get('CRM_SEARCH_BACKEND', 'auto')
+
+# Live dashboard events (see crm.events)
+# 'database': outbox table polled by each process, works across processes; 'memory': this process only.
+CRM_EVENT_BUS = os.environ.get('CRM_EVENT_BUS', 'database')
+CRM_EVENT_POLL_INTERVAL = 1.0
+CRM_EVENT_BACKLOG = 1000
+CRM_EVENT_RETENTION_SECONDS = 3600
+CRM_EVENT_STREAM_MAX_SECONDS = 300
+CRM_EVENT_TOKEN_TTL = 60
+
+# Bulk customer import (see crm.bulk): records validated and written per transaction.
+CRM_IMPORT_CHUNK_SIZE = 1000
+
+# Caller matching (see crm.phones): how numbers without a country code are read.
+CRM_PHONE_DEFAULT_COUNTRY_CODE = os.environ.get('CRM_PHONE_DEFAULT_COUNTRY_CODE', '1')
+CRM_PHONE_TRUNK_PREFIX = os.environ.get('CRM_PHONE_TRUNK_PREFIX', '')
+
+# Security log writer (see core.audit)
+# 'buffered': batch inserts off the request path; 'sync': one INSERT per event, in the request.
+SECURITY_LOG_MODE = os.environ.get('SECURITY_LOG_MODE', 'buffered')
+SECURITY_LOG_BUFFER_SIZE = 100
+SECURITY_LOG_FLUSH_INTERVAL = 2.0
+SECURITY_LOG_FALLBACK_FILE = BASE_DIR / 'security_log_fallback.jsonl'
+
+# Security log archiving (see core.archive)
+SECURITY_LOG_RETENTION_DAYS = int(os.environ.get('SECURITY_LOG_RETENTION_DAYS', 90))
+SECURITY_LOG_ARCHIVE_DIR = BASE_DIR / 'archive' / 'security_logs'